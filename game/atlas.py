@@ -0,0 +1,79 @@
+'''
+Module with shared sprite surfaces. Sprites of the same kind and length look the same, so they share
+one surface, converted to the display's pixel format for fast blitting
+'''
+
+import pygame
+from typing import Dict, Tuple
+
+import settings
+
+platform_colors = {'normal': settings.normal_platform_color, 'bounce': settings.bounce_platform_color,
+                   'collapse': settings.collapse_platform_color, 'horizontal': settings.horizontal_platform_color,
+                   'vertical': settings.vertical_platform_color}
+
+
+class SurfaceAtlas:
+    '''
+    SurfaceAtlas creates sprite surfaces once and shares them. Surfaces are converted to the display's pixel format
+    when there is a display, so they can be created headless too
+
+    Attributes:
+        surfaces (Dict[Tuple[str, int], pygame.Surface]): surfaces by kind (platform type | missile | player) and length in tiles
+    '''
+
+    def __init__(self) -> None:
+        self.surfaces: Dict[Tuple[str, int], pygame.Surface] = {}
+
+    def get(self, kind: str, length: int = 1) -> pygame.Surface:
+        '''
+        Gets surface of a sprite, creating it the first time
+
+        Args:
+            kind (str): platform type | missile | player
+            length (int): length in tiles (platforms only)
+
+        Returns:
+            pygame.Surface: shared surface, not to be drawn on
+        '''
+        key = (kind, length)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.surfaces[key] = self.create(kind, length)
+        return surface
+
+    def create(self, kind: str, length: int) -> pygame.Surface:
+        '''
+        Creates surface of a sprite
+
+        Args:
+            kind (str): platform type | missile | player
+            length (int): length in tiles (platforms only)
+
+        Returns:
+            pygame.Surface: created surface
+        '''
+        if kind == 'player':
+            surface = pygame.Surface(settings.player_dimensions)
+            surface.fill(settings.player_and_text_color)
+        elif kind == 'missile':
+            surface = pygame.Surface(settings.missile_dimensions)
+            surface.fill(settings.missile_color)
+        else:
+            surface = pygame.Surface(
+                (length * settings.tile_size, settings.platform_thickness))
+            surface.fill(platform_colors[kind])
+
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
+
+    def convert(self) -> None:
+        '''
+        Converts surfaces created before the display was set up. Sprites get converted surfaces when created or reset
+        '''
+        for key, surface in self.surfaces.items():
+            self.surfaces[key] = surface.convert()
+
+
+atlas = SurfaceAtlas()
@@ -0,0 +1,763 @@
+'''
+Module with batched simulation of many games at once, vectorized with NumPy. Levels follow the rules of
+levelgen.LevelGenerator, but their platforms are drawn for all games at once from the batch's random number generator
+'''
+
+import numpy as np
+import time
+import argparse
+from typing import Optional, Tuple, Union
+
+import settings
+from player import Keys
+from levelgen import jump_envelope, start_platform
+
+# y coordinate of unused missile slots, far above the screen
+NO_MISSILE = -2**30
+# collapse frame of platforms which aren't collapsing
+NO_COLLAPSE = 2**31 - 1
+# number of levels started ahead at once, their first platforms wait for new games
+LEVEL_STARTS = 4096
+
+
+def swept_interval(start: np.ndarray, size: int, target_start: np.ndarray, target_size: int,
+                   distance: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Finds when segments moving along an axis overlap static ones, like spatial.swept_collision does for rects
+
+    Args:
+        start (np.ndarray): moving segments' starts at the start of the move
+        size (int): moving segments' size
+        target_start (np.ndarray): static segments' starts
+        target_size (int): static segments' size
+        distance (np.ndarray): distances of the moves
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: times (fractions of the move) segments start and stop overlapping,
+            infinite for segments which don't move
+    '''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        near = (target_start - start - size) / distance
+        far = (target_start + target_size - start) / distance
+    overlaps = (start < target_start + target_size) & (start + size > target_start)
+    entry = np.where(distance == 0, np.where(overlaps, -np.inf, np.inf), np.minimum(near, far))
+    exit = np.where(distance == 0, np.where(overlaps, np.inf, -np.inf), np.maximum(near, far))
+    return entry, exit
+
+
+class PlatformTypes:
+    '''
+    Simple "enum" class for platform type codes
+    '''
+    normal, bounce, collapse, horizontal, vertical = range(5)
+    names = ['normal', 'bounce', 'collapse', 'horizontal', 'vertical']
+
+
+def reachable(source: np.ndarray, target: np.ndarray, reach: np.ndarray) -> np.ndarray:
+    '''
+    Tells which platforms player can jump on from the previous ones, like levelgen.reachable does for a single pair
+
+    Args:
+        source (np.ndarray): platforms player jumps from - map x, height difference, length and PlatformTypes code, shape (4, ...)
+        target (np.ndarray): platforms above them, shape (4, ...)
+        reach (np.ndarray): jump envelopes from normal and bounce platforms, padded with -1 past the highest
+            reachable height, shape (2, heights)
+
+    Returns:
+        np.ndarray: True for platforms which can be reached
+    '''
+    source_x, _, source_length, source_type = source
+    target_x, height_difference, target_length, target_type = target
+    # platforms' levels lag behind their positions by up to a tile, vertical platforms can be waited for at their best
+    height = (height_difference + 1) * settings.tile_size - settings.vertical_platform_range * (
+        (source_type == PlatformTypes.vertical).astype(np.int32) + (target_type == PlatformTypes.vertical))
+    height = np.clip(height, 0, reach.shape[1] - 1)
+    # bounce platforms jump on their own
+    distance = reach[(source_type == PlatformTypes.bounce).astype(np.intp), height]
+
+    width = settings.player_dimensions[0]
+    source_left = source_x * settings.tile_size - width
+    source_right = (source_x + source_length) * settings.tile_size
+    target_left = target_x * settings.tile_size - width
+    target_right = (target_x + target_length) * settings.tile_size
+    gap = np.maximum(0, np.maximum(target_left - source_right, source_left - target_right))
+    # horizontal platforms cross the whole screen
+    horizontal = (source_type == PlatformTypes.horizontal) | (target_type == PlatformTypes.horizontal)
+    return (distance >= 0) & (horizontal | (gap <= distance))
+
+
+class BatchEngine:
+    '''
+    BatchEngine object simulates many independent games with the rules of Engine. Players, platforms and missiles
+    of all games are kept in struct-of-arrays NumPy buffers and every frame of all games is advanced with array operations.
+    Finished games are restarted on the next step
+
+    Args:
+        n_games (int): number of simulated games
+        max_missiles (int): missile slots of a single game, missiles spawned over that are dropped
+        seed (Optional[int]): seed of the random number generator
+
+    Attributes:
+        n (int): number of games
+        platform_count (int): number of platforms in a game
+        rng (np.random.Generator): random number generator
+        reach (np.ndarray): jump envelopes from normal and bounce platforms, see reachable
+        type_codes (np.ndarray): PlatformTypes codes of settings.platform_types, drawn uniformly
+        level_starts (np.ndarray): first platforms of levels started ahead - map x, height difference, length
+            and PlatformTypes code, shape (4, platform_count - 1, levels)
+        level_starts_taken (int): number of levels started ahead already taken by new games
+        level_last (np.ndarray): the last generated platform of each game's level, shape (4, n)
+        frame (np.ndarray): number of frames simulated in each game
+        score (np.ndarray): current scores
+        done (np.ndarray): tells which games ended in the last step
+        final_score (np.ndarray): score of the last finished game in each slot
+        final_frame (np.ndarray): number of frames of the last finished game in each slot
+        games_finished (int): number of finished games
+        player_x (np.ndarray): players' x coordinates
+        player_y (np.ndarray): players' y coordinates
+        player_dx (np.ndarray): players' horizontal directions (-1 | 0 | 1)
+        player_dy (np.ndarray): players' vertical directions (speeds)
+        platform_x (np.ndarray): platforms' x coordinates, shape (platform_count, n)
+        platform_y (np.ndarray): platforms' y coordinates, shape (platform_count, n)
+        platform_width (np.ndarray): platforms' widths in pixels, shape (platform_count, n)
+        platform_max_x (np.ndarray): platforms' x coordinates touching the right screen edge, shape (platform_count, n)
+        platform_turn (np.ndarray): platforms' max_x scaled by horizontal platform speed, shape (platform_count, n)
+        platform_type (np.ndarray): platforms' PlatformTypes codes, shape (platform_count, n)
+        platform_number (np.ndarray): platforms' numbers, shape (platform_count, n)
+        platform_spawn_level (np.ndarray): platforms' map levels at spawn, shape (platform_count, n)
+        platform_peak_y (np.ndarray): platforms' lowest screen positions so far, shape (platform_count, n)
+        platform_vx (np.ndarray): horizontal platforms' speeds (positive when moving right, 0 for other types), shape (platform_count, n)
+        platform_vy (np.ndarray): vertical platforms' speeds (negative when moving up, 0 for other types), shape (platform_count, n)
+        platform_level (np.ndarray): vertical platforms' levels, shape (platform_count, n)
+        platform_collapse_frame (np.ndarray): frames platforms collapse in, NO_COLLAPSE if not collapsing, shape (platform_count, n)
+        missile_x (np.ndarray): missiles' x coordinates, shape (max_missiles, n)
+        missile_y (np.ndarray): missiles' y coordinates (NO_MISSILE region for unused slots), shape (max_missiles, n)
+        world_shift (np.ndarray): world shifts
+        world_descend_speed (np.ndarray): world descend speeds
+        spawn_missiles (np.ndarray): tells if missiles should be spawned
+        spawn_collapse_platforms (np.ndarray): tells if collapse platforms should be spawned
+        missile_spawn_frequency_down (np.ndarray): current minimal missile spawn frequencies
+        missile_spawn_frequency_up (np.ndarray): current maximal missile spawn frequencies
+        missile_timer (np.ndarray): frames left to missile spawn, -1 if not set
+        next_collapse_frame (np.ndarray): the earliest frame a platform may collapse in (never later than the real one)
+        previous_player_x (np.ndarray): players' x coordinates at the start of the last frame
+        previous_player_y (np.ndarray): players' y coordinates at the start of the last frame
+        missile_dy (np.ndarray): missiles' vertical movement in the last frame, without scrolling
+    '''
+
+    def __init__(self, n_games: int, max_missiles: int = 8, seed: Optional[int] = None) -> None:
+        self.n = n_games
+        self.rng = np.random.default_rng(seed)
+
+        # rules from settings
+        self.platform_count = settings.platform_count
+        self.thresholds = np.array(settings.score_thresholds)
+        self.descend_speeds = np.array(
+            [parameters['world_descend_speed'] for parameters in settings.game_difficulty])
+        self.frequencies_down = np.array(
+            [parameters['missile_spawn_frequency_down'] for parameters in settings.game_difficulty])
+        self.frequencies_up = np.array(
+            [parameters['missile_spawn_frequency_up'] for parameters in settings.game_difficulty])
+        envelopes = [jump_envelope(speed, settings.gravity, settings.horizontal_speed)
+                     for speed in (settings.jump_speed, settings.bounce_speed)]
+        self.reach = np.full((2, max(len(envelope) for envelope in envelopes) + 1), -1, dtype=np.int32)
+        for row, envelope in enumerate(envelopes):
+            self.reach[row, :len(envelope)] = envelope
+        self.type_codes = np.array([PlatformTypes.names.index(type) for type in settings.platform_types],
+                                   dtype=np.int32)
+
+        def zeros(*shape: int, dtype: type = np.int32) -> np.ndarray:
+            return np.zeros(shape, dtype=dtype)
+
+        # games
+        self.frame = zeros(n_games)
+        self.score = zeros(n_games)
+        self.done = zeros(n_games, dtype=bool)
+        self.final_score = zeros(n_games)
+        self.final_frame = zeros(n_games)
+        self.games_finished = 0
+        self.world_shift = zeros(n_games)
+        self.world_descend_speed = zeros(n_games)
+        self.spawn_missiles = zeros(n_games, dtype=bool)
+        self.spawn_collapse_platforms = zeros(n_games, dtype=bool)
+        self.missile_spawn_frequency_down = zeros(n_games)
+        self.missile_spawn_frequency_up = zeros(n_games)
+        self.missile_timer = zeros(n_games)
+        self.next_collapse_frame = zeros(n_games)
+
+        # players
+        self.player_x = zeros(n_games)
+        self.player_y = zeros(n_games)
+        self.player_dx = zeros(n_games)
+        self.player_dy = zeros(n_games, dtype=np.float64)
+        self.previous_player_x = zeros(n_games)
+        self.previous_player_y = zeros(n_games)
+        self.missile_dy = zeros(n_games)
+
+        # platforms
+        self.platform_x = zeros(self.platform_count, n_games)
+        self.platform_y = zeros(self.platform_count, n_games)
+        self.platform_width = zeros(self.platform_count, n_games)
+        self.platform_max_x = zeros(self.platform_count, n_games)
+        self.platform_turn = zeros(self.platform_count, n_games)
+        self.platform_type = zeros(self.platform_count, n_games)
+        self.platform_number = zeros(self.platform_count, n_games)
+        self.platform_spawn_level = zeros(self.platform_count, n_games)
+        self.platform_peak_y = zeros(self.platform_count, n_games)
+        self.platform_vx = zeros(self.platform_count, n_games)
+        self.platform_vy = zeros(self.platform_count, n_games)
+        self.platform_level = zeros(self.platform_count, n_games)
+        self.platform_collapse_frame = zeros(self.platform_count, n_games)
+
+        # missiles
+        self.missile_x = zeros(max_missiles, n_games)
+        self.missile_y = zeros(max_missiles, n_games)
+
+        # levels
+        self.level_starts = zeros(4, self.platform_count - 1, 0)
+        self.level_starts_taken = 0
+        self.level_last = zeros(4, n_games)
+
+        self.new_games(np.ones(n_games, dtype=bool))
+
+# ============================ NEW GAME ===============================
+
+    def new_games(self, mask: np.ndarray) -> None:
+        '''
+        Resets chosen games, spawns their first platforms and players on the bottom platforms
+
+        Args:
+            mask (np.ndarray): boolean mask of games to reset
+        '''
+        games = np.flatnonzero(mask)
+        k = len(games)
+
+        # reset
+        for array in (self.frame, self.score, self.world_shift, self.world_descend_speed):
+            array[games] = 0
+        self.missile_timer[games] = -1
+        self.next_collapse_frame[games] = NO_COLLAPSE
+        self.spawn_missiles[games] = False
+        self.spawn_collapse_platforms[games] = False
+        self.missile_spawn_frequency_down[games] = self.frequencies_down[0]
+        self.missile_spawn_frequency_up[games] = self.frequencies_up[0]
+
+        # start platform
+        start_level = settings.map_height - 1
+        self.platform_x[0, games] = 0
+        self.platform_y[0, games] = start_level * settings.tile_size
+        self.platform_width[0, games] = settings.map_width * settings.tile_size
+        self.platform_type[0, games] = PlatformTypes.normal
+        self.platform_number[0, games] = 0
+        self.platform_spawn_level[0, games] = start_level
+
+        # next platforms, each above the previous one, no collapse platforms yet
+        specs = self.start_levels(k)
+        self.level_last[:, games] = specs[:, -1]
+        map_x, height_difference, length, type = specs
+        levels = start_level - np.cumsum(height_difference, axis=0)
+        self.platform_x[1:, games] = map_x * settings.tile_size
+        self.platform_y[1:, games] = levels * settings.tile_size
+        self.platform_width[1:, games] = length * settings.tile_size
+        self.platform_type[1:, games] = np.where(
+            type == PlatformTypes.collapse, PlatformTypes.normal, type)
+        self.platform_number[1:, games] = np.arange(1, self.platform_count)[:, None]
+        self.platform_spawn_level[1:, games] = levels
+
+        type = self.platform_type[:, games]
+        self.platform_max_x[:, games] = settings.screen_width - \
+            self.platform_width[:, games]
+        self.platform_turn[:, games] = self.platform_max_x[:, games] * \
+            settings.horizontal_platform_speed
+        self.platform_peak_y[:, games] = self.platform_y[:, games]
+        self.platform_vx[:, games] = np.where(
+            type == PlatformTypes.horizontal, settings.horizontal_platform_speed, 0)
+        self.platform_vy[:, games] = np.where(
+            type == PlatformTypes.vertical, -settings.vertical_platform_speed, 0)
+        self.platform_level[:, games] = 0
+        self.platform_collapse_frame[:, games] = NO_COLLAPSE
+
+        # player
+        self.player_x[games] = round(
+            settings.start_pos[0] * settings.tile_size)
+        self.player_y[games] = round(
+            settings.start_pos[1] * settings.tile_size) - settings.player_dimensions[1]
+        self.player_dx[games] = 0
+        self.player_dy[games] = 0
+
+        self.missile_y[:, games] = NO_MISSILE
+
+    def start_levels(self, k: int) -> np.ndarray:
+        '''
+        Takes first platforms of new levels. Levels are started ahead, LEVEL_STARTS (or more) of them at once
+
+        Args:
+            k (int): number of levels
+
+        Returns:
+            np.ndarray: first platforms of levels - map x, height difference, length and PlatformTypes code,
+                shape (4, platform_count - 1, k)
+        '''
+        if self.level_starts.shape[2] - self.level_starts_taken < k:
+            count = max(LEVEL_STARTS, k)
+            self.level_starts = np.zeros((4, self.platform_count - 1, count), dtype=np.int32)
+            previous = np.array([start_platform.map_x, start_platform.height_difference, start_platform.length,
+                                 PlatformTypes.names.index(start_platform.type)], dtype=np.int32)[:, None]
+            for row in range(self.platform_count - 1):
+                previous = self.level_starts[:, row] = self.generate_platforms(
+                    np.broadcast_to(previous, (4, count)))
+            self.level_starts_taken = 0
+        self.level_starts_taken += k
+        return self.level_starts[:, :, self.level_starts_taken - k:self.level_starts_taken]
+
+    def generate_platforms(self, previous: np.ndarray) -> np.ndarray:
+        '''
+        Generates platforms of levels, each reachable from the previous one, with the rules of
+        LevelGenerator.build_chunk - a platform is drawn again when it can't be reached (only these are drawn
+        in the next pass), after settings.level_attempts draws it's put right above the previous one, as low as possible
+
+        Args:
+            previous (np.ndarray): the previous platforms - map x, height difference, length and PlatformTypes code,
+                shape (4, k)
+
+        Returns:
+            np.ndarray: the next platforms, shape (4, k)
+        '''
+        platforms = np.empty_like(previous)
+        pending = np.arange(previous.shape[1])
+        for _ in range(settings.level_attempts):
+            count = len(pending)
+            candidates = np.stack((
+                self.rng.integers(0, settings.map_width - 2, count, dtype=np.int32),
+                self.rng.integers(settings.platform_height_difference[0],
+                                  settings.platform_height_difference[1] + 1, count, dtype=np.int32),
+                self.rng.integers(settings.platform_length[0], settings.platform_length[1] + 1, count, dtype=np.int32),
+                self.type_codes[self.rng.integers(len(self.type_codes), size=count)]))
+            platforms[:, pending] = candidates
+            pending = pending[~reachable(previous[:, pending], candidates, self.reach)]
+            if not len(pending):
+                return platforms
+
+        # the last draw keeps its length
+        platforms[0, pending] = np.minimum(previous[0, pending], settings.map_width - 3)
+        platforms[1, pending] = settings.platform_height_difference[0]
+        platforms[3, pending] = PlatformTypes.normal
+        return platforms
+
+    def map_level(self, games: np.ndarray, slots: np.ndarray) -> np.ndarray:
+        '''
+        Computes platforms' current map levels - a platform moves one level down whenever it passes the next tile border
+
+        Args:
+            games (np.ndarray): indices of games
+            slots (np.ndarray): platforms' slots
+
+        Returns:
+            np.ndarray: platforms' map levels
+        '''
+        return np.maximum(self.platform_spawn_level[slots, games], -(-self.platform_peak_y[slots, games] // settings.tile_size) - 1)
+
+# ================== MISSILE AND PLATFORM SPAWN ===================
+
+    def missile_queue(self, games: np.ndarray) -> None:
+        '''
+        Sets timers for a single missile spawn in chosen games
+
+        Args:
+            games (np.ndarray): indices of games
+        '''
+        ms = self.rng.integers(
+            self.missile_spawn_frequency_down[games], self.missile_spawn_frequency_up[games] + 1)
+        self.missile_timer[games] = np.maximum(
+            1, np.rint(ms * settings.physics_fps / 1000))
+
+    def spawn_missile(self, games: np.ndarray) -> None:
+        '''
+        Spawns a missile on random x position, 100 pixels above screen in chosen games (if they have a free slot)
+
+        Args:
+            games (np.ndarray): indices of games
+        '''
+        free = self.missile_y[:, games] < NO_MISSILE // 2
+        games, slots = games[free.any(axis=0)], free.argmax(axis=0)[
+            free.any(axis=0)]
+        self.missile_x[slots, games] = self.rng.integers(
+            0, settings.screen_width - settings.missile_dimensions[0] + 1, len(games))
+        self.missile_y[slots, games] = -100
+
+    def generate_new_platform(self, games: np.ndarray, slots: np.ndarray) -> None:
+        '''
+        Generates the next platform of the level above the current highest platform in chosen games
+
+        Args:
+            games (np.ndarray): indices of games
+            slots (np.ndarray): slots of removed platforms to put new platforms in
+        '''
+        k = len(games)
+        numbers = self.platform_number[:, games]
+        numbers[slots, np.arange(k)] = -1
+        top = numbers.argmax(axis=0)
+        top_level = self.map_level(games, top)
+        top_number = self.platform_number[top, games]
+
+        specs = self.generate_platforms(self.level_last[:, games])
+        self.level_last[:, games] = specs
+        map_x, height_difference, length, type = specs
+        type = np.where((type == PlatformTypes.collapse) & ~self.spawn_collapse_platforms[games],
+                        PlatformTypes.normal, type)
+        level = top_level - height_difference
+
+        self.platform_x[slots, games] = map_x * settings.tile_size
+        self.platform_y[slots, games] = level * settings.tile_size
+        self.platform_width[slots, games] = length * settings.tile_size
+        self.platform_type[slots, games] = type
+        self.platform_number[slots, games] = top_number + 1
+        self.platform_spawn_level[slots, games] = level
+
+        self.platform_max_x[slots, games] = settings.screen_width - \
+            self.platform_width[slots, games]
+        self.platform_turn[slots, games] = self.platform_max_x[slots, games] * \
+            settings.horizontal_platform_speed
+        self.platform_peak_y[slots, games] = self.platform_y[slots, games]
+        self.platform_vx[slots, games] = np.where(
+            type == PlatformTypes.horizontal, settings.horizontal_platform_speed, 0)
+        self.platform_vy[slots, games] = np.where(
+            type == PlatformTypes.vertical, -settings.vertical_platform_speed, 0)
+        self.platform_level[slots, games] = 0
+        self.platform_collapse_frame[slots, games] = NO_COLLAPSE
+
+    def manage_platforms_and_missiles(self) -> None:
+        '''
+        Removes lowest platforms and missiles if they are below the screen, spawns new platforms
+        '''
+        games = np.flatnonzero(
+            (self.platform_y > settings.screen_height).any(axis=0))
+        if len(games):
+            bottom = self.platform_number[:, games].argmin(axis=0)
+            below = self.platform_y[bottom, games] > settings.screen_height
+            self.generate_new_platform(games[below], bottom[below])
+
+        self.missile_y[self.missile_y >
+                       settings.screen_height] = NO_MISSILE
+
+    def platform_collapse(self, games: np.ndarray, slots: np.ndarray) -> None:
+        '''
+        Removes collapsed platforms, spawns new ones instead
+
+        Args:
+            games (np.ndarray): indices of games
+            slots (np.ndarray): slots of collapsed platforms
+        '''
+        # games with several platforms collapsing in the same frame replace them one by one
+        while len(games):
+            first_games, first = np.unique(games, return_index=True)
+            self.generate_new_platform(first_games, slots[first])
+            rest = np.ones(len(games), dtype=bool)
+            rest[first] = False
+            games, slots = games[rest], slots[rest]
+
+    def run_timers(self) -> None:
+        '''
+        Counts down frame timers, collapses platforms and spawns missiles when their time comes
+        '''
+        # only games which may have a collapse due are searched
+        games = np.flatnonzero(self.next_collapse_frame <= self.frame)
+        if len(games):
+            slots, columns = np.nonzero(
+                self.platform_collapse_frame[:, games] <= self.frame[games])
+            self.platform_collapse(games[columns], slots)
+            self.next_collapse_frame[games] = self.platform_collapse_frame[:, games].min(
+                axis=0)
+
+        self.missile_timer[self.missile_timer > 0] -= 1
+        spawned = self.missile_timer == 0
+        self.missile_timer[spawned] = -1
+        spawned = np.flatnonzero(spawned & self.spawn_missiles)
+        if len(spawned):
+            self.spawn_missile(spawned)
+            self.missile_queue(spawned)
+
+# ========================== MOVEMENT ===========================
+
+    def scroll_y(self) -> None:
+        '''
+        Scrolls the screens vertically where players are above certain screen level
+        '''
+        scrolls = (self.player_y < settings.scroll_border) & (
+            self.player_dy < 0)
+        self.world_shift = np.where(
+            scrolls, settings.scroll_speed, 0).astype(np.int32)
+        self.player_y += self.world_shift
+        self.missile_y += self.world_shift
+
+        # world starts descending, missiles spawn, collapse platforms spawn only after first scroll
+        first = np.flatnonzero(scrolls & (self.world_descend_speed == 0))
+        if len(first):
+            self.world_descend_speed[first] = self.descend_speeds[0]
+            self.missile_queue(first)
+            self.spawn_missiles[first] = True
+            self.spawn_collapse_platforms[first] = True
+
+    def platform_type_action(self, games: np.ndarray, slots: np.ndarray) -> None:
+        '''
+        Performs special platform actions depending on type
+
+        Args:
+            games (np.ndarray): indices of games where players landed
+            slots (np.ndarray): slots of platforms players landed on
+        '''
+        type = self.platform_type[slots, games]
+
+        bounce = games[type == PlatformTypes.bounce]
+        self.player_dy[bounce] = settings.bounce_speed
+
+        collapse = (type == PlatformTypes.collapse) & (
+            self.platform_collapse_frame[slots, games] == NO_COLLAPSE)
+        collapse_games = games[collapse]
+        collapse_frame = self.frame[collapse_games] + \
+            max(1, round(settings.collapse_duration * settings.physics_fps / 1000))
+        self.platform_collapse_frame[slots[collapse],
+                                     collapse_games] = collapse_frame
+        self.next_collapse_frame[collapse_games] = np.minimum(
+            self.next_collapse_frame[collapse_games], collapse_frame)
+
+        # moving platforms carry the player (speeds of other types are 0)
+        self.player_x[games] += self.platform_vx[slots, games]
+        self.player_y[games] += self.platform_vy[slots, games]
+
+    def vertical_movement_and_collision(self) -> None:
+        '''
+        Applies gravity to the players, makes players land on platforms (and then performs special platform actions)
+        '''
+        self.player_dy += settings.gravity
+        y = self.player_y + self.player_dy
+        self.player_y = np.trunc(y + np.copysign(0.5, y)).astype(np.int32)  # pygame.Rect rounding
+
+        # platforms which tops are between player's feet in the previous and in this frame
+        bottom = self.player_y + settings.player_dimensions[1]
+        previous_bottom = np.where(self.player_dy > 0, np.ceil(
+            bottom - self.player_dy - 1), np.iinfo(np.int32).max).astype(np.int32)
+        crossed = (self.platform_y <= bottom) & (
+            self.platform_y >= previous_bottom)
+        games = np.flatnonzero(crossed.any(axis=0))
+        if not len(games):
+            return
+
+        left = self.player_x[games]
+        right = left + settings.player_dimensions[0]
+        bottom = bottom[games]
+        platform_top = self.platform_y[:, games]
+        platform_left = self.platform_x[:, games]
+        platform_right = platform_left + self.platform_width[:, games]
+
+        stands = (platform_top == bottom) & (right >= platform_left) & (
+            left <= platform_right)
+        # swept - crossed platforms don't have to overlap the player vertically, so fast falls don't tunnel through
+        collides = (left < platform_right) & (right > platform_left) & (bottom > platform_top)
+        lands = crossed[:, games] & (collides | stands)
+
+        # player lands on the first platform (in order of spawning) of those colliding
+        landed = lands.any(axis=0)
+        games, lands = games[landed], lands[:, landed]
+        if not len(games):
+            return
+        slots = np.where(lands, self.platform_number[:, games], np.iinfo(
+            np.int32).max).argmin(axis=0)
+        self.player_y[games] = self.platform_y[slots,
+                                               games] - settings.player_dimensions[1]
+        self.player_dy[games] = 0
+        self.score[games] = np.maximum(
+            self.score[games], self.platform_number[slots, games])
+        self.platform_type_action(games, slots)
+
+    def horizontal_movement(self) -> None:
+        '''
+        Changes players' horizontal positions
+        '''
+        self.player_x += self.player_dx * settings.horizontal_speed
+
+    def player_input(self, inputs: np.ndarray) -> None:
+        '''
+        Sets players' movement based on input
+
+        Args:
+            inputs (np.ndarray): players' bit flags from Keys
+        '''
+        self.player_dx = np.where(inputs & Keys.right, 1,
+                                  np.where(inputs & Keys.left, -1, 0)).astype(np.int32)
+        jumps = (inputs & Keys.jump).astype(bool) & (self.player_dy == 0)
+        self.player_dy[jumps] = settings.jump_speed
+
+    def player_update(self) -> None:
+        '''
+        Updates players' positions
+        '''
+        self.player_y += self.world_descend_speed
+
+    def platforms_update(self) -> None:
+        '''
+        Updates platforms' positions
+        '''
+        self.platform_y += self.world_shift + self.world_descend_speed
+        np.maximum(self.platform_peak_y, self.platform_y,
+                   out=self.platform_peak_y)
+
+        # move horizontally in screen width's range
+        self.platform_x += self.platform_vx
+        # turn back at screen edges - x <= 0 moving left or x >= max_x moving right
+        turns = 2 * self.platform_x
+        turns -= self.platform_max_x
+        turns *= self.platform_vx
+        np.negative(self.platform_vx, out=self.platform_vx,
+                    where=turns >= self.platform_turn)
+
+        # move vertically in certain range
+        self.platform_level += self.platform_vy
+        self.platform_y += self.platform_vy
+        turns = np.abs(self.platform_level, out=turns)
+        np.negative(self.platform_vy, out=self.platform_vy,
+                    where=turns >= settings.vertical_platform_range)
+
+    def missiles_update(self) -> None:
+        '''
+        Updates missiles' positions
+        '''
+        self.missile_dy = self.world_descend_speed + settings.missile_speed
+        self.missile_y += self.missile_dy
+
+# ========================= GAME DIFFICULTY =======================
+
+    def adjust_game_difficulty(self) -> None:
+        '''
+        Adjusts games' difficulty based on current scores
+        '''
+        difficulty = np.searchsorted(self.thresholds, self.score, side='right')
+        games = np.flatnonzero(difficulty > 0)
+        difficulty = difficulty[games]
+        self.world_descend_speed[games] = self.descend_speeds[difficulty]
+        self.missile_spawn_frequency_down[games] = self.frequencies_down[difficulty]
+        self.missile_spawn_frequency_up[games] = self.frequencies_up[difficulty]
+
+# ========================= GAME OVER ============================
+
+    def game_over(self) -> np.ndarray:
+        '''
+        Tells which games are over
+
+        Returns:
+            np.ndarray: boolean mask of games which are over
+        '''
+        game_over = ((self.player_x + settings.player_dimensions[0] < 0) | (self.player_x > settings.screen_width) |
+                     (self.player_y + settings.player_dimensions[1] >= settings.screen_height))
+
+        # missiles' movement relative to the players in the last frame (scrolling moves both)
+        dx = self.previous_player_x - self.player_x
+        dy = self.missile_dy - (self.player_y - self.world_shift - self.previous_player_y)
+
+        # missiles which may have been at player's height during the frame
+        reach = np.abs(dy)
+        level = (self.missile_y > self.player_y - settings.missile_dimensions[1] - reach) & (
+            self.missile_y < self.player_y + settings.player_dimensions[1] + reach)
+        games = np.flatnonzero(level.any(axis=0))
+        missile_x, missile_y = self.missile_x[:, games], self.missile_y[:, games]
+        left, top, dx, dy = self.player_x[games], self.player_y[games], dx[games], dy[games]
+        width, height = settings.player_dimensions
+        missile_width, missile_height = settings.missile_dimensions
+
+        # missiles which hit the player - overlapping it, or passing through it during the frame
+        overlaps = (missile_x > left - missile_width) & (missile_x < left + width) & \
+            (missile_y > top - missile_height) & (missile_y < top + height)
+        start_y = missile_y - dy
+        passed = ((start_y + missile_height <= top) & (missile_y >= top + height)) | \
+            ((start_y >= top + height) & (missile_y + missile_height <= top))
+        entry_x, exit_x = swept_interval(missile_x - dx, missile_width, left, width, dx)
+        entry_y, exit_y = swept_interval(start_y, missile_height, top, height, dy)
+        entry, exit = np.maximum(entry_x, entry_y), np.minimum(exit_x, exit_y)
+        swept = passed & (entry < exit) & (entry < 1) & (exit > 0)
+        game_over[games] |= (level[:, games] & (overlaps | swept)).any(axis=0)
+        return game_over
+
+# ============================= STEP ==============================
+
+    def step(self, inputs: Union[int, np.ndarray] = 0) -> np.ndarray:
+        '''
+        Simulates one frame of all games, restarts games which ended in the previous step
+
+        Args:
+            inputs (Union[int, np.ndarray]): players' bit flags from Keys - one for all games or one per game
+
+        Returns:
+            np.ndarray: boolean mask of games which are over after this frame
+        '''
+        if self.done.any():
+            self.new_games(self.done)
+        inputs = np.broadcast_to(np.asarray(inputs, dtype=np.int32), (self.n,))
+
+        self.frame += 1
+        self.previous_player_x = self.player_x.copy()
+        self.previous_player_y = self.player_y.copy()
+        self.run_timers()
+        self.player_input(inputs)
+
+        # players
+        self.horizontal_movement()
+        self.vertical_movement_and_collision()
+        self.player_update()
+
+        # platforms and missiles
+        self.manage_platforms_and_missiles()
+        self.platforms_update()
+        self.missiles_update()
+
+        # scroll screens
+        self.scroll_y()
+
+        # adjust game difficulty based on current scores
+        self.adjust_game_difficulty()
+
+        self.done = self.game_over()
+        self.final_score[self.done] = self.score[self.done]
+        self.final_frame[self.done] = self.frame[self.done]
+        self.games_finished += int(self.done.sum())
+        return self.done
+
+
+def bounce_bot(batch: BatchEngine, inputs: np.ndarray) -> np.ndarray:
+    '''
+    Bounces players of all games between screen edges, jumping whenever possible
+
+    Args:
+        batch (BatchEngine): simulated games
+        inputs (np.ndarray): bot's inputs in the previous step, bit flags from Keys - changed in place
+
+    Returns:
+        np.ndarray: bot's inputs
+    '''
+    inputs[batch.player_x >= settings.screen_width - settings.tile_size -
+           settings.player_dimensions[0]] = Keys.left | Keys.jump
+    inputs[batch.player_x <= settings.tile_size] = Keys.right | Keys.jump
+    return inputs
+
+
+if __name__ == '__main__':
+    # batched headless run with a simple bot, reports simulation speed
+    parser = argparse.ArgumentParser(
+        description="Runs many headless JumPy games at once and reports simulation speed")
+    parser.add_argument('--games', type=int, default=100000,
+                        help="number of games simulated at once")
+    parser.add_argument('--frames', type=int, default=600,
+                        help="number of simulated frames")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="random number generator's seed")
+    args = parser.parse_args()
+
+    batch = BatchEngine(args.games, seed=args.seed)
+    inputs = np.full(args.games, Keys.right | Keys.jump)
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        batch.step(bounce_bot(batch, inputs))
+    elapsed = time.perf_counter() - start
+
+    steps = args.games * args.frames
+    print(f"{steps} game steps in {elapsed:.2f} s ({steps / elapsed / 1000:.0f} game steps/ms), "
+          f"{batch.games_finished} games finished")
@@ -0,0 +1,270 @@
+'''
+Module with benchmarks of the game loop and renderer. Scripted games are played with SDL's dummy video driver
+at every game difficulty level, with many missiles and with many platforms. Headless games are also stepped
+all at once by BatchEngine, to keep its throughput in check. Results are saved as JSON baselines
+and compared with each other to find regressions
+
+Usage:
+    python bench.py run -o results.json
+    python bench.py compare baseline.json results.json --threshold 10
+'''
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+import pygame
+
+import settings
+from batch import BatchEngine, bounce_bot
+from fonts import load_fonts
+from game import Game
+from player import Keys
+from profiler import percentile
+
+# scenario name -> game difficulty level and overridden settings, or number of games stepped at once by BatchEngine
+scenarios = {f'difficulty_{level}': {'difficulty': level, 'settings': {}}
+             for level in range(len(settings.game_difficulty))}
+scenarios['missile_heavy'] = {'difficulty': len(settings.game_difficulty) - 1, 'settings': {
+    'game_difficulty': [dict(difficulty, missile_spawn_frequency_down=50, missile_spawn_frequency_up=100)
+                        for difficulty in settings.game_difficulty]}}
+scenarios['many_platforms'] = {'difficulty': 0,
+                               'settings': {'platform_count': 4 * settings.platform_count}}
+scenarios['batch'] = {'batch_games': 10000, 'settings': {}}
+
+
+class BenchGame(Game):
+    '''
+    BenchGame is a game played by a bot at a fixed difficulty level, restarted whenever it's over
+
+    Args:
+        surface (pygame.Surface): game screen
+        logo (pygame.Surface): game logo
+        fonts (Dict[str, pygame.font.Font]): dictionary of fonts
+        difficulty (int): game difficulty level
+
+    Attributes:
+        difficulty (int): game difficulty level
+        next_seed (int): seed of the next game
+        inputs (int): bot's input, bit flags from Keys
+    '''
+
+    def __init__(self, surface: pygame.Surface, logo: pygame.Surface, fonts: Dict[str, pygame.font.Font], difficulty: int) -> None:
+        super().__init__(surface, logo, fonts)
+        self.difficulty = difficulty
+        self.read_input = self.bot_input
+        self.next_seed = 0
+
+    def start(self) -> None:
+        '''
+        Starts a new game at the fixed difficulty, with missiles and collapse platforms from the beginning
+        '''
+        self.new_game(self.next_seed)
+        self.next_seed += 1
+        self.inputs = Keys.right | Keys.jump
+        self.set_game_difficulty(settings.game_difficulty[self.difficulty])
+        self.spawn_missiles = True
+        self.spawn_collapse_platforms = True
+        self.missile_queue()
+
+    def adjust_game_difficulty(self) -> None:
+        '''
+        Keeps the fixed difficulty
+        '''
+
+    def bot_input(self) -> int:
+        '''
+        Bounces between screen edges, jumping whenever possible
+
+        Returns:
+            int: bit flags from Keys
+        '''
+        player = self.player.sprite
+        if player.rect.right >= settings.screen_width - settings.tile_size:
+            self.inputs = Keys.left | Keys.jump
+        elif player.rect.left <= settings.tile_size:
+            self.inputs = Keys.right | Keys.jump
+        return self.inputs
+
+
+def run_scenario(name: str, frames: int, screen: pygame.Surface, logo: pygame.Surface, fonts: Dict[str, pygame.font.Font]) -> Dict[str, float]:
+    '''
+    Plays scripted games of a scenario and measures frames, each one with game update, drawing and display update
+
+    Args:
+        name (str): scenario name
+        frames (int): number of measured frames
+        screen (pygame.Surface): game screen
+        logo (pygame.Surface): game logo
+        fonts (Dict[str, pygame.font.Font]): dictionary of fonts
+
+    Returns:
+        Dict[str, float]: frames per second and percentiles of frame times in milliseconds
+    '''
+    scenario = scenarios[name]
+    if 'batch_games' in scenario:
+        return run_batch(scenario['batch_games'], frames)
+    with settings.overridden_settings(scenario['settings']):
+        game = BenchGame(screen, logo, fonts, scenario['difficulty'])
+        game.start()
+        frame_times = []
+        games = 1
+        start = time.perf_counter()
+        for _ in range(frames):
+            frame_start = time.perf_counter()
+            game.run()
+            pygame.display.update(game.display.pop_dirty_rects())
+            frame_times.append(time.perf_counter() - frame_start)
+            if game.state != game.States.active:
+                game.start()
+                games += 1
+        elapsed = time.perf_counter() - start
+
+    frame_times.sort()
+    return {'fps': frames / elapsed,
+            'p50_ms': 1000 * percentile(frame_times, 50),
+            'p90_ms': 1000 * percentile(frame_times, 90),
+            'p99_ms': 1000 * percentile(frame_times, 99),
+            'max_ms': 1000 * frame_times[-1],
+            'games': games}
+
+
+def run_batch(games: int, frames: int) -> Dict[str, float]:
+    '''
+    Steps headless games played by a bot all at once and measures steps - finished games are restarted,
+    so new levels are generated all the time
+
+    Args:
+        games (int): number of games stepped at once
+        frames (int): number of measured steps
+
+    Returns:
+        Dict[str, float]: steps per second, percentiles of step times in milliseconds and game steps per millisecond
+    '''
+    batch = BatchEngine(games, seed=0)
+    inputs = np.full(games, Keys.right | Keys.jump)
+    step_times = []
+    start = time.perf_counter()
+    for _ in range(frames):
+        step_start = time.perf_counter()
+        batch.step(bounce_bot(batch, inputs))
+        step_times.append(time.perf_counter() - step_start)
+    elapsed = time.perf_counter() - start
+
+    step_times.sort()
+    return {'fps': frames / elapsed,
+            'p50_ms': 1000 * percentile(step_times, 50),
+            'p90_ms': 1000 * percentile(step_times, 90),
+            'p99_ms': 1000 * percentile(step_times, 99),
+            'max_ms': 1000 * step_times[-1],
+            'games': batch.games_finished,
+            'game_steps_per_ms': games * frames / elapsed / 1000}
+
+
+def run(names: List[str], frames: int, repeat: int) -> Dict[str, object]:
+    '''
+    Runs benchmarks, keeping the best (fastest) of repeated runs of every scenario
+
+    Args:
+        names (List[str]): scenario names
+        frames (int): number of measured frames of a single run
+        repeat (int): number of runs of every scenario
+
+    Returns:
+        Dict[str, object]: benchmark results with information about machine and versions
+    '''
+    pygame.init()
+    screen = pygame.display.set_mode(
+        (settings.screen_width, settings.screen_height))
+    logo = pygame.transform.scale(pygame.image.load(
+        settings.logo_path).convert_alpha(), (settings.logo_width, settings.logo_height))
+    fonts = load_fonts()
+
+    results = {}
+    for name in names:
+        runs = [run_scenario(name, frames, screen, logo, fonts)
+                for _ in range(repeat)]
+        results[name] = max(runs, key=lambda result: result['fps'])
+        print(f"{name:<16} {results[name]['fps']:8.0f} fps   p50 {results[name]['p50_ms']:6.3f} ms   "
+              f"p99 {results[name]['p99_ms']:6.3f} ms")
+    pygame.quit()
+
+    return {'frames': frames, 'repeat': repeat, 'python': sys.version.split()[0],
+            'pygame': pygame.version.ver, 'machine': platform.platform(),
+            'video_driver': os.environ['SDL_VIDEODRIVER'], 'time': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'scenarios': results}
+
+
+def compare(baseline: Dict[str, object], results: Dict[str, object], threshold: float) -> List[str]:
+    '''
+    Compares results with baseline
+
+    Args:
+        baseline (Dict[str, object]): baseline results
+        results (Dict[str, object]): compared results
+        threshold (float): percent of allowed slowdown
+
+    Returns:
+        List[str]: descriptions of regressions, empty if there are none
+    '''
+    regressions = []
+    for name, result in results['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+        # fps should not drop, frame times should not grow
+        changes = {'fps': 100 * (base['fps'] - result['fps']) / base['fps']}
+        for metric in ('p50_ms', 'p99_ms'):
+            changes[metric] = 100 * (result[metric] -
+                                     base[metric]) / max(base[metric], 1e-9)
+        for metric, change in changes.items():
+            flag = 'REGRESSION' if change > threshold else ''
+            print(f"{name:<16} {metric:<7} {base[metric]:10.3f} -> {result[metric]:10.3f} "
+                  f"({-change if metric == 'fps' else change:+6.1f}%) {flag}")
+            if flag:
+                regressions.append(f"{name} {metric} worse by {change:.1f}%")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Benchmarks JumPy game loop and renderer")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="run benchmarks")
+    run_parser.add_argument('-o', '--output', help="save results to a JSON file")
+    run_parser.add_argument('--frames', type=int, default=3000,
+                            help="measured frames of every scenario")
+    run_parser.add_argument('--repeat', type=int, default=3,
+                            help="runs of every scenario, the best one counts")
+    run_parser.add_argument('--scenarios', nargs='+', choices=list(scenarios), default=list(scenarios),
+                            help="scenarios to run")
+    compare_parser = commands.add_parser(
+        'compare', help="compare results with a baseline")
+    compare_parser.add_argument('baseline', help="baseline results file")
+    compare_parser.add_argument('results', help="compared results file")
+    compare_parser.add_argument('--threshold', type=float, default=10,
+                                help="percent of allowed slowdown")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run(args.scenarios, args.frames, args.repeat)
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(results, file, indent=1)
+    else:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        with open(args.results) as file:
+            results = json.load(file)
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold}%")
+            sys.exit(1)
+        print("no regressions")
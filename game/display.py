@@ -1,70 +1,551 @@
+import math
 import pygame
-from typing import Dict
+import weakref
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 import settings
 import scoreboard
+from atlas import atlas
+from platforms import Platform
+
+
+def interpolate(previous: int, current: int, alpha: float) -> int:
+    '''
+    Interpolates a coordinate between two ticks, rounding halves up - so coordinates moved together stay together
+
+    Args:
+        previous (int): coordinate before the last tick
+        current (int): coordinate after the last tick
+        alpha (float): progress from previous to current coordinate
+
+    Returns:
+        int: interpolated coordinate
+    '''
+    return math.floor(previous + (current - previous) * alpha + 0.5)
+
+
+class TextCache:
+    '''
+    TextCache keeps the least recently used rendered text surfaces, so the same text isn't rasterized again
+
+    Args:
+        size (int): maximal number of kept surfaces
+
+    Attributes:
+        size (int): maximal number of kept surfaces
+        surfaces (OrderedDict[Tuple[pygame.font.Font, str, str], pygame.Surface]): rendered surfaces by (font, text, color), least recently used first
+        hits (int): number of renders served from cache
+        misses (int): number of renders which rasterized text
+    '''
+
+    def __init__(self, size: int = 128) -> None:
+        self.size = size
+        self.surfaces: OrderedDict[Tuple[pygame.font.Font, str, str], pygame.Surface] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font: pygame.font.Font, text: str, color: str) -> pygame.Surface:
+        '''
+        Renders antialiased text or gets it from cache
+
+        Args:
+            font (pygame.font.Font): font to render text with
+            text (str): text to render
+            color (str): text color
+
+        Returns:
+            pygame.Surface: rendered text
+        '''
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def info(self) -> str:
+        '''
+        Describes cache usage in a short line, shown on the profiler's HUD
+
+        Returns:
+            str: numbers of hits, misses and kept surfaces
+        '''
+        return f"text hit {self.hits} miss {self.misses} kept {len(self.surfaces)}/{self.size}"
+
+
+class WorldCanvas:
+    '''
+    WorldCanvas is a tall strip static platforms (normal, bounce and collapse ones) are composited on once, when they
+    come within its reach. The strip covers settings.world_canvas_height pixels of the world around the screen as
+    a ring - rows the world scrolls past are cleared and reused above. Frames show a viewport of the strip instead of
+    drawing every static platform. World y is fixed to static platforms, its offset from screen y is taken from
+    a platform already on the strip - with none left (e.g. in a new game) the world stays where it was,
+    when it jumps back (e.g. to a restored snapshot) the strip starts over. Strip and viewport positions add up to
+    sprites' positions only on surfaces scaled by a whole number, other ones draw static platforms as sprites
+
+    Args:
+        display (Display): display drawing to the surface the canvas is shown on
+
+    Attributes:
+        display (Display): display drawing to the surface the canvas is shown on
+        height (int): height of the strip in world pixels
+        surface (pygame.Surface): the strip, in display surface's scale
+        entries (Dict[Platform, Tuple[pygame.Rect, pygame.Surface, pygame.Rect, pygame.Rect]]): platforms on the strip -
+            their rects and images when composited, their world regions and strip regions (not wrapped around)
+        offset (int): screen y of world's y = 0 in the last tick
+        top (int): world y of the highest row the strip covers
+        view (Optional[int]): surface y of world's y = 0 in the last frame, None before the first one
+        changed (List[pygame.Rect]): surface regions changed on the strip by the last update
+    '''
+    static_types = ('normal', 'bounce', 'collapse')
+
+    def __init__(self, display: 'Display') -> None:
+        self.display = display
+        self.height = settings.world_canvas_height
+        self.surface = pygame.Surface((display.surface.get_width(), round(self.height * display.scale)),
+                                      0, display.surface)
+        self.entries: Dict[Platform, Tuple[pygame.Rect, pygame.Surface, pygame.Rect, pygame.Rect]] = {}
+        self.offset = 0
+        self.top = -self.margin()
+        self.view = None
+        self.changed: List[pygame.Rect] = []
+        self.surface.fill(settings.background_color)
+
+    def clear(self, rect: pygame.Rect) -> None:
+        '''
+        Fills a strip region with background color
+
+        Args:
+            rect (pygame.Rect): strip region, not wrapped around
+        '''
+        height = self.surface.get_height()
+        row = rect.y % height
+        first = min(rect.height, height - row)
+        self.surface.fill(settings.background_color, (rect.x, row, rect.width, first))
+        if first < rect.height:
+            self.surface.fill(settings.background_color, (rect.x, 0, rect.width, rect.height - first))
+
+    def composite(self, image: pygame.Surface, rect: pygame.Rect) -> None:
+        '''
+        Draws a platform's image on the strip
+
+        Args:
+            image (pygame.Surface): platform's image in screen size
+            rect (pygame.Rect): strip region of the platform, not wrapped around
+        '''
+        height = self.surface.get_height()
+        row = rect.y % height
+        image = self.display.scaled(image)
+        self.surface.blit(image, (rect.x, row))
+        if row + rect.height > height:
+            self.surface.blit(image, (rect.x, row - height))
+
+    def show(self, rect: pygame.Rect) -> None:
+        '''
+        Draws a region of the viewport to display's surface
+
+        Args:
+            rect (pygame.Rect): surface region
+        '''
+        rect = rect.clip(self.display.surface.get_rect())
+        if not rect:
+            return
+        height = self.surface.get_height()
+        row = (rect.y - self.view) % height
+        first = min(rect.height, height - row)
+        self.display.surface.blit(self.surface, rect.topleft, (rect.x, row, rect.width, first))
+        if first < rect.height:
+            self.display.surface.blit(self.surface, (rect.x, rect.y + first),
+                                      (rect.x, 0, rect.width, rect.height - first))
+
+    def follow(self, platforms: pygame.sprite.Group, alpha: float,
+               previous_positions: Optional[Dict[pygame.sprite.Sprite, Tuple[pygame.Rect, int, int]]]) -> bool:
+        '''
+        Finds where the world is - its offset from screen y after the last tick and the viewport in this frame,
+        recycles rows the world scrolled past
+
+        Args:
+            platforms (pygame.sprite.Group): group of current platforms in the game
+            alpha (float): progress from previous to current positions
+            previous_positions (Optional[Dict[pygame.sprite.Sprite, Tuple[pygame.Rect, int, int]]]): sprites' rects and
+                positions before the last tick
+
+        Returns:
+            bool: True if the viewport moved or the strip started over, so all of it changed
+        '''
+        reference = world = None
+        for platform, (rect, image, world, _) in self.entries.items():
+            if (platform.rect is rect and platform.image is image and platforms.has_internal(platform)
+                    and rect.x == world.x):
+                reference = platform
+                break
+        # with no platform to follow (e.g. in a new game) the world stays where it was
+        offset = self.offset if reference is None else reference.rect.y - world.y
+        started_over = offset < self.offset
+        if started_over:
+            self.entries = {}
+            self.top = -offset - self.margin()
+            self.surface.fill(settings.background_color)
+        self.offset = offset
+        scale = self.display.scale
+
+        # rows the world scrolled past are reused above, a few every frame
+        top = -offset - self.margin()
+        if top < self.top:
+            start = round(top * scale)
+            end = round(min(self.top, top + self.height) * scale)
+            self.clear(pygame.Rect(0, start, self.surface.get_width(), end - start))
+            self.top = top
+
+        # viewport is interpolated like sprites are
+        view = offset
+        if reference is not None and alpha < 1 and previous_positions:
+            previous = previous_positions.get(reference)
+            if previous is not None and previous[0] is reference.rect:
+                view = interpolate(previous[2] - world.y, offset, alpha)
+        view = round(view * scale)
+        moved = started_over or view != self.view
+        self.view = view
+        self.changed = []
+        return moved
+
+    def margin(self) -> int:
+        '''
+        Gets how far the strip reaches above (and below) the screen
+
+        Returns:
+            int: margin in world pixels
+        '''
+        return (self.height - settings.screen_height) // 2
+
+    def update(self, platforms: pygame.sprite.Group) -> None:
+        '''
+        Brings the strip up to date with platforms, after follow - erases platforms which are gone or were reset
+        and composites platforms which came within strip's reach. Platforms below the viewport are left out
+
+        Args:
+            platforms (pygame.sprite.Group): group of current platforms in the game
+        '''
+        scale = self.display.scale
+        offset = self.offset
+        # the world only scrolls up, rows below the viewport are never shown again
+        bottom = self.display.surface.get_height() - self.view
+
+        erased = []
+        for platform, (rect, image, world, strip) in list(self.entries.items()):
+            if world.top < self.top or world.bottom > self.top + self.height or strip.top >= bottom:
+                del self.entries[platform]
+            elif (platform.rect is not rect or platform.image is not image or not platforms.has_internal(platform)
+                  or rect.x != world.x or rect.y - offset != world.y):
+                del self.entries[platform]
+                self.clear(strip)
+                erased.append(strip)
+        for strip in erased:
+            for _, image, _, other in self.entries.values():
+                if other.colliderect(strip):
+                    self.composite(image, other)
+
+        changed = erased
+        for platform in platforms:
+            if platform.type in self.static_types and platform not in self.entries:
+                world = platform.rect.move(0, -offset)
+                if world.top < self.top or world.bottom > self.top + self.height or round(world.y * scale) >= bottom:
+                    continue
+                strip = pygame.Rect(round(world.x * scale), round(world.y * scale),
+                                    max(1, round(world.width * scale)), max(1, round(world.height * scale)))
+                self.composite(platform.image, strip)
+                self.entries[platform] = (platform.rect, platform.image, world, strip)
+                changed.append(strip)
+        self.changed = [strip.move(0, self.view) for strip in changed]
+
+    def rects(self) -> List[pygame.Rect]:
+        '''
+        Gets surface regions of platforms on the strip shown in the viewport
+
+        Returns:
+            List[pygame.Rect]: surface regions
+        '''
+        bounds = self.display.surface.get_rect()
+        rects = []
+        for _, _, _, strip in self.entries.values():
+            rect = strip.move(0, self.view)
+            if rect.colliderect(bounds):
+                rects.append(rect)
+        return rects
 
 
 class Display:
     '''
-    Display object has fields and methods to draw objects to the screen and display different game states
+    Display object has fields and methods to draw objects to the screen and display different game states.
+    Objects are placed in screen coordinates, a surface smaller than the screen is drawn on scaled down
 
     Args:
-        surface (pygame.Surface): game screen
+        surface (pygame.Surface): game screen, or smaller surface to render to (see Presenter)
         logo (pygame.Surface): game logo
         fonts (Dict[str, pygame.font.Font]): dictionary of fonts
 
     Attributes:
-        surface (pygame.Surface): game screen
+        surface (pygame.Surface): game screen, or smaller surface to render to
         logo (pygame.Surface): game logo
         fonts (Dict[str, pygame.font.Font]): dictionary of fonts
+        scale (float): surface size relative to screen size
+        scaled_images (weakref.WeakKeyDictionary): images scaled to surface, by their originals
+        dirty_rects (List[pygame.Rect]): surface regions changed since they were last presented
+        drawn_rects (List[pygame.Rect]): surface regions covered by game objects in the last game frame, static platforms excluded
+        static_rects (List[pygame.Rect]): surface regions covered by static platforms in the last game frame
+        static_sprites (bool): tells if static platforms were drawn as sprites in the last game frame, not shown from canvas
+        canvas (Optional[WorldCanvas]): strip static platforms are composited on, None if surface's scale isn't
+            a whole number
+        full_redraw (bool): tells if the next game frame has to redraw the whole screen
+        drawn_score (int): score drawn in the last game frame, None if not drawn
+        score_rect (pygame.Rect): screen region covered by score in the last game frame, None if not drawn
+        text_cache (TextCache): cache of rendered texts
     '''
 
     def __init__(self, surface: pygame.Surface, logo: pygame.Surface, fonts: Dict[str, pygame.font.Font]) -> None:
         self.surface = surface
         self.logo = logo
         self.fonts = fonts
+        self.scale = surface.get_width() / settings.screen_width
+        self.scaled_images = weakref.WeakKeyDictionary()
+        self.dirty_rects = []
+        self.drawn_rects = []
+        self.static_rects = []
+        self.static_sprites = False
+        # a rounded scaled position isn't the sum of rounded strip and viewport positions
+        self.canvas = WorldCanvas(self) if self.scale.is_integer() else None
+        self.full_redraw = True
+        self.drawn_score = None
+        self.score_rect = None
+        self.text_cache = TextCache()
+        atlas.convert()
+
+    def render_text(self, font: str, text: str) -> pygame.Surface:
+        '''
+        Renders text in the text color, reusing surfaces rendered before
 
-    def game(self, platforms: pygame.sprite.Group, player: pygame.sprite.GroupSingle, missiles: pygame.sprite.Group, score: int) -> None:
+        Args:
+            font (str): name of the font in fonts
+            text (str): text to render
+
+        Returns:
+            pygame.Surface: rendered text
         '''
-        Draws game objects
+        return self.text_cache.render(self.fonts[font], text, settings.player_and_text_color)
+
+    def scaled(self, image: pygame.Surface) -> pygame.Surface:
+        '''
+        Scales an image to the surface, once - later calls reuse the scaled image
+
+        Args:
+            image (pygame.Surface): image in screen size
+
+        Returns:
+            pygame.Surface: image in surface size
+        '''
+        if self.scale == 1:
+            return image
+        scaled = self.scaled_images.get(image)
+        if scaled is None:
+            size = (max(1, round(image.get_width() * self.scale)),
+                    max(1, round(image.get_height() * self.scale)))
+            if image.get_bitsize() >= 24:
+                scaled = pygame.transform.smoothscale(image, size)
+            else:
+                scaled = pygame.transform.scale(image, size)
+            self.scaled_images[image] = scaled
+        return scaled
+
+    def draw(self, image: pygame.Surface, position: Tuple[float, float]) -> pygame.Rect:
+        '''
+        Draws an image at a screen position. On a scaled surface the image is scaled once and reused
+
+        Args:
+            image (pygame.Surface): image to draw
+            position (Tuple[float, float]): screen position of image's top left corner
+
+        Returns:
+            pygame.Rect: surface region covered by the image
+        '''
+        if self.scale == 1:
+            return self.surface.blit(image, position)
+        return self.surface.blit(self.scaled(image), (round(position[0] * self.scale), round(position[1] * self.scale)))
+
+    def scale_rect(self, rect: pygame.Rect) -> pygame.Rect:
+        '''
+        Scales a screen region to the surface, covering all of its pixels
+
+        Args:
+            rect (pygame.Rect): screen region
+
+        Returns:
+            pygame.Rect: surface region
+        '''
+        if self.scale == 1:
+            return rect
+        left, top = math.floor(rect.left * self.scale), math.floor(rect.top * self.scale)
+        return pygame.Rect(left, top, math.ceil(rect.right * self.scale) - left,
+                           math.ceil(rect.bottom * self.scale) - top)
+
+    def invalidate(self) -> None:
+        '''
+        Marks the whole surface as changed, next game frame is fully redrawn
+        '''
+        self.dirty_rects = [self.surface.get_rect()]
+        self.full_redraw = True
+
+    def pop_dirty_rects(self) -> List[pygame.Rect]:
+        '''
+        Gets surface regions changed since the last call, for Presenter.present
+
+        Returns:
+            List[pygame.Rect]: changed surface regions
+        '''
+        dirty_rects, self.dirty_rects = self.dirty_rects, []
+        return dirty_rects
+
+    def game(self, platforms: pygame.sprite.Group, player: pygame.sprite.GroupSingle, missiles: pygame.sprite.Group, score: int, scrolling: bool = False,
+             alpha: float = 1.0, previous_positions: Optional[Dict[pygame.sprite.Sprite, Tuple[pygame.Rect, int, int]]] = None) -> None:
+        '''
+        Draws game objects. Static platforms are shown from the world canvas, only regions covered by other game objects
+        in this or the previous frame are redrawn and marked as changed, unless the screen is scrolling or was covered by
+        other state's drawing. When the world descends without scrolling, all static platforms move by a few pixels -
+        they are drawn as sprites then, which is cheaper than showing the whole viewport.
+        Sprites can be drawn between their previous and current positions
 
         Args:
             platforms (pygame.sprite.Group): group of current platforms in the game
             player (pygame.sprite.GroupSingle): single group containing the player
             missiles (pygame.sprite.Group): group of current missiles in the game
             score (int): current score
+            scrolling (bool): tells if the screen scrolls in this frame
+            alpha (float): progress from previous to current positions
+            previous_positions (Optional[Dict[pygame.sprite.Sprite, Tuple[pygame.Rect, int, int]]]): sprites' rects and positions
+                before the last tick, sprites with another rect now (new or reused ones) aren't interpolated
         '''
-        self.surface.fill(settings.background_color)
-        platforms.draw(self.surface)
-        player.draw(self.surface)
-        missiles.draw(self.surface)
-        self.score(score)
+        canvas = self.canvas
+        interpolate_positions = alpha < 1 and previous_positions
+        full_redraw = self.full_redraw or scrolling
+        from_canvas = False
+        if canvas is not None:
+            moved = canvas.follow(platforms, alpha if interpolate_positions else 1.0, previous_positions)
+            from_canvas = full_redraw or not moved
+            if from_canvas:
+                canvas.update(platforms)
+        if full_redraw:
+            if canvas is not None:
+                canvas.show(self.surface.get_rect())
+            else:
+                self.surface.fill(settings.background_color)
+        elif from_canvas:
+            # score is drawn on a clean background, its antialiased edges would build up otherwise
+            erased = self.drawn_rects + canvas.changed
+            if self.static_sprites:
+                erased += self.static_rects
+            if self.score_rect is not None:
+                erased.append(self.score_rect)
+            for rect in erased:
+                canvas.show(rect)
+        else:
+            for rect in self.drawn_rects + self.static_rects:
+                self.surface.fill(settings.background_color, rect)
+            if self.score_rect is not None:
+                self.surface.fill(settings.background_color, self.score_rect)
+
+        drawn_rects = []
+        static_rects = []
+        for group in (platforms, player, missiles):
+            for sprite in group:
+                static = canvas is not None and sprite in canvas.entries
+                if static and from_canvas:
+                    continue
+                position = sprite.rect
+                if interpolate_positions:
+                    previous = previous_positions.get(sprite)
+                    if previous is not None and previous[0] is sprite.rect:
+                        position = (interpolate(previous[1], sprite.rect.x, alpha),
+                                    interpolate(previous[2], sprite.rect.y, alpha))
+                rect = self.draw(sprite.image, position)
+                if rect.width and rect.height:
+                    (static_rects if static else drawn_rects).append(rect)
+        if from_canvas:
+            static_rects = canvas.rects()
+        score_rect = self.score(score)
 
-    def score(self, score: int) -> None:
+        if full_redraw:
+            self.dirty_rects = [self.surface.get_rect()]
+        else:
+            dirty_rects = self.drawn_rects + drawn_rects
+            if from_canvas:
+                dirty_rects += canvas.changed
+                if self.static_sprites:
+                    dirty_rects += self.static_rects
+            else:
+                dirty_rects += self.static_rects + static_rects
+            if score != self.drawn_score or score_rect.collidelist(dirty_rects) != -1:
+                dirty_rects.append(score_rect)
+                if self.score_rect is not None:
+                    dirty_rects.append(self.score_rect)
+            self.dirty_rects.extend(dirty_rects)
+        self.drawn_rects = drawn_rects
+        self.static_rects = static_rects
+        self.static_sprites = not from_canvas
+        self.drawn_score = score
+        self.score_rect = score_rect
+        self.full_redraw = False
+
+    def score(self, score: int) -> pygame.Rect:
         '''
         Draws score
 
         Args:
             score (int): score to draw
+
+        Returns:
+            pygame.Rect: surface region covered by score
         '''
-        score_text = self.fonts['big_font'].render(
-            f"SCORE: {score}", True, settings.player_and_text_color)
+        score_text = self.render_text('big_font', f"SCORE: {score}")
         text_pos = (settings.screen_width/2 - score_text.get_width() // 2, 20)
-        self.surface.blit(score_text, text_pos)
+        return self.draw(score_text, text_pos)
+
+    def overlay(self, lines: List[str]) -> None:
+        '''
+        Draws lines of text over the game, in the top left corner. Overlay is erased with game objects in the next game frame
+
+        Args:
+            lines (List[str]): lines of text
+        '''
+        texts = [self.render_text('small_font', line) for line in lines]
+        if not texts:
+            return
+        line_height = texts[0].get_height()
+        rect = pygame.Rect(10, 80, max(text.get_width() for text in texts), line_height * len(texts))
+        self.surface.fill(settings.background_color, self.scale_rect(rect))
+        for count, text in enumerate(texts):
+            self.draw(text, (rect.x, rect.y + count*line_height))
+        rect = self.scale_rect(rect)
+
+        self.drawn_rects.append(rect)
+        self.dirty_rects.append(rect)
 
     def menu(self) -> None:
         '''
         Draws menu state
         '''
+        self.invalidate()
         self.surface.fill(settings.background_color)
 
-        text1 = self.fonts['big_font'].render(
-            settings.title, True, settings.player_and_text_color)
-        text2 = self.fonts['small_font'].render(
-            "by Tymeg", True, settings.player_and_text_color)
-        text3 = self.fonts['small_font'].render(
-            "PRESS ENTER TO PLAY!", True, settings.player_and_text_color)
+        text1 = self.render_text('big_font', settings.title)
+        text2 = self.render_text('small_font', "by Tymeg")
+        text3 = self.render_text('small_font', "PRESS ENTER TO PLAY!")
 
         logo_pos = (70, 100)
         text1_pos = (settings.screen_width/2 - text1.get_width() //
@@ -74,42 +555,40 @@ class Display:
         text3_pos = (settings.screen_width/2 - text3.get_width() //
                      2, settings.screen_height - 135)
 
-        self.surface.blit(self.logo, logo_pos)
-        self.surface.blit(text1, text1_pos)
-        self.surface.blit(text2, text2_pos)
-        self.surface.blit(text3, text3_pos)
+        self.draw(self.logo, logo_pos)
+        self.draw(text1, text1_pos)
+        self.draw(text2, text2_pos)
+        self.draw(text3, text3_pos)
 
     def pause(self) -> None:
         '''
         Draws pause state
         '''
-        text1 = self.fonts['small_font'].render(
-            "PAUSE", True, settings.player_and_text_color)
-        text2 = self.fonts['small_font'].render(
-            "PRESS ESC TO RESUME", True, settings.player_and_text_color)
+        self.invalidate()
+        text1 = self.render_text('small_font', "PAUSE")
+        text2 = self.render_text('small_font', "PRESS ESC TO RESUME")
         text1_pos = (settings.screen_width/2 - text1.get_width() //
                      2, 80)
         text2_pos = (settings.screen_width/2 - text2.get_width() //
                      2, 105)
 
-        self.surface.blit(text1, text1_pos)
-        self.surface.blit(text2, text2_pos)
+        self.draw(text1, text1_pos)
+        self.draw(text2, text2_pos)
 
     def game_over(self) -> None:
         '''
         Draws game over state
         '''
-        text1 = self.fonts['big_font'].render(
-            "GAME OVER!", True, settings.player_and_text_color)
-        text2 = self.fonts['small_font'].render(
-            "PRESS ENTER TO CONTINUE", True, settings.player_and_text_color)
+        self.invalidate()
+        text1 = self.render_text('big_font', "GAME OVER!")
+        text2 = self.render_text('small_font', "PRESS ENTER TO CONTINUE")
         text1_pos = (settings.screen_width/2 - text1.get_width() //
                      2, settings.screen_height/2 - text1.get_height())
         text2_pos = (settings.screen_width/2 - text2.get_width() //
                      2, settings.screen_height/2 + 20)
 
-        self.surface.blit(text1, text1_pos)
-        self.surface.blit(text2, text2_pos)
+        self.draw(text1, text1_pos)
+        self.draw(text2, text2_pos)
 
     def input(self, nick: str) -> None:
         '''
@@ -118,33 +597,103 @@ class Display:
         Args:
             nick (str): current nick characters 
         '''
+        self.invalidate()
         self.surface.fill(settings.background_color)
-        text1 = self.fonts['small_font'].render(
-            "ENTER YOUR NAME:", True, settings.player_and_text_color)
-        text2 = self.fonts['small_font'].render(
-            nick, True, settings.player_and_text_color)
+        text1 = self.render_text('small_font', "ENTER YOUR NAME:")
+        text2 = self.render_text('small_font', nick)
 
-        self.surface.blit(text1, (50, 50))
-        self.surface.blit(text2, (50, 80))
+        self.draw(text1, (50, 50))
+        self.draw(text2, (50, 80))
 
-    def scoreboard(self) -> None:
+    def scoreboard(self, page: int = 0) -> bool:
         '''
-        Draws scoreboard
+        Draws a page of scoreboard, or a loading note if it's being fetched
+
+        Args:
+            page (int): page number, from 0
+
+        Returns:
+            bool: True if the page was drawn, False if it's being fetched
         '''
+        self.invalidate()
         self.surface.fill(settings.background_color)
-        text = self.fonts['big_font'].render(
-            "SCOREBOARD", True, settings.player_and_text_color)
-
-        self.surface.blit(text, (settings.screen_width /
-                          2 - text.get_width() // 2, 50))
-        scores = scoreboard.get_scoreboard()
-
-        for count, row in enumerate(scores):
-            left = self.fonts['small_font'].render(str(
-                count + 1) + ". " + row.nick, True, settings.player_and_text_color)
-            right = self.fonts['small_font'].render(
-                str(row.score), True, settings.player_and_text_color)
-
-            self.surface.blit(left, (50, 130 + count*30))
-            self.surface.blit(right, (settings.screen_width -
-                              50 - right.get_width(), 130 + count*30))
+        text = self.render_text('big_font', "SCOREBOARD")
+
+        self.draw(text, (settings.screen_width /
+                     2 - text.get_width() // 2, 50))
+        scores = scoreboard.get_scoreboard(page)
+        first_rank = page*settings.scoreboard_page_size + 1
+        if scores is None:
+            self.draw(self.render_text('small_font', "LOADING..."), (50, 130))
+
+        for count, row in enumerate(scores or []):
+            left = self.render_text('small_font', str(
+                first_rank + count) + ". " + row.nick)
+            right = self.render_text('small_font', str(row.score))
+
+            self.draw(left, (50, 130 + count*30))
+            self.draw(right, (settings.screen_width -
+                         50 - right.get_width(), 130 + count*30))
+
+        page_count = scoreboard.get_page_count()
+        if page_count > 1:
+            text = self.render_text(
+                'small_font', f"PAGE {page + 1}/{page_count} - UP/DOWN TO SCROLL")
+            self.draw(text, (settings.screen_width/2 - text.get_width() //
+                             2, 150 + settings.scoreboard_page_size*30))
+        return scores is not None
+
+
+class Presenter:
+    '''
+    Presenter sets up the game window and shows frames rendered to its surface. A surface of another size than
+    the window is scaled to it with a single blit when presented, or by SDL when it picks the window size itself
+
+    Args:
+        render_scale (float): rendering resolution relative to screen size
+        window_scale (float): window size relative to screen size, 0 for the largest integer multiple of
+            rendering resolution fitting the desktop
+
+    Attributes:
+        window (pygame.Surface): window's surface
+        surface (pygame.Surface): surface to render to, the window's one if no scaling is needed
+    '''
+
+    def __init__(self, render_scale: float = settings.render_scale, window_scale: float = settings.window_scale) -> None:
+        render_size = (max(1, round(settings.screen_width * render_scale)),
+                       max(1, round(settings.screen_height * render_scale)))
+        if not window_scale:
+            try:
+                self.window = self.surface = pygame.display.set_mode(render_size, pygame.SCALED)
+                return
+            except pygame.error:
+                # no renderer to scale with, the largest integer multiple is blitted instead
+                desktop_width, desktop_height = pygame.display.get_desktop_sizes()[0]
+                multiple = max(1, min(desktop_width // render_size[0], desktop_height // render_size[1]))
+                window_scale = multiple * render_size[0] / settings.screen_width
+        window_size = (round(settings.screen_width * window_scale),
+                       round(settings.screen_height * window_scale))
+        self.window = pygame.display.set_mode(window_size)
+        if window_size == render_size:
+            self.surface = self.window
+        else:
+            self.surface = pygame.Surface(render_size).convert()
+
+    def present(self, dirty_rects: List[pygame.Rect]) -> None:
+        '''
+        Shows changed regions of the surface in the window
+
+        Args:
+            dirty_rects (List[pygame.Rect]): changed surface regions
+        '''
+        if self.surface is self.window:
+            pygame.display.update(dirty_rects)
+            return
+        if not dirty_rects:
+            return
+        pygame.transform.scale(self.surface, self.window.get_size(), self.window)
+        x_scale = self.window.get_width() / self.surface.get_width()
+        y_scale = self.window.get_height() / self.surface.get_height()
+        pygame.display.update([pygame.Rect(math.floor(rect.x * x_scale), math.floor(rect.y * y_scale),
+                                           math.ceil(rect.width * x_scale) + 1, math.ceil(rect.height * y_scale) + 1)
+                               for rect in dirty_rects])
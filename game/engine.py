@@ -0,0 +1,683 @@
+'''
+Module with headless game simulation - game mechanics without display, event queue and real-time clock
+'''
+
+import pygame
+import math
+import time
+import argparse
+from typing import Dict, NamedTuple, Optional, Tuple
+from random import Random, randrange
+
+import settings
+from platforms import Platform, PlatformGroup
+from player import Player, Keys
+from missile import Missile
+from spatial import HeightIndex, swept_collision
+from scheduler import Scheduler, Events
+from profiler import Profiler, Phases
+from pool import Pool
+from levelgen import LevelGenerator
+
+
+class DeathCauses:
+    '''
+    Simple "enum" class for causes of game over
+    '''
+    missile, bottom, side = 'missile', 'bottom', 'side'
+
+
+class Snapshot(NamedTuple):
+    '''
+    Snapshot is a compact, immutable copy of game state made of plain numbers, strings and tuples, so it's cheap
+    to take, restore and keep many of. Restoring it gives bit-identical continuation of the game
+
+    Attributes:
+        frame (int): number of simulated frames
+        score (int): score
+        seed (int): seed of the game
+        rng_state (tuple): state of the random number generator
+        difficulty (Tuple[int, int, int, int]): world shift, world descend speed, minimal and maximal missile spawn frequency
+        spawn_missiles (bool): tells if missiles are spawned
+        spawn_collapse_platforms (bool): tells if collapse platforms are spawned
+        player (Tuple[int, int, float, float]): player's position and direction
+        platforms (Tuple[tuple, ...]): number, type, length, map coordinates, position, indexed top and movement
+            (right, up, level) of every platform, from the lowest
+        missiles (Tuple[Tuple[int, int, int], ...]): position and indexed top of every missile, in index order
+        collapsing_platforms (Tuple[int, ...]): numbers of collapsing platforms
+        scheduler (Tuple[int, int, Tuple[Tuple[int, int, int, int], ...]]): scheduler's tick, sequence number and heap of events
+        level (tuple): level generator's seed, index of current chunk, the chunk and position in it
+    '''
+    frame: int
+    score: int
+    seed: int
+    rng_state: tuple
+    difficulty: Tuple[int, int, int, int]
+    spawn_missiles: bool
+    spawn_collapse_platforms: bool
+    player: Tuple[int, int, float, float]
+    platforms: Tuple[tuple, ...]
+    missiles: Tuple[Tuple[int, int, int], ...]
+    collapsing_platforms: Tuple[int, ...]
+    scheduler: Tuple[int, int, Tuple[Tuple[int, int, int, int], ...]]
+    level: tuple
+
+
+def ms_to_frames(ms: int) -> int:
+    '''
+    Converts time in milliseconds to number of physics steps
+
+    Args:
+        ms (int): time in milliseconds
+
+    Returns:
+        int: number of physics steps (at least 1)
+    '''
+    return max(1, round(ms * settings.physics_fps / 1000))
+
+
+def tick_rate_settings(fps: int) -> Dict[str, object]:
+    '''
+    Gets settings of another tick rate. Physics isn't scaled - every tick runs physics_fps // fps physics steps
+    with the same input, so a game plays exactly as at physics_fps with input held for the whole tick
+
+    Args:
+        fps (int): simulation ticks per second, a divisor of settings.physics_fps
+
+    Returns:
+        Dict[str, object]: new values of settings by name
+    '''
+    if fps <= 0 or settings.physics_fps % fps:
+        raise ValueError(f"tick rate must divide {settings.physics_fps}")
+    return {'fps': fps}
+
+
+class Engine:
+    '''
+    Engine object simulates game mechanics one tick at a time. It doesn't use display, SDL event queue
+    nor real-time clock, so it can run headless and much faster than real time
+
+    Attributes:
+        score (int): current score
+        platforms (PlatformGroup): group of current platforms in the game, ordered by height
+        player (pygame.sprite.GroupSingle): single group containing the player
+        missiles (pygame.sprite.Group): group of current missiles in the game
+        platform_index (HeightIndex): current platforms ordered by height
+        missile_index (HeightIndex): current missiles ordered by height
+        collapsing_platforms (Dict[int, Platform]): current collapsing platforms by number
+        world_shift (int): world shift (positive when jumping high)
+        world_descend_speed (int): current world descend speed
+        spawn_missiles (bool): tells if missiles should be spawned
+        spawn_collapse_platforms (bool): tells if collapse platforms should be spawned
+        missile_spawn_frequency_down (int): current minimal missile spawn frequency
+        missile_spawn_frequency_up (int): current maximal missile spawn frequency
+        scheduler (Scheduler): timed events of current game - missile spawns and platform collapses
+        frame (int): number of ticks simulated in current game
+        seed (int): seed of current game's random number generator
+        epoch (int): number of games started and snapshots restored by the engine - world state changes
+            continuously only within one epoch
+        rng (Random): current game's random number generator, the only source of randomness in game mechanics
+        level (LevelGenerator): generator of current game's platforms, seeded from rng
+        background_level_generation (bool): tells if platforms are generated ahead on a worker thread
+        previous_player_position (Tuple[int, int]): player's position at the start of the last physics step
+        previous_missile_offset (int): missile index's offset at the start of the last physics step
+        profiler (Optional[Profiler]): profiler measuring phases of step, None if not profiled
+        platform_pool (Pool[Platform]): removed platforms to be reused
+        missile_pool (Pool[Missile]): removed missiles to be reused
+    '''
+    profiler: Optional[Profiler] = None
+    background_level_generation = False
+    epoch = 0
+
+    def __init__(self) -> None:
+        self.platform_pool: Pool[Platform] = Pool(Platform)
+        self.missile_pool: Pool[Missile] = Pool(Missile)
+
+# ============================ NEW GAME ===============================
+
+    def new_game(self, seed: Optional[int] = None) -> None:
+        '''
+        Resets game settings, spawns first platforms and player on the bottom platform
+
+        Args:
+            seed (Optional[int]): seed of the game, same seed and inputs give the same game; random if None
+        '''
+        # reset, previous game's platforms and missiles go back to pools
+        if hasattr(self, 'platforms'):
+            self.release_sprites()
+            self.level.stop()
+        self.seed = randrange(2**32) if seed is None else seed
+        self.epoch += 1
+        self.rng = Random(self.seed)
+        self.level = LevelGenerator(self.rng.getrandbits(32))
+        self.score = 0
+        self.collapsing_platforms = {}
+        self.world_shift = 0
+        self.spawn_missiles = False
+        self.spawn_collapse_platforms = False
+        self.scheduler = Scheduler()
+        self.frame = 0
+
+        # start game difficulty
+        self.set_game_difficulty(settings.game_difficulty[0])
+        self.world_descend_speed = 0
+
+        # groups of objects
+        self.platforms = PlatformGroup()
+        self.player = pygame.sprite.GroupSingle()
+        self.missiles = pygame.sprite.Group()
+        self.platform_index = HeightIndex(settings.vertical_platform_range)
+        self.missile_index = HeightIndex()
+
+        # start platform and the ones above it
+        start_platform = self.platform_pool.acquire(
+            (0, settings.map_height-1), settings.map_width, 'normal', 0)
+        self.add_platform(start_platform)
+        top_level, top_number = start_platform.map_coords.y, 0
+        for i in range(settings.platform_count - 1):
+            new_platform = self.generate_new_platform(top_level, top_number)
+            top_level, top_number = new_platform.map_coords.y, new_platform.number
+            self.add_platform(new_platform)
+        if self.background_level_generation:
+            self.level.start()
+
+        # player
+        player_sprite = Player(settings.start_pos)
+        self.player.add(player_sprite)
+        self.previous_player_position = player_sprite.rect.topleft
+        self.previous_missile_offset = 0
+
+    def release_sprites(self) -> None:
+        '''
+        Removes all platforms and missiles from the game, they go back to pools
+        '''
+        for platform in self.platforms:
+            self.platform_pool.release(platform)
+        for missile in self.missiles:
+            self.missile_pool.release(missile)
+        self.platforms.empty()
+        self.missiles.empty()
+
+# ============================ SNAPSHOT ===============================
+
+    def snapshot(self) -> Snapshot:
+        '''
+        Takes a snapshot of current game state
+
+        Returns:
+            Snapshot: game state
+        '''
+        player = self.player.sprite
+        platform_top = self.platform_index.indexed_top
+        missile_top = self.missile_index.indexed_top
+        return Snapshot(
+            self.frame, self.score, self.seed, self.rng.getstate(),
+            (self.world_shift, self.world_descend_speed,
+             self.missile_spawn_frequency_down, self.missile_spawn_frequency_up),
+            self.spawn_missiles, self.spawn_collapse_platforms,
+            (player.rect.x, player.rect.y, player.direction.x, player.direction.y),
+            tuple((platform.number, platform.type, platform.rect.width // settings.tile_size,
+                   platform.map_coords.x, platform.map_coords.y, platform.rect.x, platform.rect.y,
+                   platform_top(platform), platform.right, platform.up, platform.level)
+                  for platform in self.platforms),
+            tuple((missile.rect.x, missile.rect.y, missile_top(missile))
+                  for missile in self.missile_index.sprites),
+            tuple(self.collapsing_platforms),
+            (self.scheduler.tick, self.scheduler.sequence, tuple(self.scheduler.events)),
+            self.level.snapshot())
+
+    def restore(self, snapshot: Snapshot) -> None:
+        '''
+        Restores game state from a snapshot taken by any engine - the game continues exactly as after the snapshot.
+        An engine which hasn't played yet starts a game of the snapshot's seed first, to restore into
+
+        Args:
+            snapshot (Snapshot): game state
+        '''
+        if not hasattr(self, 'platforms'):
+            self.new_game(snapshot.seed)
+        self.release_sprites()
+        self.epoch += 1
+        self.frame, self.score, self.seed = snapshot.frame, snapshot.score, snapshot.seed
+        self.rng.setstate(snapshot.rng_state)
+        (self.world_shift, self.world_descend_speed,
+         self.missile_spawn_frequency_down, self.missile_spawn_frequency_up) = snapshot.difficulty
+        self.spawn_missiles = snapshot.spawn_missiles
+        self.spawn_collapse_platforms = snapshot.spawn_collapse_platforms
+
+        player = self.player.sprite
+        player.rect.x, player.rect.y, player.direction.x, player.direction.y = snapshot.player
+        player.jump_speed = settings.jump_speed
+
+        self.platform_index = HeightIndex(settings.vertical_platform_range)
+        platforms = {}
+        for (number, type, length, map_x, map_y, x, y, top, right, up, level) in snapshot.platforms:
+            platform = self.platform_pool.acquire((map_x, map_y), length, type, number)
+            platform.rect.x, platform.rect.y = x, y
+            platform.right, platform.up, platform.level = right, up, level
+            self.platforms.add(platform)
+            self.platform_index.add(platform, top)
+            platforms[number] = platform
+
+        self.missile_index = HeightIndex()
+        self.previous_player_position = player.rect.topleft
+        self.previous_missile_offset = 0
+        for x, y, top in snapshot.missiles:
+            missile = self.missile_pool.acquire((x, y))
+            self.missiles.add(missile)
+            self.missile_index.add(missile, top)
+
+        self.collapsing_platforms = {number: platforms[number]
+                                     for number in snapshot.collapsing_platforms}
+        self.scheduler.tick, self.scheduler.sequence, events = snapshot.scheduler
+        self.scheduler.events = list(events)
+        self.level.restore(snapshot.level)
+
+# ============================= TIMERS ================================
+
+    def missile_queue(self) -> None:
+        '''
+        Schedules a single missile spawn
+        '''
+        self.scheduler.schedule(ms_to_frames(self.rng.randint(
+            self.missile_spawn_frequency_down, self.missile_spawn_frequency_up)), Events.spawn_missile)
+
+    def collapse_queue(self, platform: Platform) -> None:
+        '''
+        Schedules the collapse of a platform
+
+        Args:
+            platform (Platform): collapsing platform
+        '''
+        self.collapsing_platforms[platform.number] = platform
+        self.scheduler.schedule(ms_to_frames(
+            settings.collapse_duration), Events.platform_collapse, platform.number)
+
+    def run_timers(self) -> None:
+        '''
+        Advances scheduler by one frame, collapses platforms and spawns missiles when their time comes
+        '''
+        for event, argument in self.scheduler.advance():
+            if event == Events.platform_collapse:
+                self.platform_collapse(argument)
+            elif event == Events.spawn_missile and self.spawn_missiles:
+                self.spawn_missile()
+                self.missile_queue()
+
+# ================== MISSILE AND PLATFORM SPAWN ===================
+
+    def add_platform(self, platform: Platform) -> None:
+        '''
+        Adds platform to the game
+
+        Args:
+            platform (Platform): platform to add
+        '''
+        self.platforms.add(platform)
+        self.platform_index.add(platform)
+
+    def remove_platform(self, platform: Platform) -> None:
+        '''
+        Removes platform from the game, it goes back to the pool
+
+        Args:
+            platform (Platform): platform to remove
+        '''
+        self.platforms.remove(platform)
+        self.platform_index.remove(platform)
+        self.collapsing_platforms.pop(platform.number, None)
+        self.platform_pool.release(platform)
+
+    def add_missile(self, missile: Missile) -> None:
+        '''
+        Adds missile to the game
+
+        Args:
+            missile (Missile): missile to add
+        '''
+        self.missiles.add(missile)
+        self.missile_index.add(missile)
+
+    def remove_missile(self, missile: Missile) -> None:
+        '''
+        Removes missile from the game, it goes back to the pool
+
+        Args:
+            missile (Missile): missile to remove
+        '''
+        self.missiles.remove(missile)
+        self.missile_index.remove(missile)
+        self.missile_pool.release(missile)
+
+    def spawn_missile(self) -> None:
+        '''
+        Spawns a missile on random x position, 100 pixels above screen
+        '''
+        missile = self.missile_pool.acquire(
+            (self.rng.randint(0, settings.screen_width - settings.missile_dimensions[0]), -100))
+        self.add_missile(missile)
+
+    def generate_new_platform(self, top_level: int, top_number: int) -> Platform:
+        '''
+        Generates the next platform of the level
+
+        Args:
+            top_level (int): tile level of the current highest platform
+            top_number (int): current highest platform's number
+
+        Returns:
+            Platform: generated platform
+        '''
+        map_x, height_difference, length, type = self.level.next()
+        if type == 'collapse' and not self.spawn_collapse_platforms:
+            type = 'normal'
+        platform = self.platform_pool.acquire((map_x, top_level - height_difference), length,
+                                              type, top_number + 1)
+        return platform
+
+    def manage_platforms_and_missiles(self) -> None:
+        '''
+        Removes lowest platform and missile if it's below the screen, spawns a new one
+        '''
+        bottom_platform = self.platforms.bottom()
+
+        if bottom_platform.rect.y > settings.screen_height:
+            self.remove_platform(bottom_platform)
+
+            top_platform = self.platforms.top()
+            new_platform = self.generate_new_platform(
+                top_platform.map_coords.y, top_platform.number)
+            self.add_platform(new_platform)
+
+        if self.missile_index:
+            bottom_missile = self.missile_index.sprites[-1]
+            if bottom_missile.rect.y > settings.screen_height:
+                self.remove_missile(bottom_missile)
+
+    def platform_collapse(self, number: int) -> None:
+        '''
+        Removes collapsed platform, spawns a new one instead
+
+        Args:
+            number (int): number of collapsed platform
+        '''
+        # platform already gone below the screen has been replaced
+        platform = self.collapsing_platforms.get(number)
+        if platform is None:
+            return
+        self.remove_platform(platform)
+
+        top_platform = self.platforms.top()
+        new_platform = self.generate_new_platform(
+            top_platform.map_coords.y, top_platform.number)
+        self.add_platform(new_platform)
+
+# ========================== MOVEMENT ===========================
+
+    def scroll_y(self) -> None:
+        '''
+        Scrolls the screen vertically if player is above certain screen level
+        '''
+        player = self.player.sprite
+
+        if player.rect.y < settings.scroll_border and player.direction.y < 0:
+            self.world_shift = settings.scroll_speed
+            player.rect.y += settings.scroll_speed
+            for missile in self.missiles.sprites():
+                missile.rect.y += settings.scroll_speed
+            self.missile_index.shift(settings.scroll_speed)
+
+            # world starts descending, missiles spawn, collapse platforms spawn only after first scroll
+            if self.world_descend_speed == 0:
+                self.world_descend_speed = settings.game_difficulty[0]['world_descend_speed']
+                self.missile_queue()
+                self.spawn_missiles = True
+                self.spawn_collapse_platforms = True
+        else:
+            self.world_shift = 0
+
+    def platform_type_action(self, platform: Platform) -> None:
+        '''
+        Performs a special platform action depending on type
+
+        Args:
+            platform (Platform): platform to check and perform action
+        '''
+        player = self.player.sprite
+
+        if platform.type == 'bounce':
+            player.jump_speed = settings.bounce_speed
+            player.jump()
+            player.jump_speed = settings.jump_speed
+        elif platform.type == 'collapse' and platform.number not in self.collapsing_platforms:
+            self.collapse_queue(platform)
+        elif platform.type == 'horizontal':
+            if platform.right:
+                player.rect.x += (settings.horizontal_platform_speed)
+            else:
+                player.rect.x -= (settings.horizontal_platform_speed)
+        elif platform.type == 'vertical':
+            if platform.up:
+                player.rect.y -= (settings.vertical_platform_speed)
+            else:
+                player.rect.y += (settings.vertical_platform_speed)
+
+    def vertical_movement_and_collision(self) -> None:
+        '''
+        Applies gravity to the player, makes player land on a platform (and then performs special platform action).
+        Collision is swept - player lands on a platform which top player's feet crossed in this frame, however
+        fast player falls, so platforms thinner than player's speed aren't tunneled through
+        '''
+        self.player.sprite.apply_gravity()
+        player = self.player.sprite
+        if player.direction.y <= 0:
+            return
+
+        # only platforms between player's feet in the previous and in this frame, in order of spawning
+        previous_bottom = player.rect.bottom - player.direction.y - 1
+        candidates = self.platform_index.query(
+            math.floor(previous_bottom), player.rect.bottom)
+        if len(candidates) > 1:
+            candidates.sort(key=lambda platform: platform.number)
+
+        for platform in candidates:
+            if not previous_bottom <= platform.rect.top <= player.rect.bottom:
+                continue
+            if platform.rect.top == player.rect.bottom:
+                overlaps = player.rect.right >= platform.rect.left and player.rect.left <= platform.rect.right
+            else:
+                overlaps = player.rect.right > platform.rect.left and player.rect.left < platform.rect.right
+            if overlaps:
+                player.rect.bottom = platform.rect.top
+                player.direction.y = 0
+                if self.score < platform.number:
+                    self.score = platform.number
+                self.platform_type_action(platform)
+                return
+
+    def horizontal_movement(self) -> None:
+        '''
+        Changes player's horizontal position
+        '''
+        player = self.player.sprite
+        player.rect.x += player.direction.x * player.speed
+
+# ========================= GAME DIFFICULTY =======================
+
+    def set_game_difficulty(self, parameters: Dict[str, int]) -> None:
+        '''
+        Sets game difficulty - world descend speed and missile spawn frequency range
+
+        Args:
+            parameters (Dict[str, int]): a dictionary of certain difficulty parameters
+        '''
+        self.world_descend_speed = parameters['world_descend_speed']
+        self.missile_spawn_frequency_down = parameters['missile_spawn_frequency_down']
+        self.missile_spawn_frequency_up = parameters['missile_spawn_frequency_up']
+
+    def adjust_game_difficulty(self) -> None:
+        '''
+        Adjusts game difficulty based on current score
+        '''
+        if self.score >= settings.score_thresholds[0] and self.score < settings.score_thresholds[1]:
+            self.set_game_difficulty(settings.game_difficulty[1])
+        elif self.score >= settings.score_thresholds[1] and self.score < settings.score_thresholds[2]:
+            self.set_game_difficulty(settings.game_difficulty[2])
+        elif self.score >= settings.score_thresholds[2] and self.score < settings.score_thresholds[3]:
+            self.set_game_difficulty(settings.game_difficulty[3])
+        elif self.score >= settings.score_thresholds[3]:
+            self.set_game_difficulty(settings.game_difficulty[4])
+
+# ========================= GAME OVER ============================
+
+    def death_cause(self) -> Optional[str]:
+        '''
+        Tells why game is over - when there are many causes at once, missile hit goes first, then falling down.
+        A missile hits the player when they overlap, or when it passed through the player in the last frame -
+        the swept test catches missiles moving faster than player's and missile's heights per frame
+
+        Returns:
+            Optional[str]: cause of death from DeathCauses, None if game is not over
+        '''
+        player = self.player.sprite
+
+        # missiles' movement relative to the player in the last frame
+        dx = self.previous_player_position[0] - player.rect.x
+        dy = self.missile_index.offset - self.previous_missile_offset - \
+            (player.rect.y - self.previous_player_position[1])
+        for missile in self.missile_index.query(player.rect.top - settings.missile_dimensions[1] - abs(dy),
+                                                player.rect.bottom + abs(dy)):
+            if missile.rect.colliderect(player.rect):
+                return DeathCauses.missile
+            start = missile.rect.move(-dx, -dy)
+            passed = ((start.bottom <= player.rect.top and missile.rect.top >= player.rect.bottom) or
+                      (start.top >= player.rect.bottom and missile.rect.bottom <= player.rect.top))
+            if passed and swept_collision(start, (dx, dy), player.rect):
+                return DeathCauses.missile
+        if player.rect.bottom >= settings.screen_height:
+            return DeathCauses.bottom
+        if player.rect.right < 0 or player.rect.left > settings.screen_width:
+            return DeathCauses.side
+        return None
+
+    def game_over(self) -> bool:
+        '''
+        Tells if game is over
+
+        Returns:
+            bool: True if game is over, False otherwise
+        '''
+        return self.death_cause() is not None
+
+# ============================= STEP ==============================
+
+    def step(self, inputs: int = 0) -> bool:
+        '''
+        Simulates one tick of the game - physics_fps // fps physics steps with the same input
+
+        Args:
+            inputs (int): player's input in this tick - bit flags from Keys
+
+        Returns:
+            bool: True if game is over after this tick, False otherwise
+        '''
+        self.frame += 1
+        for _ in range(settings.physics_fps // settings.fps):
+            if self.physics_step(inputs):
+                return True
+        return False
+
+    def physics_step(self, inputs: int) -> bool:
+        '''
+        Simulates one physics step of the game
+
+        Args:
+            inputs (int): player's input - bit flags from Keys
+
+        Returns:
+            bool: True if game is over after this step, False otherwise
+        '''
+        profiler = self.profiler
+        self.previous_player_position = self.player.sprite.rect.topleft
+        self.previous_missile_offset = self.missile_index.offset
+        self.run_timers()
+        # input is applied before the player moves, so it shows in this step already
+        self.player.sprite.get_input(inputs)
+        if profiler is not None:
+            profiler.mark(Phases.timers)
+
+        # player
+        self.horizontal_movement()
+        if profiler is not None:
+            profiler.mark(Phases.horizontal_movement)
+        self.vertical_movement_and_collision()
+        if profiler is not None:
+            profiler.mark(Phases.vertical_movement_and_collision)
+        self.player.update(self.world_descend_speed)
+        if profiler is not None:
+            profiler.mark(Phases.player_update)
+
+        # platforms and missiles
+        self.manage_platforms_and_missiles()
+        if profiler is not None:
+            profiler.mark(Phases.manage_platforms_and_missiles)
+        self.platforms.update(self.world_shift + self.world_descend_speed)
+        self.platform_index.shift(
+            self.world_shift + self.world_descend_speed)
+        self.missiles.update(self.world_descend_speed)
+        self.missile_index.shift(
+            self.world_descend_speed + settings.missile_speed)
+        if profiler is not None:
+            profiler.mark(Phases.sprites_update)
+
+        # scroll screen
+        self.scroll_y()
+
+        # adjust game difficulty based on current score
+        self.adjust_game_difficulty()
+
+        game_over = self.game_over()
+        if profiler is not None:
+            profiler.mark(Phases.scroll_and_game_over)
+        return game_over
+
+
+if __name__ == '__main__':
+    # headless run with a simple bot, reports simulation speed
+    parser = argparse.ArgumentParser(
+        description="Runs headless JumPy games and reports simulation speed")
+    parser.add_argument('--games', type=int, default=100,
+                        help="number of games to simulate")
+    parser.add_argument('--max-frames', type=int, default=100000,
+                        help="frame limit of a single game")
+    parser.add_argument('--fps', type=int, default=settings.fps,
+                        help="simulation ticks per second, a divisor of physics steps per second")
+    args = parser.parse_args()
+    try:
+        for name, value in tick_rate_settings(args.fps).items():
+            setattr(settings, name, value)
+    except ValueError as error:
+        parser.error(str(error))
+
+    engine = Engine()
+    total_frames, scores = 0, []
+    start = time.perf_counter()
+    for _ in range(args.games):
+        engine.new_game()
+        inputs = Keys.right | Keys.jump
+        while engine.frame < args.max_frames:
+            # bounce between screen edges, jump whenever possible
+            player = engine.player.sprite
+            if player.rect.right >= settings.screen_width - settings.tile_size:
+                inputs = Keys.left | Keys.jump
+            elif player.rect.left <= settings.tile_size:
+                inputs = Keys.right | Keys.jump
+            if engine.step(inputs):
+                break
+        total_frames += engine.frame
+        scores.append(engine.score)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.games} games, {total_frames} frames in {elapsed:.2f} s "
+          f"({total_frames / elapsed:.0f} frames/s), best score: {max(scores)}, "
+          f"mean score: {sum(scores) / len(scores):.1f}")
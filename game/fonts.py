@@ -0,0 +1,81 @@
+'''
+Module with font loading. Looking up system fonts scans all fonts installed in the system,
+so found font files are remembered in a cache file for next runs
+'''
+
+import json
+import os
+import pygame
+from typing import Dict, Optional, Tuple
+
+import settings
+
+
+def find_font(name: str, bold: bool) -> Tuple[Optional[str], bool]:
+    '''
+    Looks up a system font the same way pygame.font.SysFont does
+
+    Args:
+        name (str): font name
+        bold (bool): tells if font should be bold
+
+    Returns:
+        Tuple[Optional[str], bool]: font file (None for the default font) and if bold has to be emulated
+    '''
+    found = []
+
+    def constructor(path: Optional[str], size: int, set_bold: bool, set_italic: bool) -> None:
+        found.append((path, set_bold))
+
+    pygame.font.SysFont(name, 1, bold, constructor=constructor)
+    return found[0]
+
+
+def load_font_cache() -> Dict[str, Tuple[Optional[str], bool]]:
+    '''
+    Reads font cache file
+
+    Returns:
+        Dict[str, Tuple[Optional[str], bool]]: found fonts by font name and style, empty if there's no valid cache
+    '''
+    try:
+        with open(settings.font_cache_path) as file:
+            return {key: (path, set_bold) for key, (path, set_bold) in json.load(file).items()}
+    except (OSError, ValueError, TypeError):
+        return {}
+
+
+def save_font_cache(cache: Dict[str, Tuple[Optional[str], bool]]) -> None:
+    '''
+    Writes font cache file, cache is just not saved if it can't be written
+
+    Args:
+        cache (Dict[str, Tuple[Optional[str], bool]]): found fonts by font name and style
+    '''
+    try:
+        with open(settings.font_cache_path, 'w') as file:
+            json.dump(cache, file)
+    except OSError:
+        pass
+
+
+def load_fonts() -> Dict[str, pygame.font.Font]:
+    '''
+    Loads game fonts, looking up system fonts only if they aren't cached
+
+    Returns:
+        Dict[str, pygame.font.Font]: dictionary of fonts
+    '''
+    cache = load_font_cache()
+    key = f"{settings.font_name}:bold"
+    path, set_bold = cache.get(key, (None, False))
+    if key not in cache or (path is not None and not os.path.exists(path)):
+        path, set_bold = find_font(settings.font_name, True)
+        cache[key] = (path, set_bold)
+        save_font_cache(cache)
+
+    fonts = {}
+    for font_name, size in (('big_font', settings.big_font_size), ('small_font', settings.small_font_size)):
+        fonts[font_name] = pygame.font.Font(path, size)
+        fonts[font_name].set_bold(set_bold)
+    return fonts
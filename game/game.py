@@ -1,19 +1,23 @@
 import pygame
 import sys
-from typing import Dict
-from random import randint, choice
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
 
 import settings
 import scoreboard
 from display import Display
-from platforms import Platform
-from player import Player
-from missile import Missile
+from engine import Engine
+from player import read_keyboard
+from profiler import Profiler, Phases
+from replay import Replay, verify, save_replay
 
 
-class Game:
+class Game(Engine):
     '''
-    A game object manages game mechanics and states
+    A game object manages game states, events and display on top of the game mechanics simulated by Engine.
+    Game mechanics run on Engine's frame timers, so pausing the game pauses them too and every game can be replayed.
+    Simulation ticks at a fixed rate (settings.fps), independently of rendering - frames are drawn with sprites
+    interpolated between the last two ticks
 
     Args:
         surface (pygame.Surface): game screen
@@ -24,354 +28,173 @@ class Game:
         display (Display): a display object to which Game delegates drawing things to the screen
         state (int): game state - init | menu | start | pause | game_over | scoreboard | input
         nick (str): current player's nick
-        score (int): current score
-        platforms (pygame.sprite.Group): group of current platforms in the game
-        player (pygame.sprite.GroupSingle): single group containing the player
-        missiles (pygame.sprite.Group): group of current missiles in the game
-        PLATFORM_COLLAPSE (int): custom event of a collapsing platform
-        SPAWN_MISSILE (int): custom event of spawning a missile
-        collapsing (bool): tells if there is a platform collapsing
-        collapsing_platforms (list[Platform]): current collapsing platforms
-        world_shift (int): world shift (positive when jumping high)
-        spawn_missiles (bool): tells if missiles should be spawned
-        spawn_collapse_platforms (bool): tells if collapse platforms should be spawned
-        missile_spawn_frequency_down (int): current minimal missile spawn frequency
-        missile_spawn_frequency_up (int): current maximal missile spawn frequency
-        pause_time (int): clock ticks in the moment of pausing
-        missile_time (int): clock ticks in the moment of SPAWN_MISSILE event toggle during pause
-        collapse_time (int): clock ticks in the moment of PLATFORM_COLLAPSE event toggle during pause
+        scoreboard_page (int): currently displayed page of scoreboard
+        scoreboard_loading (bool): tells if the displayed page is being fetched, it's drawn again once it's fetched
+        replay (Replay): replay of current game
+        verification (Optional[threading.Thread]): thread verifying the last submitted score, None if it's done
+        show_hud (bool): tells if profiler's summary is shown during the game (toggled with F3)
+        hud_lines (List[str]): profiler's summary and text cache usage shown on the screen
+        read_input (Callable[[], int]): reads player's input in a frame, keyboard by default
+        accumulator (float): simulation time not ticked yet, in seconds
+        previous_positions (Dict[pygame.sprite.Sprite, Tuple[pygame.Rect, int, int]]): sprites' rects and their positions before the last tick
+        scrolled (bool): tells if the screen scrolled since the last rendered frame
+        spectators (Optional[SpectatorServer]): server streaming ticks of the game to spectators, None if not streamed
+        latency (Optional[LatencyMeter]): meter of input latency, None if it's not measured
     '''
+    background_level_generation = True
 
     def __init__(self, surface: pygame.Surface, logo: pygame.Surface, fonts: Dict[str, pygame.font.Font]) -> None:
-
-        # Custom events setup
-        self.PLATFORM_COLLAPSE = pygame.USEREVENT + 1
-        self.SPAWN_MISSILE = pygame.USEREVENT + 2
+        super().__init__()
 
         # game setup
         self.display = Display(surface, logo, fonts)
         self.state = self.States.init
-
-# ============================ NEW GAME ===============================
-
-    def new_game(self) -> None:
-        '''
-        Resets game settings, spawns first platforms and player on the bottom platform
-        '''
-        # reset
-        pygame.event.clear()
-        self.state = self.States.active
-        self.nick = ""
-        self.score = 0
-        self.collapsing = False
-        self.collapsing_platforms = []
-        self.world_shift = 0
-        self.spawn_missiles = False
-        self.missile_time = -1
-        self.spawn_collapse_platforms = False
-        self.collapse_time = -1
-
-        # start game difficulty
-        self.set_game_difficulty(settings.game_difficulty[0])
-        self.world_descend_speed = 0
-
-        # groups of objects
-        self.platforms = pygame.sprite.Group()
-        self.player = pygame.sprite.GroupSingle()
-        self.missiles = pygame.sprite.Group()
-
-        # first 9 platforms
-        start_platform = Platform(
-            (0, settings.map_height-1), settings.map_width, 'normal', 0)
-        self.platforms.add(start_platform)
-        top_level, top_number = start_platform.map_coords.y, 0
-        for i in range(9):
-            new_platform = self.generate_new_platform(top_level, top_number)
-            top_level, top_number = new_platform.map_coords.y, new_platform.number
-            self.platforms.add(new_platform)
-
-        # player
-        player_sprite = Player(settings.start_pos)
-        self.player.add(player_sprite)
-
-# ================== MISSILE AND PLATFORM SPAWN ===================
-
-    def missile_queue(self) -> None:
-        '''
-        Sets timer for a single missile spawn
-        '''
-        pygame.time.set_timer(self.SPAWN_MISSILE, randint(
-            self.missile_spawn_frequency_down, self.missile_spawn_frequency_up), 1)
-
-    def spawn_missile(self) -> None:
-        '''
-        Spawns a missile on random x position, 100 pixels above screen
-        '''
-        missile = Missile(
-            (randint(0, settings.screen_width - settings.missile_dimensions[0]), -100))
-        self.missiles.add(missile)
-
-    def generate_new_platform(self, top_level: int, top_number: int) -> Platform:
-        '''
-        Generates a random single platform
+        self.scoreboard_page = 0
+        self.scoreboard_loading = False
+        self.verification = None
+        self.show_hud = False
+        self.hud_lines = []
+        self.read_input: Callable[[], int] = read_keyboard
+        # the first frame ticks right away
+        self.accumulator = 1 / settings.fps
+        self.previous_positions = {}
+        self.scrolled = False
+        self.spectators = None
+        self.latency = None
+
+    def enable_profiler(self, show_hud: bool = True, frame_budget: float = 1 / 60) -> Profiler:
+        '''
+        Starts profiling frames, with a new profiler
 
         Args:
-            top_level (int): tile level of the current highest platform
-            top_number (int): current highest platform's number
+            show_hud (bool): tells if profiler's summary should be shown during the game
+            frame_budget (float): time between presented frames, in seconds
 
         Returns:
-            Platform: generated platform
+            Profiler: profiler measuring frames
         '''
-        types = settings.platform_types
-        if not self.spawn_collapse_platforms:
-            types = types[:-1]
-
-        platform = Platform((randint(0, settings.map_width - 3), top_level - randint(settings.platform_height_difference[0],
-                                                                                     settings.platform_height_difference[1])), randint(
-            settings.platform_length[0], settings.platform_length[1]), choice(types), top_number + 1)
-        return platform
+        self.disable_profiler()
+        self.profiler = Profiler(frame_budget=frame_budget)
+        self.show_hud = show_hud
+        return self.profiler
 
-    def manage_platforms_and_missiles(self) -> None:
+    def disable_profiler(self) -> None:
         '''
-        Removes lowest platform and missile if it's below the screen, spawns a new one
+        Stops profiling frames
         '''
-        bottom_platform = self.platforms.sprites()[0]
+        if self.profiler is not None:
+            self.profiler.close()
+        self.profiler = None
+        self.show_hud = False
 
-        if bottom_platform.rect.y > settings.screen_height:
-            self.platforms.remove(bottom_platform)
-
-            top_platform = self.platforms.sprites()[len(
-                self.platforms.sprites()) - 1]
-            new_platform = self.generate_new_platform(
-                top_platform.map_coords.y, top_platform.number)
-            self.platforms.add(new_platform)
-
-        if self.missiles.sprites():
-            bottom_missile = self.missiles.sprites()[0]
-            if bottom_missile.rect.y > settings.screen_height:
-                self.missiles.remove(bottom_missile)
-
-    def platform_collapse(self) -> None:
-        '''
-        Removes collapsed platform, spawns a new one instead
-        '''
-        self.platforms.remove(self.collapsing_platforms[0])
-        self.collapsing_platforms.pop(0)
-
-        top_platform = self.platforms.sprites(
-        )[len(self.platforms.sprites()) - 1]
-        new_platform = self.generate_new_platform(
-            top_platform.map_coords.y, top_platform.number)
-        self.platforms.add(new_platform)
-        self.collapsing = False
-
-# ========================== MOVEMENT ===========================
+# ============================ NEW GAME ===============================
 
-    def scroll_y(self) -> None:
+    def new_game(self, seed: Optional[int] = None) -> None:
         '''
-        Scrolls the screen vertically if player is above certain screen level
-        '''
-        player = self.player.sprite
-
-        if player.rect.y < settings.scroll_border and player.direction.y < 0:
-            self.world_shift = settings.scroll_speed
-            player.rect.y += settings.scroll_speed
-            for missile in self.missiles.sprites():
-                missile.rect.y += settings.scroll_speed
-
-            # world starts descending, missiles spawn, collapse platforms spawn only after first scroll
-            if self.world_descend_speed == 0:
-                self.world_descend_speed = settings.game_difficulty[0]['world_descend_speed']
-                self.missile_queue()
-                self.spawn_missiles = True
-                self.spawn_collapse_platforms = True
-        else:
-            self.world_shift = 0
-
-    def platform_type_action(self, platform: Platform) -> None:
-        '''
-        Performs a special platform action depending on type
+        Resets game state and events, starts a new game and its replay
 
         Args:
-            platform (Platform): platform to check and perform action
-        '''
-        player = self.player.sprite
-
-        if platform.type == 'bounce':
-            player.jump_speed = settings.bounce_speed
-            player.jump()
-            player.jump_speed = settings.jump_speed
-        elif platform.type == 'collapse' and not self.collapsing:
-            pygame.time.set_timer(self.PLATFORM_COLLAPSE,
-                                  settings.collapse_duration, 1)
-            self.collapsing_platforms.append(platform)
-            self.collapsing = True
-        elif platform.type == 'horizontal':
-            if platform.right:
-                player.rect.x += (settings.horizontal_platform_speed)
-            else:
-                player.rect.x -= (settings.horizontal_platform_speed)
-        elif platform.type == 'vertical':
-            if platform.up:
-                player.rect.y -= (settings.vertical_platform_speed)
-            else:
-                player.rect.y += (settings.vertical_platform_speed)
-
-    def vertical_movement_and_collision(self) -> None:
-        '''
-        Applies gravity to the player, makes player land on a platform (and then performs special platform action)
-        '''
-        self.player.sprite.apply_gravity()
-        player = self.player.sprite
-
-        for platform in self.platforms.sprites():
-            stands = (platform.rect.top == player.rect.bottom and player.rect.right >=
-                      platform.rect.left and player.rect.left <= platform.rect.right)
-            if platform.rect.colliderect(player.rect) or stands:
-                if player.direction.y > 0 and player.rect.bottom - player.direction.y - 1 <= platform.rect.top:
-                    player.rect.bottom = platform.rect.top
-                    player.direction.y = 0
-                    if self.score < platform.number:
-                        self.score = platform.number
-                    self.platform_type_action(platform)
-
-    def horizontal_movement(self) -> None:
+            seed (Optional[int]): seed of the game, random if None
         '''
-        Changes player's horizontal position
-        '''
-        player = self.player.sprite
-        player.rect.x += player.direction.x * player.speed
+        # reset
+        pygame.event.clear()
+        self.state = self.States.active
+        self.nick = ""
 
-# ========================= GAME DIFFICULTY =======================
+        super().new_game(seed)
+        self.replay = Replay(self.seed)
 
-    def set_game_difficulty(self, parameters: Dict[str, int]) -> None:
-        '''
-        Sets game difficulty - world descend speed and missile spawn frequency range
+# ======================= GAME LOOP =============================
 
-        Args:
-            parameters (Dict[str, int]): a dictionary of certain difficulty parameters
+    class States:
         '''
-        self.world_descend_speed = parameters['world_descend_speed']
-        self.missile_spawn_frequency_down = parameters['missile_spawn_frequency_down']
-        self.missile_spawn_frequency_up = parameters['missile_spawn_frequency_up']
-
-    def adjust_game_difficulty(self) -> None:
+        Simple "enum" class for game states
         '''
-        Adjusts game difficulty based on current score
+        init, start, menu, active, pause, game_over, nick_input, scoreboard = range(8)
+    
+    def show_scoreboard(self) -> None:
         '''
-        if self.score >= settings.score_thresholds[0] and self.score < settings.score_thresholds[1]:
-            self.set_game_difficulty(settings.game_difficulty[1])
-        elif self.score >= settings.score_thresholds[1] and self.score < settings.score_thresholds[2]:
-            self.set_game_difficulty(settings.game_difficulty[2])
-        elif self.score >= settings.score_thresholds[2] and self.score < settings.score_thresholds[3]:
-            self.set_game_difficulty(settings.game_difficulty[3])
-        elif self.score >= settings.score_thresholds[3]:
-            self.set_game_difficulty(settings.game_difficulty[4])
-
-# ========================= GAME OVER ============================
-
-    def game_over(self) -> bool:
+        Displays the first page of scoreboard, from which a new game can be started
         '''
-        Tells if game is over
+        scoreboard.reload_pages()
+        self.show_scoreboard_page(0)
+        self.state = self.States.scoreboard
 
-        Returns:
-            bool: True if game is over, False otherwise
+    def show_scoreboard_page(self, page: int) -> None:
         '''
-        player = self.player.sprite
-
-        hit_by_missile = False
-        for missile in self.missiles.sprites():
-            if missile.rect.colliderect(player.rect):
-                hit_by_missile = True
-                break
-
-        game_over_position = (player.rect.right < 0 or player.rect.left >
-                              settings.screen_width or player.rect.bottom >= settings.screen_height or hit_by_missile)
-        if game_over_position:
-            player.rect.x, player.rect.y = settings.start_pos[0], settings.start_pos[1]
-            return True
-        return False
-
-# ======================= GAME LOOP =============================
+        Displays a page of scoreboard
 
-    def resume_collapse(self) -> None:
-        '''
-        Resumes PLATFORM_COLLAPSE event after end of pause (if event was toggled during pause)
+        Args:
+            page (int): page number, from 0
         '''
-        remaining_collapse_time = self.collapse_time - self.pause_time
-        pygame.time.set_timer(self.PLATFORM_COLLAPSE,
-                              remaining_collapse_time, 1)
-        self.collapse_time = -1
+        self.scoreboard_page = page
+        self.scoreboard_loading = not self.display.scoreboard(page)
 
-    def resume_missiles(self) -> None:
-        '''
-        Resumes SPAWN_MISSILE event after end of pause (if event was toggled during pause)
+    def submit_score(self, replay: Replay, nick: str) -> None:
         '''
-        remaining_missile_time = self.missile_time - self.pause_time
-        pygame.time.set_timer(self.SPAWN_MISSILE, remaining_missile_time, 1)
-        self.missile_time = -1
+        Adds game's score to scoreboard and saves its replay, if replaying the game confirms the score.
+        It runs on a worker thread, so the game doesn't freeze while a long game is replayed
 
-    class States:
-        '''
-        Simple "enum" class for game states
+        Args:
+            replay (Replay): replay of the game, with its claimed score
+            nick (str): player's nick
         '''
-        init, start, menu, active, pause, game_over, nick_input = range(7)
-    
+        if verify(replay):
+            scoreboard.add_score(replay.score, nick)
+            save_replay(replay, nick)
+
     def event_queue(self) -> None:
         '''
-        Main event queue. Handles game quitting, custom events and different game states
+        Main event queue. Handles game quitting and different game states
         '''
         for event in pygame.event.get():
             # quit game
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
-            if self.state == self.States.active or self.state == self.States.pause:
-                # game events
-                if event.type == self.PLATFORM_COLLAPSE:
-                    if self.state == self.States.active:
-                        self.platform_collapse()
-                    else:
-                        self.collapse_time = pygame.time.get_ticks()
-                if event.type == self.SPAWN_MISSILE:
-                    if self.spawn_missiles:
-                        if self.state == self.States.active:
-                            self.spawn_missile()
-                            self.missile_queue()
-                        else:
-                            self.missile_time = pygame.time.get_ticks()
             if self.state == self.States.active:
                 if event.type == pygame.KEYDOWN:
+                    if self.latency is not None:
+                        self.latency.key_down(event.key)
+                    # profiler's summary
+                    if event.key == pygame.K_F3 and self.profiler is not None:
+                        self.show_hud = not self.show_hud
                     # pause
                     if event.key == pygame.K_ESCAPE:
                         self.display.pause()
                         self.state = self.States.pause
-                        self.pause_time = pygame.time.get_ticks()
             else:
                 if event.type == pygame.KEYDOWN:
                     # handle different game states
                     if self.state == self.States.start and event.key == pygame.K_RETURN:  # ENTER
                         self.new_game()
                         self.state = self.States.active
+                    elif self.state == self.States.scoreboard:
+                        if event.key == pygame.K_RETURN:  # ENTER
+                            self.new_game()
+                            self.state = self.States.active
+                        elif event.key == pygame.K_UP and self.scoreboard_page > 0:
+                            self.show_scoreboard_page(self.scoreboard_page - 1)
+                        elif event.key == pygame.K_DOWN and self.scoreboard_page < scoreboard.get_page_count() - 1:
+                            self.show_scoreboard_page(self.scoreboard_page + 1)
                     elif self.state == self.States.pause and event.key == pygame.K_ESCAPE:  # ESC
                         self.state = self.States.active
-                        if self.collapse_time != -1:
-                            self.resume_collapse()
-                        if self.missile_time != -1:
-                            self.resume_missiles()
                     elif self.state == self.States.game_over and event.key == pygame.K_RETURN:  # ENTER
                         if scoreboard.is_good_enough_score(self.score):
                             self.display.input("")
                             self.state = self.States.nick_input
                         else:
-                            self.display.scoreboard()
-                            self.state = self.States.start
+                            self.show_scoreboard()
                     elif self.state == self.States.nick_input:  # get nick from user
                         if event.key == pygame.K_RETURN:
                             if self.nick:
-                                scoreboard.add_score(self.score, self.nick)
-                                self.display.scoreboard()
-                                self.state = self.States.start
+                                # only scores confirmed by replaying the game are accepted, the scoreboard
+                                # is drawn again once it's done (quitting waits for it)
+                                self.replay.score = self.score
+                                self.verification = threading.Thread(
+                                    target=self.submit_score, args=(self.replay, self.nick), name="ReplayVerifier")
+                                self.verification.start()
+                                self.show_scoreboard()
                         elif event.key == pygame.K_BACKSPACE:
                             if self.nick:
                                 self.nick = self.nick[:-1]
@@ -380,40 +203,106 @@ class Game:
                             self.nick += event.unicode
                             self.display.input(self.nick)
 
-    def run(self) -> None:
+    def remember_positions(self) -> None:
         '''
-        Updates and displays one frame of the game
+        Remembers sprites' positions before a tick, for interpolation
         '''
+        self.previous_positions = {sprite: (sprite.rect, sprite.rect.x, sprite.rect.y)
+                                   for group in (self.platforms, self.player, self.missiles) for sprite in group}
+
+    def update(self) -> None:
+        '''
+        Handles events and simulates one tick of the game
+        '''
+        profiler = self.profiler
+
         # event queue
         self.event_queue()
+        if profiler is not None:
+            profiler.mark(Phases.event_queue)
 
         if self.state == self.States.active:
             # ====== STATE ======
-            # player
-            self.horizontal_movement()
-            self.vertical_movement_and_collision()
-            self.player.update(self.world_descend_speed)
-
-            # platforms and missiles
-            self.manage_platforms_and_missiles()
-            self.platforms.update(self.world_shift + self.world_descend_speed)
-            self.missiles.update(self.world_descend_speed)
-
-            # scroll screen
-            self.scroll_y()
-
-            # adjust game difficulty based on current score
-            self.adjust_game_difficulty()
-
-            # ====== DISPLAY ======
-            self.display.game(self.platforms, self.player,
-                              self.missiles, self.score)
+            self.remember_positions()
+            inputs = self.read_input()
+            self.replay.record(inputs)
+            standing = self.player.sprite.direction.y == 0
+            game_over = self.step(inputs)
+            if self.latency is not None:
+                self.latency.tick(self.player.sprite, standing)
+            self.scrolled = self.scrolled or self.world_shift != 0
 
             # game over
-            if self.game_over():
+            if game_over:
+                self.render()
                 self.display.game_over()
                 self.state = self.States.game_over
 
         elif self.state == self.States.init:
             self.display.menu()
             self.state = self.States.start
+
+        elif self.state == self.States.start:
+            # menu is already on the screen, time to open the scoreboard
+            scoreboard.start()
+
+        elif self.state == self.States.scoreboard:
+            if self.verification is not None and not self.verification.is_alive():
+                self.verification = None
+                scoreboard.reload_pages()
+                self.show_scoreboard_page(self.scoreboard_page)
+            elif self.scoreboard_loading and scoreboard.is_page_fetched(self.scoreboard_page):
+                self.show_scoreboard_page(self.scoreboard_page)
+
+        if self.spectators is not None:
+            self.spectators.publish(self)
+
+    def render(self, alpha: float = 1.0) -> None:
+        '''
+        Draws the game, if it's running
+
+        Args:
+            alpha (float): progress from the previous tick to the last one, 0 draws previous positions, 1 current ones
+        '''
+        if self.state != self.States.active:
+            return
+        profiler = self.profiler
+
+        self.display.game(self.platforms, self.player, self.missiles, self.score,
+                          self.scrolled, alpha, self.previous_positions)
+        self.scrolled = False
+        if profiler is not None and self.show_hud:
+            if profiler.frames % settings.fps == 0:
+                self.hud_lines = profiler.hud_lines() + [self.display.text_cache.info()]
+            self.display.overlay(self.hud_lines)
+        if profiler is not None:
+            profiler.mark(Phases.display_game)
+
+    def advance(self, elapsed: float) -> None:
+        '''
+        Runs as many ticks as fit in elapsed time and renders one frame. When the game falls behind,
+        frames are dropped rather than slowing the simulation down, up to settings.max_ticks_per_frame ticks per frame
+
+        Args:
+            elapsed (float): real time since the previous frame, in seconds
+        '''
+        if self.profiler is not None:
+            self.profiler.start_frame()
+
+        tick = 1 / settings.fps
+        self.accumulator = min(self.accumulator + elapsed,
+                               settings.max_ticks_per_frame * tick)
+        while self.accumulator >= tick:
+            self.update()
+            self.accumulator -= tick
+        self.render(self.accumulator / tick)
+
+    def run(self) -> None:
+        '''
+        Updates and displays one frame of the game - a single tick, without interpolation
+        '''
+        if self.profiler is not None:
+            self.profiler.start_frame()
+
+        self.update()
+        self.render()
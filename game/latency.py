@@ -0,0 +1,151 @@
+'''
+Module with input-to-photon latency measurement. Presses of gameplay keys are timestamped when SDL delivers them -
+while the main loop waits for the next frame, keyboard is polled every settings.latency_poll_interval instead of
+sleeping, so time spent in the event queue is measured too. A press is done when a tick changes player's movement
+the way it asks for (moving left or right, starting a jump) and the first frame drawn after that tick is presented
+
+Usage:
+    python main.py --latency
+'''
+
+import time
+from typing import Dict, List, Tuple
+
+import pygame
+
+import settings
+from player import Keys, Player
+from profiler import percentile
+
+
+class LatencyMeter:
+    '''
+    LatencyMeter measures latencies of gameplay key presses and reports their histogram
+
+    Attributes:
+        keys (Dict[int, int]): bit flags from Keys of measured keys, by pygame key
+        polled (int): bit flags of keys seen pressed at the last poll
+        arrivals (Dict[int, float]): times presses not taken from the event queue yet were seen at, by bit flag
+        pending (List[Tuple[int, float]]): presses not shown by a tick yet - their bit flags and times
+        ticked (List[float]): times of presses shown by ticks after the last presented frame
+        latencies (List[float]): latencies of measured presses, in seconds
+        dropped (int): number of presses not shown by a tick within settings.latency_timeout
+    '''
+
+    def __init__(self) -> None:
+        self.keys = {pygame.K_LEFT: Keys.left,
+                     pygame.K_RIGHT: Keys.right, pygame.K_SPACE: Keys.jump}
+        self.polled = 0
+        self.arrivals: Dict[int, float] = {}
+        self.pending: List[Tuple[int, float]] = []
+        self.ticked: List[float] = []
+        self.latencies: List[float] = []
+        self.dropped = 0
+
+    def poll(self) -> None:
+        '''
+        Pumps SDL events and timestamps measured keys pressed since the last poll
+        '''
+        pygame.event.pump()
+        now = time.perf_counter()
+        pressed = pygame.key.get_pressed()
+        polled = 0
+        for key, flag in self.keys.items():
+            if pressed[key]:
+                polled |= flag
+                if not self.polled & flag:
+                    self.arrivals.setdefault(flag, now)
+        self.polled = polled
+
+    def wait(self, deadline: float) -> None:
+        '''
+        Waits until a time, polling keyboard meanwhile - replaces sleeping between frames
+
+        Args:
+            deadline (float): time.perf_counter() time to wait until
+        '''
+        while True:
+            self.poll()
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, settings.latency_poll_interval))
+
+    def key_down(self, key: int) -> None:
+        '''
+        Starts measuring a press taken from the event queue, timed when it was polled or now
+
+        Args:
+            key (int): pygame key
+        '''
+        flag = self.keys.get(key)
+        if flag is None:
+            return
+        self.pending.append((flag, self.arrivals.pop(flag, time.perf_counter())))
+        # the key is down already, a later poll must not take it for another press
+        self.polled |= flag
+
+    def tick(self, player: Player, standing: bool) -> None:
+        '''
+        Finds pending presses shown by a tick - called after every tick of an active game
+
+        Args:
+            player (Player): the player after the tick
+            standing (bool): tells if the player stood before the tick, so it could start a jump
+        '''
+        shown = 0
+        if player.direction.x < 0:
+            shown |= Keys.left
+        elif player.direction.x > 0:
+            shown |= Keys.right
+        if standing and player.direction.y < 0:
+            shown |= Keys.jump
+
+        now = time.perf_counter()
+        pending = []
+        for flag, pressed in self.pending:
+            if shown & flag:
+                self.ticked.append(pressed)
+            elif now - pressed > settings.latency_timeout:
+                self.dropped += 1
+            else:
+                pending.append((flag, pressed))
+        self.pending = pending
+
+    def presented(self) -> None:
+        '''
+        Measures presses shown by ticks drawn in a frame just presented - called after every presented frame
+        '''
+        if self.ticked:
+            now = time.perf_counter()
+            self.latencies.extend(now - pressed for pressed in self.ticked)
+            self.ticked = []
+
+    def histogram(self) -> List[Tuple[float, int]]:
+        '''
+        Counts measured latencies in buckets settings.latency_bucket wide
+
+        Returns:
+            List[Tuple[float, int]]: lower bounds of buckets in seconds and counts of latencies in them,
+                from 0 up to the highest latency
+        '''
+        counts = [0] * (int(max(self.latencies, default=0) / settings.latency_bucket) + 1)
+        for latency in self.latencies:
+            counts[int(latency / settings.latency_bucket)] += 1
+        return [(bucket * settings.latency_bucket, count) for bucket, count in enumerate(counts)]
+
+    def report(self) -> None:
+        '''
+        Prints percentiles and histogram of measured latencies - for atexit
+        '''
+        latencies = sorted(self.latencies)
+        print(f"input latency of {len(latencies)} presses ({self.dropped} without visible effect): "
+              f"p50 {1000 * percentile(latencies, 50):.1f} ms, p90 {1000 * percentile(latencies, 90):.1f} ms, "
+              f"p99 {1000 * percentile(latencies, 99):.1f} ms, max {1000 * max(latencies, default=0):.1f} ms")
+        if not latencies:
+            return
+        histogram = self.histogram()
+        most = max(count for _, count in histogram)
+        for bucket, count in histogram:
+            print(f"{1000 * bucket:6.0f} - {1000 * (bucket + settings.latency_bucket):3.0f} ms {count:6d} "
+                  + '#' * round(40 * count / most))
@@ -0,0 +1,253 @@
+'''
+Module with level generation. Upcoming platforms are generated in chunks, every platform is checked to be
+reachable from the previous one with jump envelopes - tables of how far a jump gets horizontally before landing
+at a given height, simulated with player's physics. Chunks can be built ahead on a worker thread, so the game loop
+only takes ready platforms. Every chunk has its own random number generator seeded with level's seed and chunk's
+index, so the same seed always gives the same level, however chunks are built
+'''
+
+import queue
+import threading
+from functools import lru_cache
+from random import Random
+from typing import NamedTuple, Optional, Tuple
+
+import pygame
+
+import settings
+
+
+class PlatformSpec(NamedTuple):
+    '''
+    PlatformSpec describes a generated platform, placed relative to the previous one
+
+    Attributes:
+        map_x (int): map x coordinate (tile number)
+        height_difference (int): number of tiles above the previous platform
+        length (int): length in tiles number
+        type (str): type of platform
+    '''
+    map_x: int
+    height_difference: int
+    length: int
+    type: str
+
+
+# the whole-width start platform every level begins with
+start_platform = PlatformSpec(0, 0, settings.map_width, 'normal')
+
+
+@lru_cache(maxsize=16)
+def jump_envelope(jump_speed: float, gravity: float, horizontal_speed: int) -> Tuple[int, ...]:
+    '''
+    Simulates a jump the way Engine moves the player and finds where it can land
+
+    Args:
+        jump_speed (float): vertical speed at the start of the jump (negative)
+        gravity (float): gravity
+        horizontal_speed (int): player's horizontal speed
+
+    Returns:
+        Tuple[int, ...]: the farthest horizontal distance of landing on a platform by its height above
+            the start of the jump, in pixels; -1 for heights the jump can't land on
+    '''
+    width, height = settings.player_dimensions
+    player = pygame.Rect(0, -height, width, height)
+    speed = jump_speed
+    falling = []  # tick, bottom and speed of every frame falling down to the start height
+    tick = 0
+    while player.bottom < 0 or speed <= 0:
+        tick += 1
+        speed += gravity
+        player.y += speed
+        if speed > 0:
+            falling.append((tick, player.bottom, speed))
+
+    apex = -min(bottom for _, bottom, _ in falling)
+    reach = []
+    for platform_height in range(apex + 1):
+        top = -platform_height
+        landing = -1
+        # the same landing rule as Engine.vertical_movement_and_collision
+        for tick, bottom, speed in falling:
+            overlaps = bottom > top and bottom - height < top + settings.platform_thickness
+            if (overlaps or bottom == top) and bottom - speed - 1 <= top:
+                landing = tick * horizontal_speed
+                break
+        reach.append(landing)
+    return tuple(reach)
+
+
+def reachable(source: PlatformSpec, target: PlatformSpec) -> bool:
+    '''
+    Tells if player standing on a platform can jump on the next one
+
+    Args:
+        source (PlatformSpec): platform player jumps from
+        target (PlatformSpec): platform above it
+
+    Returns:
+        bool: True if target can be reached
+    '''
+    # platforms' levels lag behind their positions by up to a tile, vertical platforms can be waited for at their best
+    height = (target.height_difference + 1) * settings.tile_size
+    for platform in (source, target):
+        if platform.type == 'vertical':
+            height -= settings.vertical_platform_range
+    # bounce platforms jump on their own
+    jump_speed = settings.bounce_speed if source.type == 'bounce' else settings.jump_speed
+    reach = jump_envelope(jump_speed, settings.gravity,
+                          settings.horizontal_speed)
+    height = max(0, height)
+    if height >= len(reach) or reach[height] < 0:
+        return False
+
+    # horizontal platforms cross the whole screen
+    if 'horizontal' in (source.type, target.type):
+        return True
+    width = settings.player_dimensions[0]
+    source_left = source.map_x * settings.tile_size - width
+    source_right = (source.map_x + source.length) * settings.tile_size
+    target_left = target.map_x * settings.tile_size - width
+    target_right = (target.map_x + target.length) * settings.tile_size
+    return max(0, target_left - source_right, source_left - target_right) <= reach[height]
+
+
+class LevelGenerator:
+    '''
+    LevelGenerator gives platforms of a level one by one. Without a worker thread chunks are built when needed,
+    with it they are built ahead and handed over through a queue
+
+    Args:
+        seed (int): seed of the level
+
+    Attributes:
+        seed (int): seed of the level
+        chunk_index (int): index of current chunk
+        chunk (Tuple[PlatformSpec, ...]): current chunk
+        position (int): number of platforms taken from current chunk
+        chunks (Optional[queue.Queue]): chunks built ahead by the worker, None if there's no worker
+        stopped (threading.Event): set when the worker should stop
+        built (int): number of chunks built
+    '''
+
+    def __init__(self, seed: int) -> None:
+        self.seed = seed
+        self.chunk_index = -1
+        self.chunk: Tuple[PlatformSpec, ...] = (start_platform,)
+        self.position = 1
+        self.chunks: Optional[queue.Queue] = None
+        self.stopped = threading.Event()
+        self.built = 0
+
+    def build_chunk(self, index: int, previous: PlatformSpec) -> Tuple[PlatformSpec, ...]:
+        '''
+        Builds a chunk of platforms, each reachable from the previous one. A platform is drawn again when it
+        can't be reached, after settings.level_attempts draws it's put right above the previous one, as low as possible
+
+        Args:
+            index (int): index of the chunk
+            previous (PlatformSpec): the last platform of the previous chunk
+
+        Returns:
+            Tuple[PlatformSpec, ...]: platforms of the chunk
+        '''
+        rng = Random(self.seed * 2**32 + index)
+        chunk = []
+        for _ in range(settings.level_chunk_size):
+            for _ in range(settings.level_attempts):
+                platform = PlatformSpec(rng.randint(0, settings.map_width - 3),
+                                        rng.randint(settings.platform_height_difference[0],
+                                                    settings.platform_height_difference[1]),
+                                        rng.randint(settings.platform_length[0], settings.platform_length[1]),
+                                        rng.choice(settings.platform_types))
+                if reachable(previous, platform):
+                    break
+            else:
+                platform = PlatformSpec(min(previous.map_x, settings.map_width - 3),
+                                        settings.platform_height_difference[0], platform.length, 'normal')
+            chunk.append(platform)
+            previous = platform
+        self.built += 1
+        return tuple(chunk)
+
+    def next(self) -> PlatformSpec:
+        '''
+        Gives the next platform of the level
+
+        Returns:
+            PlatformSpec: the next platform
+        '''
+        if self.position == len(self.chunk):
+            if self.chunks is not None:
+                self.chunk = self.chunks.get()
+            else:
+                self.chunk = self.build_chunk(
+                    self.chunk_index + 1, self.chunk[-1])
+            self.chunk_index += 1
+            self.position = 0
+        self.position += 1
+        return self.chunk[self.position - 1]
+
+# ============================ WORKER ===============================
+
+    def start(self) -> None:
+        '''
+        Starts building chunks ahead on a worker thread, up to settings.level_queue_size chunks
+        '''
+        self.stopped = threading.Event()
+        self.chunks = queue.Queue(settings.level_queue_size)
+        threading.Thread(target=self.work, args=(self.chunk_index + 1, self.chunk[-1], self.chunks, self.stopped),
+                         daemon=True).start()
+
+    def stop(self) -> None:
+        '''
+        Stops the worker, chunks are built when needed again
+        '''
+        self.stopped.set()
+        self.chunks = None
+
+    def work(self, index: int, previous: PlatformSpec, chunks: queue.Queue, stopped: threading.Event) -> None:
+        '''
+        Builds chunks until stopped - target of the worker thread
+
+        Args:
+            index (int): index of the first chunk to build
+            previous (PlatformSpec): the last platform before it
+            chunks (queue.Queue): queue of built chunks
+            stopped (threading.Event): set when the worker should stop
+        '''
+        while not stopped.is_set():
+            chunk = self.build_chunk(index, previous)
+            while not stopped.is_set():
+                try:
+                    chunks.put(chunk, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+            index += 1
+            previous = chunk[-1]
+
+# ============================ SNAPSHOT ===============================
+
+    def snapshot(self) -> Tuple[int, int, Tuple[PlatformSpec, ...], int]:
+        '''
+        Takes a snapshot of generator's state
+
+        Returns:
+            Tuple[int, int, Tuple[PlatformSpec, ...], int]: seed, index of current chunk, the chunk and position in it
+        '''
+        return self.seed, self.chunk_index, self.chunk, self.position
+
+    def restore(self, state: Tuple[int, int, Tuple[PlatformSpec, ...], int]) -> None:
+        '''
+        Restores generator's state from a snapshot, restarting the worker if there is one
+
+        Args:
+            state (Tuple[int, int, Tuple[PlatformSpec, ...], int]): seed, index of current chunk, the chunk and position in it
+        '''
+        threaded = self.chunks is not None
+        self.stop()
+        self.seed, self.chunk_index, self.chunk, self.position = state
+        if threaded:
+            self.start()
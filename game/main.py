@@ -1,35 +1,141 @@
 '''
-Module with game setup and main game loop
+Module with game setup and main game loop.
+Run with --startup-time to print how long the game takes to start up to the first frame,
+with --profile to measure phases of every frame (F3 toggles on-screen summary),
+with --spectators to stream the game to spectators (see spectate.py),
+with --record to record the game to a video or a frame sequence (see recorder.py),
+with --score-service to share the scoreboard with other cabinets (see score_service.py),
+with --render-scale and --window-scale to render at a lower resolution than the window shows (see display.Presenter),
+with --latency to measure input-to-photon latency of gameplay keys (see latency.py)
 '''
 
+import time
+startup_start = time.perf_counter()
+
+import argparse
+import atexit
 import pygame
+from typing import List, Tuple
 
 import settings
+from display import Presenter
+from fonts import load_fonts
 from game import Game
+from profiler import Phases
+
+imports_end = time.perf_counter()
+
+
+def print_startup_times(times: List[Tuple[str, float]]) -> None:
+    '''
+    Prints startup phases durations
+
+    Args:
+        times (List[Tuple[str, float]]): list of phase names and their end times, in order of phases
+    '''
+    phase_start = startup_start
+    for phase, phase_end in times:
+        print(f"{phase:<12} {1000*(phase_end - phase_start):8.1f} ms")
+        phase_start = phase_end
+    print(f"{'total':<12} {1000*(phase_start - startup_start):8.1f} ms")
+
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=settings.title)
+    parser.add_argument('--startup-time', action='store_true',
+                        help="print startup times up to the first frame and quit")
+    parser.add_argument('--profile', action='store_true',
+                        help="profile frames and show their summary")
+    parser.add_argument('--profile-out', metavar='FILE',
+                        help="profile frames and export the last ones to FILE at exit (.json or .csv)")
+    parser.add_argument('--spectators', metavar='ADDRESS',
+                        help="stream the game to spectators connecting to ADDRESS (host:port or unix:path)")
+    parser.add_argument('--record', metavar='OUTPUT',
+                        help="record presented frames to OUTPUT - a video file, or a directory of frames")
+    parser.add_argument('--record-every', type=int, default=1, metavar='N',
+                        help="record every Nth presented frame")
+    parser.add_argument('--record-format', metavar='FORMAT',
+                        help="recording format (png, raw or encoder), by default the encoder for files "
+                             "and PNG for directories")
+    parser.add_argument('--score-service', metavar='ADDRESS',
+                        help="use the score service at ADDRESS (host:port or unix:path) instead of a local scoreboard")
+    parser.add_argument('--render-scale', type=float, default=settings.render_scale, metavar='SCALE',
+                        help="render at SCALE times screen resolution, scaled to the window when presented")
+    parser.add_argument('--window-scale', type=float, default=settings.window_scale, metavar='SCALE',
+                        help="open a window SCALE times screen size, 0 for the largest integer multiple "
+                             "of rendering resolution fitting the desktop")
+    parser.add_argument('--latency', action='store_true',
+                        help="measure input-to-photon latency of gameplay keys and print its histogram at exit")
+    args = parser.parse_args()
+    if args.score_service:
+        settings.score_service_address = args.score_service
+    startup_times = [('imports', imports_end)]
+
     # Pygame setup
     pygame.init()
-    screen = pygame.display.set_mode(
-        (settings.screen_width, settings.screen_height))
+    presenter = Presenter(args.render_scale, args.window_scale)
+    screen = presenter.surface
     pygame.display.set_caption(settings.title)
     clock = pygame.time.Clock()
 
     logo = pygame.transform.scale(pygame.image.load(
         settings.logo_path).convert_alpha(), (settings.logo_width, settings.logo_height))
     pygame.display.set_icon(logo)
+    startup_times.append(('pygame.init', time.perf_counter()))
 
-    big_font = pygame.font.SysFont(
-        settings.font_name, settings.big_font_size, True)
-    small_font = pygame.font.SysFont(
-        settings.font_name, settings.small_font_size, True)
-    fonts = {'big_font': big_font, 'small_font': small_font}
+    fonts = load_fonts()
+    startup_times.append(('fonts', time.perf_counter()))
 
     game = Game(screen, logo, fonts)
+    # frames are presented at the tick rate while recording, so the recording keeps time
+    render_fps = settings.fps if args.record else settings.render_fps
+    profiler = None
+    if args.profile or args.profile_out:
+        # uncapped frames are late when they miss a 60 Hz display's refresh
+        profiler = game.enable_profiler(args.profile, 1 / (render_fps or 60))
+        if args.profile_out:
+            atexit.register(profiler.export, args.profile_out)
+    # modules of optional features (asyncio server, encoder subprocess) are imported only when they're used
+    if args.spectators:
+        from spectate import SpectatorServer
+        game.spectators = SpectatorServer(args.spectators)
+        game.spectators.start()
+    recorder = None
+    if args.record:
+        from recorder import Formats, Recorder
+        if args.record_format is not None and args.record_format not in Formats.names:
+            parser.error(f"unknown recording format {args.record_format!r}")
+        recorder = Recorder(args.record, args.record_every, args.record_format,
+                            settings.fps / args.record_every)
+        recorder.start(screen)
+        atexit.register(recorder.report)
+    latency = None
+    if args.latency:
+        from latency import LatencyMeter
+        latency = game.latency = LatencyMeter()
+        atexit.register(latency.report)
 
-    # Main game loop
+    # Main game loop - simulation ticks at settings.fps, frames are rendered at up to settings.render_fps
+    previous_frame = time.perf_counter()
     while True:
-        game.run()
+        now = time.perf_counter()
+        game.advance(now - previous_frame)
+        previous_frame = now
 
-        pygame.display.update()
-        clock.tick(settings.fps)
+        presenter.present(game.display.pop_dirty_rects())
+        if latency is not None:
+            latency.presented()
+        if recorder is not None:
+            recorder.capture(screen)
+        if profiler is not None:
+            profiler.mark(Phases.display_update)
+            profiler.end_frame()
+        if args.startup_time:
+            startup_times.append(('first frame', time.perf_counter()))
+            print_startup_times(startup_times)
+            pygame.quit()
+            break
+        if latency is not None and render_fps:
+            # keys pressed while waiting for the next frame are timestamped right away
+            latency.wait(now + 1 / render_fps)
+        clock.tick(render_fps)
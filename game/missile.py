@@ -2,6 +2,8 @@ import pygame
 import settings
 from typing import Tuple
 
+from atlas import atlas
+
 
 class Missile(pygame.sprite.Sprite):
     '''
@@ -16,8 +18,16 @@ class Missile(pygame.sprite.Sprite):
 
     def __init__(self, screen_pos: Tuple[int, int]) -> None:
         super().__init__()
-        self.image = pygame.Surface(settings.missile_dimensions)
-        self.image.fill(settings.missile_color)
+        self.reset(screen_pos)
+
+    def reset(self, screen_pos: Tuple[int, int]) -> None:
+        '''
+        Sets missile up as a new one
+
+        Args:
+            screen_pos (Tuple[int, int]): tuple of initial screen coordinates (pixels)
+        '''
+        self.image = atlas.get('missile')
         self.rect = self.image.get_rect(topleft=screen_pos)
 
         # missile's movement
@@ -1,11 +1,15 @@
 import pygame
 import settings
-from typing import Tuple
+from collections import deque
+from typing import Deque, Iterator, List, Tuple
+
+from atlas import atlas
 
 
 class Platform(pygame.sprite.Sprite):
     '''
-    Platform object represents a platform of a certain type and coordinates
+    Platform object represents a platform of a certain type and coordinates. Platforms share their images
+    from the surface atlas and can be reset to be reused
 
     Args:
         map_pos (Tuple[int, int]): tuple of initial map coordinates (tile numbers)
@@ -19,13 +23,24 @@ class Platform(pygame.sprite.Sprite):
         map_coords (pygame.math.Vector2): vector of platform's map coordinates 
         right (bool): horizontal platform moves right if true, left otherwise
         up (bool): vertical platform moves up if true, down otherwise
-        level (int): horizontal platform's level relative to its zero level
+        level (int): vertical platform's level relative to its zero level
     '''
 
     def __init__(self, map_pos: Tuple[int, int], length: int, type: str, number: int) -> None:
         super().__init__()
-        self.image = pygame.Surface(
-            (length * settings.tile_size, settings.platform_thickness))
+        self.reset(map_pos, length, type, number)
+
+    def reset(self, map_pos: Tuple[int, int], length: int, type: str, number: int) -> None:
+        '''
+        Sets platform up as a new one
+
+        Args:
+            map_pos (Tuple[int, int]): tuple of initial map coordinates (tile numbers)
+            length (int): length in tiles number
+            type (str): type of platform
+            number (int): number of platform in current game
+        '''
+        self.image = atlas.get(type, length)
 
         self.number = number
         self.type = type
@@ -35,21 +50,10 @@ class Platform(pygame.sprite.Sprite):
                       map_pos[1] * settings.tile_size)
         self.rect = self.image.get_rect(topleft=screen_pos)
 
-        # set platform's image and optional attributes based on type
-        self.type = type
-        if type == 'normal':
-            self.image.fill(settings.normal_platform_color)
-        elif type == 'bounce':
-            self.image.fill(settings.bounce_platform_color)
-        elif type == 'collapse':
-            self.image.fill(settings.collapse_platform_color)
-        elif type == 'horizontal':
-            self.image.fill(settings.horizontal_platform_color)
-            self.right = True
-        elif type == 'vertical':
-            self.image.fill(settings.vertical_platform_color)
-            self.up = True
-            self.level = 0
+        # movement attributes are set for every type, a reused platform mustn't keep ones of its previous type
+        self.right = True
+        self.up = True
+        self.level = 0
 
     def update(self, y_shift: int) -> None:
         '''
@@ -85,3 +89,87 @@ class Platform(pygame.sprite.Sprite):
                 self.rect.y += settings.vertical_platform_speed
                 if self.level >= settings.vertical_platform_range:
                     self.up = True
+
+
+class PlatformGroup(pygame.sprite.Group):
+    '''
+    PlatformGroup is a sprite group which keeps platforms ordered by number, i.e. by height - new platforms are
+    spawned above the highest one. The lowest and the highest platform are accessed in O(1), removing the lowest one
+    is O(1) and iterating doesn't copy the group
+
+    Attributes:
+        ordered (Deque[Platform]): platforms from the lowest
+    '''
+
+    def __init__(self, *platforms: Platform) -> None:
+        self.ordered: Deque[Platform] = deque()
+        super().__init__(*platforms)
+
+    def add_internal(self, sprite: Platform, layer: None = None) -> None:
+        '''
+        Adds platform to the group internally, keeping the order
+
+        Args:
+            sprite (Platform): added platform
+            layer (None): unused, groups have no layers
+        '''
+        super().add_internal(sprite, layer)
+        if not self.ordered or sprite.number > self.ordered[-1].number:
+            self.ordered.append(sprite)
+        else:
+            i = 0
+            while self.ordered[i].number < sprite.number:
+                i += 1
+            self.ordered.insert(i, sprite)
+
+    def remove_internal(self, sprite: Platform) -> None:
+        '''
+        Removes platform from the group internally
+
+        Args:
+            sprite (Platform): removed platform
+        '''
+        super().remove_internal(sprite)
+        if self.ordered[0] is sprite:
+            self.ordered.popleft()
+        elif self.ordered[-1] is sprite:
+            self.ordered.pop()
+        else:
+            self.ordered.remove(sprite)
+
+    def bottom(self) -> Platform:
+        '''
+        Gets the lowest platform
+
+        Returns:
+            Platform: platform with the lowest number
+        '''
+        return self.ordered[0]
+
+    def top(self) -> Platform:
+        '''
+        Gets the highest platform
+
+        Returns:
+            Platform: platform with the highest number
+        '''
+        return self.ordered[-1]
+
+    def sprites(self) -> List[Platform]:
+        '''
+        Gets platforms in order of height
+
+        Returns:
+            List[Platform]: platforms from the lowest
+        '''
+        return list(self.ordered)
+
+    def __iter__(self) -> Iterator[Platform]:
+        return iter(self.ordered)
+
+    def update(self, *args, **kwargs) -> None:
+        '''
+        Updates all platforms, they can't be added or removed meanwhile
+        '''
+        for platform in self.ordered:
+            platform.update(*args, **kwargs)
@@ -2,6 +2,36 @@ import pygame
 import settings
 from typing import Tuple
 
+from atlas import atlas
+
+
+class Keys:
+    '''
+    Simple "enum" class for bit flags of player's input in a single frame
+    '''
+    left, right, jump, pause = 1, 2, 4, 8
+
+
+def read_keyboard() -> int:
+    '''
+    Reads currently pressed keys
+
+    Returns:
+        int: bit flags from Keys of currently pressed keys
+    '''
+    keys = pygame.key.get_pressed()
+
+    inputs = 0
+    if keys[pygame.K_LEFT]:
+        inputs |= Keys.left
+    if keys[pygame.K_RIGHT]:
+        inputs |= Keys.right
+    if keys[pygame.K_SPACE]:
+        inputs |= Keys.jump
+    if keys[pygame.K_ESCAPE]:
+        inputs |= Keys.pause
+    return inputs
+
 
 class Player(pygame.sprite.Sprite):
     '''
@@ -18,8 +48,7 @@ class Player(pygame.sprite.Sprite):
     '''
     def __init__(self, map_pos: Tuple[int, int]) -> None:
         super().__init__()
-        self.image = pygame.Surface(settings.player_dimensions)
-        self.image.fill(settings.player_and_text_color)
+        self.image = atlas.get('player')
         screen_pos = (map_pos[0] * settings.tile_size,
                       map_pos[1] * settings.tile_size)
         self.rect = self.image.get_rect(bottomleft=screen_pos)
@@ -30,20 +59,21 @@ class Player(pygame.sprite.Sprite):
         self.gravity = settings.gravity
         self.direction = pygame.math.Vector2(0, 0)
 
-    def get_input(self) -> None:
+    def get_input(self, inputs: int) -> None:
         '''
-        Gets keyboard input and sets player's movement
-        '''
-        keys = pygame.key.get_pressed()
+        Sets player's movement based on input
 
-        if keys[pygame.K_RIGHT]:
+        Args:
+            inputs (int): bit flags from Keys
+        '''
+        if inputs & Keys.right:
             self.direction.x = 1
-        elif keys[pygame.K_LEFT]:
+        elif inputs & Keys.left:
             self.direction.x = -1
         else:
             self.direction.x = 0
 
-        if keys[pygame.K_SPACE] and self.direction.y == 0:
+        if inputs & Keys.jump and self.direction.y == 0:
             self.jump()
 
     def apply_gravity(self) -> None:
@@ -61,10 +91,9 @@ class Player(pygame.sprite.Sprite):
 
     def update(self, y_shift: int) -> None:
         '''
-        Updates player's position
+        Updates player's position, movement is set from input at the start of the frame (see get_input)
 
         Args:
             y_shift (int): shift of player's y coordinate
         '''
         self.rect.y += y_shift
-        self.get_input()
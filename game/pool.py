@@ -0,0 +1,50 @@
+'''
+Module with object pool. Objects which are created and thrown away constantly are kept on a free list and reused
+'''
+
+from typing import Callable, Generic, List, TypeVar
+
+T = TypeVar('T')
+
+
+class Pool(Generic[T]):
+    '''
+    Pool keeps released objects and resets them instead of creating new ones. Pooled objects have
+    a reset method taking the same arguments as their constructor
+
+    Args:
+        factory (Callable[..., T]): creates a new object, e.g. its class
+
+    Attributes:
+        factory (Callable[..., T]): creates a new object
+        free (List[T]): released objects
+        created (int): number of objects created by the pool
+    '''
+
+    def __init__(self, factory: Callable[..., T]) -> None:
+        self.factory = factory
+        self.free: List[T] = []
+        self.created = 0
+
+    def acquire(self, *args) -> T:
+        '''
+        Gets an object - a reset released one, or a new one if there are none
+
+        Returns:
+            T: object initialized with args
+        '''
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            return obj
+        self.created += 1
+        return self.factory(*args)
+
+    def release(self, obj: T) -> None:
+        '''
+        Gives back an object which isn't used anymore
+
+        Args:
+            obj (T): released object
+        '''
+        self.free.append(obj)
@@ -0,0 +1,216 @@
+'''
+Module with frame profiler. Profiler measures how long every phase of a frame takes and keeps
+timings of the last frames in a ring buffer, for on-screen summary and export. When it's turned off,
+game doesn't have a profiler at all and pays only for checking that
+'''
+
+import csv
+import gc
+import json
+import sys
+import time
+from array import array
+from typing import Dict, List
+
+import settings
+
+
+class Phases:
+    '''
+    Simple "enum" class for profiled frame phases
+    '''
+    event_queue, timers, horizontal_movement, vertical_movement_and_collision, player_update, \
+        manage_platforms_and_missiles, sprites_update, scroll_and_game_over, display_game, display_update = range(10)
+    names = ['event_queue', 'timers', 'horizontal_movement', 'vertical_movement_and_collision', 'player_update',
+             'manage_platforms_and_missiles', 'sprites_update', 'scroll_and_game_over', 'display_game', 'display_update']
+
+
+def percentile(values: List[float], percent: float) -> float:
+    '''
+    Gets percentile of values (nearest rank)
+
+    Args:
+        values (List[float]): sorted values
+        percent (float): percentile to get, from 0 to 100
+
+    Returns:
+        float: percentile, 0 if there are no values
+    '''
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+class Profiler:
+    '''
+    Profiler object measures frame phases. A frame starts with start_frame, every phase ends with mark
+    and the frame ends with end_frame. Timings of the last frames are kept in ring buffers.
+    It counts garbage collections until it's closed
+
+    Args:
+        size (int): number of frames kept
+        frame_budget (float): time between presented frames, in seconds
+
+    Attributes:
+        size (int): number of frames kept
+        frame_budget (float): time between presented frames, in seconds
+        frames (int): number of profiled frames
+        phase_times (array): phase durations in seconds, size rows of len(Phases.names) columns
+        frame_times (array): durations of frames (from start to start of the next frame) in seconds
+        allocations (array): numbers of memory blocks allocated (net) during frames
+        collections (array): numbers of garbage collections during frames
+        dropped (int): number of frames which took longer than 1.5 frame budget (missed their presentation)
+        row (int): ring buffer row of current frame
+        last_mark (float): time of the last mark
+        frame_start (float): start time of current frame
+        frame_blocks (int): allocated memory blocks at start of current frame
+        frame_collections (int): number of garbage collections before current frame
+    '''
+
+    def __init__(self, size: int = 600, frame_budget: float = 1 / 60) -> None:
+        self.size = size
+        self.frame_budget = frame_budget
+        self.frames = 0
+        self.phase_times = array('d', bytes(8 * size * len(Phases.names)))
+        self.frame_times = array('d', bytes(8 * size))
+        self.allocations = array('q', bytes(8 * size))
+        self.collections = array('q', bytes(8 * size))
+        self.dropped = 0
+        self.row = 0
+        self.last_mark = self.frame_start = 0.0
+        self.frame_blocks = sys.getallocatedblocks()
+        self.frame_collections = 0
+        gc.callbacks.append(self.count_collection)
+
+    def count_collection(self, phase: str, info: Dict[str, int]) -> None:
+        '''
+        Counts garbage collections, called by gc
+
+        Args:
+            phase (str): collection phase - start | stop
+            info (Dict[str, int]): collection info
+        '''
+        if phase == 'start':
+            self.frame_collections += 1
+
+    def close(self) -> None:
+        '''
+        Stops counting garbage collections, so gc doesn't keep the profiler
+        '''
+        if self.count_collection in gc.callbacks:
+            gc.callbacks.remove(self.count_collection)
+
+    def start_frame(self) -> None:
+        '''
+        Starts a frame, finishing timing of the previous one
+        '''
+        now = time.perf_counter()
+        if self.frames:
+            frame_time = now - self.frame_start
+            self.frame_times[self.row] = frame_time
+            if frame_time > 1.5 * self.frame_budget:
+                self.dropped += 1
+            self.row = self.frames % self.size
+
+        columns = len(Phases.names)
+        start = self.row * columns
+        self.phase_times[start:start + columns] = array('d', bytes(8 * columns))
+        self.frame_times[self.row] = 0.0
+        self.frame_start = self.last_mark = now
+
+    def mark(self, phase: int) -> None:
+        '''
+        Ends a phase - time since the previous mark is added to the phase
+
+        Args:
+            phase (int): phase from Phases
+        '''
+        now = time.perf_counter()
+        self.phase_times[self.row * len(Phases.names) + phase] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self) -> None:
+        '''
+        Ends a frame's work (waiting for the next frame isn't profiled)
+        '''
+        blocks = sys.getallocatedblocks()
+        self.allocations[self.row] = blocks - self.frame_blocks
+        self.collections[self.row] = self.frame_collections
+        self.frame_blocks = blocks
+        self.frame_collections = 0
+        self.frames += 1
+
+    def rows(self) -> List[int]:
+        '''
+        Gets ring buffer rows of finished frames, from the oldest
+
+        Returns:
+            List[int]: rows of finished frames
+        '''
+        if self.frames <= self.size:
+            return list(range(self.frames))
+        return [(self.frames + i) % self.size for i in range(self.size)]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        '''
+        Summarizes kept frames - median and 99th percentile of every phase and of whole frames, in milliseconds
+
+        Returns:
+            Dict[str, Dict[str, float]]: p50 and p99 by phase name, 'frame' for whole frames
+        '''
+        rows = self.rows()
+        columns = len(Phases.names)
+        summary = {}
+        for phase, name in enumerate(Phases.names):
+            times = sorted(self.phase_times[row * columns + phase] for row in rows)
+            summary[name] = {'p50': 1000 * percentile(times, 50),
+                             'p99': 1000 * percentile(times, 99)}
+        # the last kept frame's time is known only when the next one starts
+        times = sorted(self.frame_times[row] for row in rows[:-1])
+        summary['frame'] = {'p50': 1000 * percentile(times, 50),
+                            'p99': 1000 * percentile(times, 99)}
+        return summary
+
+    def hud_lines(self) -> List[str]:
+        '''
+        Describes kept frames in short lines for on-screen display
+
+        Returns:
+            List[str]: lines of text
+        '''
+        rows = self.rows()
+        allocations = sum(self.allocations[row] for row in rows)
+        collections = sum(self.collections[row] for row in rows)
+        lines = [f"{name[:16]:<16} {times['p50']:5.2f} {times['p99']:5.2f}"
+                 for name, times in self.summary().items()]
+        lines.append(f"alloc/frame {allocations / max(1, len(rows)):.0f} gc {collections}")
+        lines.append(f"dropped {self.dropped}/{self.frames}")
+        return lines
+
+    def export(self, path: str) -> None:
+        '''
+        Exports kept frames to a file - JSON if path ends with .json, CSV otherwise
+
+        Args:
+            path (str): file path
+        '''
+        columns = len(Phases.names)
+        first_frame = self.frames - len(self.rows())
+        frames = []
+        for i, row in enumerate(self.rows()):
+            frame = {'frame': first_frame + i, 'frame_ms': 1000 * self.frame_times[row]}
+            for phase, name in enumerate(Phases.names):
+                frame[name + '_ms'] = 1000 * self.phase_times[row * columns + phase]
+            frame['allocations'] = self.allocations[row]
+            frame['collections'] = self.collections[row]
+            frames.append(frame)
+
+        with open(path, 'w', newline='') as file:
+            if path.endswith('.json'):
+                json.dump({'fps': settings.fps, 'frame_budget_ms': 1000 * self.frame_budget, 'frames': self.frames, 'dropped': self.dropped,
+                           'summary': self.summary(), 'kept_frames': frames}, file, indent=1)
+            else:
+                writer = csv.DictWriter(file, fieldnames=['frame', 'frame_ms'] + [
+                    name + '_ms' for name in Phases.names] + ['allocations', 'collections'])
+                writer.writeheader()
+                writer.writerows(frames)
@@ -0,0 +1,234 @@
+'''
+Module with gameplay recording. Presented frames (or every Nth of them) are copied from the screen into a bounded
+pool of surfaces, the only work left on the frame thread. Worker threads compress them to a PNG or raw frame sequence,
+or a writer thread pipes them to a local encoder binary (ffmpeg) which encodes a video in its own process.
+When all buffers are taken, frames are dropped instead of stalling the game, and counted in recorder's stats
+
+Usage:
+    python main.py --record finals.mp4
+    python main.py --record frames --record-format png --record-every 2
+'''
+
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import zlib
+from typing import List, NamedTuple, Optional
+
+import pygame
+
+import settings
+
+
+class Formats:
+    '''
+    Simple "enum" class for recording formats
+    '''
+    png, raw, encoder = 'png', 'raw', 'encoder'
+    names = ['png', 'raw', 'encoder']
+
+
+class RecorderStats(NamedTuple):
+    '''
+    RecorderStats describes how recording went
+
+    Attributes:
+        presented (int): number of frames presented while recording
+        captured (int): number of frames copied to buffers
+        dropped (int): number of frames to record which found no free buffer
+        written (int): number of frames written (or piped to the encoder)
+        queued (int): number of frames waiting to be written
+        max_queued (int): the most frames waiting to be written at once
+    '''
+    presented: int
+    captured: int
+    dropped: int
+    written: int
+    queued: int
+    max_queued: int
+
+
+def encode_png(data: bytes, width: int, height: int) -> bytes:
+    '''
+    Encodes RGB pixels as a PNG image - zlib does the work and releases the GIL meanwhile,
+    so many frames are compressed in parallel
+
+    Args:
+        data (bytes): RGB pixels, row by row
+        width (int): image width
+        height (int): image height
+
+    Returns:
+        bytes: PNG file
+    '''
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+
+    stride = 3 * width
+    # every row starts with filter type 0 (none)
+    rows = b''.join(b'\x00' + data[row:row + stride]
+                    for row in range(0, stride * height, stride))
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(rows, settings.recording_png_level)) + chunk(b'IEND', b''))
+
+
+class Recorder:
+    '''
+    Recorder object records presented frames of the game. Frames to record are copied into free buffers and queued,
+    buffers go back to the pool once their frames are written
+
+    Args:
+        output (str): directory of a frame sequence, or video file for the encoder
+        every (int): records every this many presented frames
+        format (Optional[str]): format from Formats, the encoder for files with an extension and PNG otherwise if None
+        fps (float): frame rate of the encoded video
+
+    Attributes:
+        output (str): directory of a frame sequence, or video file for the encoder
+        every (int): records every this many presented frames
+        format (str): format from Formats
+        fallback (Optional[str]): why another format is recorded than asked for, None if it's the asked one
+        fps (float): frame rate of the encoded video
+        free (queue.Queue): buffers free to copy frames to
+        frames (queue.Queue): numbers and buffers of frames waiting to be written
+        threads (List[threading.Thread]): workers writing frames
+        encoder (Optional[subprocess.Popen]): encoder process, None if frames aren't encoded
+        lock (threading.Lock): guards counters updated by workers
+        presented (int): number of frames presented while recording
+        captured (int): number of frames copied to buffers
+        dropped (int): number of frames to record which found no free buffer
+        written (int): number of frames written
+        max_queued (int): the most frames waiting to be written at once
+    '''
+
+    def __init__(self, output: str, every: int = 1, format: Optional[str] = None, fps: float = settings.fps) -> None:
+        if format is None:
+            format = Formats.encoder if os.path.splitext(output)[1] else Formats.png
+        self.fallback = None
+        if format == Formats.encoder and shutil.which(settings.recording_encoder) is None:
+            self.fallback = f"{settings.recording_encoder} not found, recording PNG frames instead"
+            output, format = os.path.splitext(output)[0], Formats.png
+        self.output = output
+        self.every = every
+        self.format = format
+        self.fps = fps
+        self.free = queue.Queue()
+        self.frames = queue.Queue()
+        self.threads: List[threading.Thread] = []
+        self.encoder: Optional[subprocess.Popen] = None
+        self.lock = threading.Lock()
+        self.presented = 0
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.max_queued = 0
+
+    def start(self, surface: pygame.Surface) -> None:
+        '''
+        Allocates buffers for frames of a surface and starts workers
+
+        Args:
+            surface (pygame.Surface): surface to record
+        '''
+        for _ in range(settings.recording_buffers):
+            self.free.put(surface.copy())
+        width, height = surface.get_size()
+        if self.format == Formats.encoder:
+            self.encoder = subprocess.Popen(
+                [settings.recording_encoder, '-loglevel', 'error', '-y', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                 '-s', f"{width}x{height}", '-r', str(self.fps), '-i', '-', '-pix_fmt', 'yuv420p', self.output],
+                stdin=subprocess.PIPE)
+            workers = 1  # frames have to reach the encoder in order
+        else:
+            os.makedirs(self.output, exist_ok=True)
+            workers = settings.recording_workers
+        for _ in range(workers):
+            thread = threading.Thread(target=self.work, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def capture(self, surface: pygame.Surface) -> None:
+        '''
+        Copies a presented frame to a free buffer and queues it, if it's recorded - called every frame
+
+        Args:
+            surface (pygame.Surface): presented surface
+        '''
+        self.presented += 1
+        if (self.presented - 1) % self.every:
+            return
+        try:
+            buffer = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        buffer.blit(surface, (0, 0))
+        self.frames.put((self.captured, buffer))
+        self.captured += 1
+        self.max_queued = max(self.max_queued, self.frames.qsize())
+
+    def work(self) -> None:
+        '''
+        Writes queued frames until recording stops - target of worker threads
+        '''
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            number, buffer = frame
+            data = pygame.image.tobytes(buffer, 'RGB')
+            self.free.put(buffer)
+            width, height = buffer.get_size()
+            if self.format == Formats.encoder:
+                try:
+                    self.encoder.stdin.write(data)
+                except (BrokenPipeError, OSError):
+                    continue  # encoder quit, the rest is counted as not written
+            else:
+                if self.format == Formats.png:
+                    data = encode_png(data, width, height)
+                with open(os.path.join(self.output, f"frame_{number:06d}.{self.format}"), 'wb') as file:
+                    file.write(data)
+            with self.lock:
+                self.written += 1
+
+    def stats(self) -> RecorderStats:
+        '''
+        Gets recording stats
+
+        Returns:
+            RecorderStats: recording stats
+        '''
+        return RecorderStats(self.presented, self.captured, self.dropped, self.written,
+                             self.frames.qsize(), self.max_queued)
+
+    def close(self) -> RecorderStats:
+        '''
+        Waits for queued frames to be written and stops workers (and the encoder)
+
+        Returns:
+            RecorderStats: final recording stats
+        '''
+        for _ in self.threads:
+            self.frames.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        if self.encoder is not None:
+            self.encoder.stdin.close()
+            self.encoder.wait()
+            self.encoder = None
+        return self.stats()
+
+    def report(self) -> None:
+        '''
+        Stops recording and prints its stats (and why another format was recorded, if it was) - for atexit
+        '''
+        stats = self.close()
+        if self.fallback is not None:
+            print(self.fallback)
+        print(f"recorded {stats.written} of {stats.presented} presented frames to {self.output} "
+              f"(every {self.every}), dropped {stats.dropped}, at most {stats.max_queued} queued")
@@ -0,0 +1,192 @@
+'''
+Module with deterministic game replays. A replay is game's seed, tick rate and player's input in every frame,
+packed into 4 bits per frame and compressed - a minute of play takes well under 2 KB.
+Replaying inputs with Engine at the recorded tick rate reproduces the game exactly, much faster than real time,
+so claimed scores can be verified
+'''
+
+import argparse
+import os
+import struct
+import time
+import zlib
+from typing import List, Optional
+
+import settings
+from engine import Engine, tick_rate_settings
+
+
+class Replay:
+    '''
+    Replay object records one game - its seed, tick rate and player's input in every simulated frame
+
+    Args:
+        seed (int): seed of the game
+        inputs (bytearray): already recorded inputs
+        fps (Optional[int]): simulation ticks per second of the game, settings.fps if None
+
+    Attributes:
+        seed (int): seed of the game
+        inputs (bytearray): bit flags from Keys for every simulated frame
+        fps (int): simulation ticks per second of the game
+        score (int): final score claimed for the game
+    '''
+    magic = b'JPRP'
+    version = 4
+    header = struct.Struct('<4sBHIII')  # magic, version, tick rate, seed, frames, score
+
+    def __init__(self, seed: int, inputs: bytearray = None, fps: Optional[int] = None) -> None:
+        self.seed = seed
+        self.inputs = bytearray() if inputs is None else inputs
+        self.fps = settings.fps if fps is None else fps
+        self.score = 0
+
+    def record(self, inputs: int) -> None:
+        '''
+        Records input of one frame
+
+        Args:
+            inputs (int): bit flags from Keys
+        '''
+        self.inputs.append(inputs & 0xF)
+
+    def pack(self) -> bytes:
+        '''
+        Packs replay into bytes - header followed by compressed inputs, two frames per byte
+
+        Returns:
+            bytes: packed replay
+        '''
+        inputs = self.inputs + b'\0' if len(self.inputs) % 2 else self.inputs
+        packed = bytes(low | (high << 4)
+                       for low, high in zip(inputs[::2], inputs[1::2]))
+        return self.header.pack(self.magic, self.version, self.fps, self.seed, len(self.inputs), self.score) + \
+            zlib.compress(packed, 9)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> 'Replay':
+        '''
+        Unpacks replay from bytes
+
+        Args:
+            data (bytes): packed replay
+
+        Returns:
+            Replay: unpacked replay
+
+        Raises:
+            ValueError: if data isn't a valid replay
+        '''
+        if len(data) < cls.header.size:
+            raise ValueError("replay is too short")
+        magic, version, fps, seed, frames, score = cls.header.unpack_from(data)
+        if magic != cls.magic or version != cls.version:
+            raise ValueError("not a replay or unsupported replay version")
+        try:
+            packed = zlib.decompress(data[cls.header.size:])
+        except zlib.error as error:
+            raise ValueError("corrupted replay") from error
+        if len(packed) != (frames + 1) // 2:
+            raise ValueError("corrupted replay")
+
+        inputs = bytearray(2 * len(packed))
+        inputs[::2] = bytes(byte & 0xF for byte in packed)
+        inputs[1::2] = bytes(byte >> 4 for byte in packed)
+        replay = cls(seed, inputs[:frames], fps)
+        replay.score = score
+        return replay
+
+    def save(self, path: str) -> None:
+        '''
+        Saves replay to a file
+
+        Args:
+            path (str): file path
+        '''
+        with open(path, 'wb') as file:
+            file.write(self.pack())
+
+    @classmethod
+    def load(cls, path: str) -> 'Replay':
+        '''
+        Loads replay from a file
+
+        Args:
+            path (str): file path
+
+        Returns:
+            Replay: loaded replay
+        '''
+        with open(path, 'rb') as file:
+            return cls.unpack(file.read())
+
+
+def verify(replay: Replay) -> bool:
+    '''
+    Re-simulates the game of a replay at its tick rate and checks its claimed score. Settings are overridden
+    with the tick rate while it runs
+
+    Args:
+        replay (Replay): replay to verify
+
+    Returns:
+        bool: True if the game ends exactly in the last recorded frame with the claimed score, False otherwise
+    '''
+    try:
+        overrides = tick_rate_settings(replay.fps)
+    except ValueError:
+        return False
+    with settings.overridden_settings(overrides):
+        engine = Engine()
+        engine.new_game(replay.seed)
+        last_frame = len(replay.inputs) - 1
+        for frame, inputs in enumerate(replay.inputs):
+            if engine.step(inputs):
+                return frame == last_frame and engine.score == replay.score
+    return False
+
+
+def save_replay(replay: Replay, nick: str) -> str:
+    '''
+    Saves replay to the replay directory, named after time, nick and score
+
+    Args:
+        replay (Replay): replay to save
+        nick (str): nick of the player
+
+    Returns:
+        str: path of the saved replay
+    '''
+    os.makedirs(settings.replay_dir, exist_ok=True)
+    safe_nick = ''.join(char if char.isalnum() else '_' for char in nick)
+    path = os.path.join(settings.replay_dir, time.strftime(
+        "%Y%m%d-%H%M%S") + f"-{safe_nick}-{replay.score}.jprp")
+    replay.save(path)
+    return path
+
+
+if __name__ == '__main__':
+    # verifies replay files, reports replay sizes and simulation speed
+    parser = argparse.ArgumentParser(
+        description="Verifies claimed scores of JumPy replays")
+    parser.add_argument('replays', nargs='+', help="replay files")
+    args = parser.parse_args()
+
+    failed: List[str] = []
+    for path in args.replays:
+        try:
+            replay = Replay.load(path)
+        except (OSError, ValueError) as error:
+            print(f"{path}: {error}")
+            failed.append(path)
+            continue
+        start = time.perf_counter()
+        valid = verify(replay)
+        elapsed = time.perf_counter() - start
+        print(f"{path}: score {replay.score}, {len(replay.inputs)} frames at {replay.fps} Hz, {os.path.getsize(path)} B, "
+              f"{'OK' if valid else 'INVALID'} in {elapsed:.3f} s "
+              f"({len(replay.inputs) / replay.fps / max(elapsed, 1e-9):.0f}x real time)")
+        if not valid:
+            failed.append(path)
+
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,65 @@
+'''
+Module with scheduler of timed game events. Time is counted in ticks (physics steps of the game), not in real time,
+so pausing the game pauses events and faster or headless runs keep the same event timing
+'''
+
+from heapq import heappush, heappop
+from typing import List, Tuple
+
+
+class Events:
+    '''
+    Simple "enum" class for scheduled game events
+    '''
+    spawn_missile, platform_collapse = range(2)
+
+
+class Scheduler:
+    '''
+    Scheduler keeps any number of pending events in a priority queue ordered by tick they are due in.
+    Scheduling and running an event is O(log n). Events due in the same tick run in order of scheduling
+
+    Attributes:
+        tick (int): current tick
+        events (List[Tuple[int, int, int, int]]): heap of pending events - due tick, sequence number, event from Events and its argument
+        sequence (int): number of scheduled events
+    '''
+
+    def __init__(self) -> None:
+        self.tick = 0
+        self.events: List[Tuple[int, int, int, int]] = []
+        self.sequence = 0
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def schedule(self, delay: int, event: int, argument: int = 0) -> int:
+        '''
+        Schedules an event
+
+        Args:
+            delay (int): number of ticks until event, at least 1
+            event (int): event from Events
+            argument (int): event's argument
+
+        Returns:
+            int: tick event is due in
+        '''
+        due = self.tick + max(1, delay)
+        heappush(self.events, (due, self.sequence, event, argument))
+        self.sequence += 1
+        return due
+
+    def advance(self) -> List[Tuple[int, int]]:
+        '''
+        Advances time by one tick and takes events due in it
+
+        Returns:
+            List[Tuple[int, int]]: due events and their arguments, in order of scheduling
+        '''
+        self.tick += 1
+        due = []
+        while self.events and self.events[0][0] <= self.tick:
+            _, _, event, argument = heappop(self.events)
+            due.append((event, argument))
+        return due
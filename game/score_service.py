@@ -0,0 +1,236 @@
+'''
+Module with the score service - a local server many game cabinets share one scoreboard through. Cabinets send
+requests as JSON lines (see scoreboard.ScoreClient), the service runs them on its own database connection.
+Scores submitted at once by many cabinets are written in a single transaction (group commit), which also trims
+the table to settings.score_retention top scores. Every submission has an ID, so a retried one is written once
+
+Usage:
+    python score_service.py localhost:5556
+    python score_service.py unix:/tmp/jumpy-scores.sock
+'''
+
+import asyncio
+import json
+import sys
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import scoreboard_db
+
+# scoreboard_db queries cabinets may call, by name
+queries = ['count_scores', 'get_top_scores',
+           'count_higher_scores', 'get_best_score', 'get_best_per_nick']
+# number of the latest submission IDs remembered to drop retried submissions
+recent_ids_size = 10000
+
+
+class ScoreService:
+    '''
+    ScoreService serves scoreboard requests of cabinets in its thread. Database is used by a single worker thread,
+    submissions waiting while it writes are written together in the next transaction
+
+    Args:
+        address (str): "host:port" of TCP server or "unix:path" of Unix socket server
+
+    Attributes:
+        address (str): server's address
+        thread (threading.Thread): thread running the server
+        started (threading.Event): set when the server listens (or failed to)
+        error (Optional[Exception]): error of starting the server
+        loop (Optional[asyncio.AbstractEventLoop]): server's event loop
+        server (Optional[asyncio.AbstractServer]): listening server
+        database (ThreadPoolExecutor): single thread using the database
+        submissions (Optional[asyncio.Queue]): submitted scores waiting to be written, with futures of their requests
+        committer (Optional[asyncio.Task]): task writing submissions
+        cabinets (Dict[asyncio.StreamWriter, asyncio.Task]): tasks serving connected cabinets by their streams
+        recent_ids (OrderedDict): IDs of the latest written submissions
+        transactions (int): number of written transactions
+        written (int): number of written scores
+    '''
+
+    def __init__(self, address: str) -> None:
+        self.address = address
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.started = threading.Event()
+        self.error = None
+        self.loop = None
+        self.server = None
+        self.database = ThreadPoolExecutor(1, thread_name_prefix="ScoreDatabase")
+        self.submissions = None
+        self.committer = None
+        self.cabinets = {}
+        self.recent_ids = OrderedDict()
+        self.transactions = 0
+        self.written = 0
+
+    def start(self) -> None:
+        '''
+        Starts the server in its thread and waits until it listens
+
+        Raises:
+            OSError: if the server can't listen on its address
+        '''
+        self.thread.start()
+        self.started.wait()
+        if self.error is not None:
+            raise self.error
+
+    def run(self) -> None:
+        '''
+        Runs the server's event loop - target of the server's thread
+        '''
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.submissions = asyncio.Queue()
+        try:
+            self.server = self.loop.run_until_complete(self.listen())
+        except OSError as error:
+            self.error = error
+            self.started.set()
+            return
+        self.committer = self.loop.create_task(self.commit())
+        self.started.set()
+        self.loop.run_forever()
+
+    async def listen(self) -> asyncio.AbstractServer:
+        '''
+        Opens the server's socket
+
+        Returns:
+            asyncio.AbstractServer: the server
+        '''
+        if self.address.startswith('unix:'):
+            return await asyncio.start_unix_server(self.serve, self.address[len('unix:'):])
+        host, port = self.address.rsplit(':', 1)
+        return await asyncio.start_server(self.serve, host, int(port))
+
+    def close(self) -> None:
+        '''
+        Stops the server and disconnects cabinets, submissions already received are written
+        '''
+        if self.loop is not None and self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(
+                self.shutdown(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+        self.database.shutdown()
+
+    async def shutdown(self) -> None:
+        '''
+        Stops listening, waits for submissions to be written and disconnects cabinets
+        '''
+        self.server.close()
+        await self.submissions.join()
+        self.committer.cancel()
+        for writer in self.cabinets:
+            writer.transport.abort()
+        await asyncio.gather(self.committer, *self.cabinets.values(), return_exceptions=True)
+        await self.server.wait_closed()
+
+# ============================ GROUP COMMIT ===============================
+
+    async def commit(self) -> None:
+        '''
+        Writes submissions until the server stops - every write takes all submissions waiting for it
+        '''
+        while True:
+            batch = [await self.submissions.get()]
+            while not self.submissions.empty():
+                batch.append(self.submissions.get_nowait())
+            scores = []
+            for submitted, _ in batch:
+                for id, nick, score in submitted:
+                    if id not in self.recent_ids:
+                        self.recent_ids[id] = None
+                        scores.append((id, nick, score))
+            while len(self.recent_ids) > recent_ids_size:
+                self.recent_ids.popitem(last=False)
+            try:
+                if scores:
+                    await self.loop.run_in_executor(self.database, self.write, scores)
+                for _, future in batch:
+                    future.set_result(None)
+            except Exception as error:
+                traceback.print_exc()
+                for id, _, _ in scores:
+                    self.recent_ids.pop(id, None)
+                for _, future in batch:
+                    future.set_exception(error)
+            for _ in batch:
+                self.submissions.task_done()
+
+    def write(self, scores: List[Tuple[str, str, int]]) -> None:
+        '''
+        Writes scores in a single transaction - run by the database thread
+
+        Args:
+            scores (List[Tuple[str, str, int]]): submission IDs, nicks and scores
+        '''
+        scoreboard_db.add_scores(scores)
+        self.transactions += 1
+        self.written += len(scores)
+
+# ============================ REQUESTS ===============================
+
+    async def handle(self, request: Dict[str, object]) -> object:
+        '''
+        Handles a request of a cabinet
+
+        Args:
+            request (Dict[str, object]): name of scoreboard_db function ("add_scores" or one of queries) and its arguments
+
+        Returns:
+            object: function's result
+        '''
+        name, args = request['call'], request.get('args', [])
+        if name == 'add_scores':
+            future = self.loop.create_future()
+            await self.submissions.put(([tuple(score) for score in args[0]], future))
+            return await future
+        if name not in queries:
+            raise ValueError(f"unknown call {name!r}")
+        return await self.loop.run_in_executor(self.database, getattr(scoreboard_db, name), *args)
+
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        '''
+        Serves a connected cabinet - answers its requests in order, until it disconnects
+
+        Args:
+            reader (asyncio.StreamReader): stream of cabinet's requests
+            writer (asyncio.StreamWriter): stream of responses
+        '''
+        self.cabinets[writer] = asyncio.current_task()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = {'result': await self.handle(json.loads(line))}
+                except Exception as error:
+                    response = {'error': repr(error)}
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            del self.cabinets[writer]
+            writer.close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("usage: python score_service.py host:port | unix:path")
+        sys.exit(1)
+
+    service = ScoreService(sys.argv[1])
+    service.start()
+    print(f"score service listening on {service.address}")
+    try:
+        service.thread.join()
+    except KeyboardInterrupt:
+        service.close()
+        print(f"{service.written} scores written in {service.transactions} transactions")
@@ -1,38 +1,439 @@
 '''
-Module with sqlalchemy database table and functions concerning game's scoreboard
+Module with functions concerning game's scoreboard. All scores are kept in an indexed database table
+(see scoreboard_db), so ranks, top scores and best scores of players are found without reading the whole table.
+Database is opened by a background thread started after the game shows up, top scores are kept in memory
+and new scores are written by the same thread, so the game never waits for the database - until top scores
+are loaded, the scoreboard shows they're loading. Further scoreboard pages
+are fetched by the thread too - the game draws them once they're in memory, pages next to them are prefetched.
+Cabinets sharing one scoreboard use the score service (see score_service) instead of a local database.
+Scores which can't be written are kept and retried, scores still unsent when the game quits are saved
+and sent next time
 '''
 
+import atexit
+import json
 import os
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, select, delete
-from sqlalchemy import Column, String, Integer
-from sqlalchemy.ext.declarative import declarative_base
-from typing import List
+import queue
+import socket
+import threading
+import time
+import traceback
+import uuid
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
-base = declarative_base()
-engine = create_engine('sqlite:///' + os.path.join(os.path.dirname(
-    os.path.abspath(__file__)), "scoreboard.sqlite"), echo=True)
+import settings
 
 
-class Scoreboard(base):
+class Score(NamedTuple):
     '''
-    Scoreboard reprents a database table with top 10 scores
+    Score represents one scoreboard entry kept in memory
 
     Attributes:
-        id (Column[int]): score's ID
-        nick (Column[Text]): nick of score's gainer
-        score (Column[int]): score 
+        nick (str): nick of score's gainer
+        score (int): score
     '''
-    __tablename__ = 'scoreboard'
-    id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
-    nick = Column(String, nullable=False)
-    score = Column(Integer, nullable=False)
+    nick: str
+    score: int
 
-base.metadata.create_all(engine)
+
+class PageRequest(NamedTuple):
+    '''
+    PageRequest asks the database thread to fetch a scoreboard page
+
+    Attributes:
+        page (int): page number, from 0
+    '''
+    page: int
+
+
+# ===== SCORE SERVICE CLIENT =====
+
+class ScoreClient:
+    '''
+    ScoreClient calls scoreboard_db functions on the score service, it has the same functions as scoreboard_db.
+    A request which fails is sent again on a new connection, up to settings.score_service_retries times
+
+    Args:
+        address (str): "host:port" of TCP server or "unix:path" of Unix socket server
+
+    Attributes:
+        address (str): service's address
+        stream (Optional[socket.SocketIO]): stream connected to the service, None if not connected
+        lock (threading.Lock): lets one thread at a time talk to the service
+    '''
+
+    def __init__(self, address: str) -> None:
+        self.address = address
+        self.stream = None
+        self.lock = threading.Lock()
+
+    def connect(self) -> None:
+        '''
+        Connects to the service
+        '''
+        if self.address.startswith('unix:'):
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(settings.score_service_timeout)
+            connection.connect(self.address[len('unix:'):])
+        else:
+            host, port = self.address.rsplit(':', 1)
+            connection = socket.create_connection(
+                (host, int(port)), settings.score_service_timeout)
+        self.stream = connection.makefile('rwb')
+        connection.close()  # the stream keeps the socket open
+
+    def call(self, name: str, *args: object) -> object:
+        '''
+        Calls a scoreboard_db function on the service
+
+        Args:
+            name (str): function's name
+            *args (object): function's arguments
+
+        Returns:
+            object: function's result
+
+        Raises:
+            OSError: if the service can't be reached
+            RuntimeError: if the function failed on the service
+        '''
+        request = json.dumps({'call': name, 'args': args}).encode() + b'\n'
+        with self.lock:
+            for attempt in range(settings.score_service_retries):
+                try:
+                    if self.stream is None:
+                        self.connect()
+                    self.stream.write(request)
+                    self.stream.flush()
+                    line = self.stream.readline()
+                    if not line:
+                        raise ConnectionError("score service closed the connection")
+                    break
+                except OSError:
+                    if self.stream is not None:
+                        self.stream.close()
+                        self.stream = None
+                    if attempt == settings.score_service_retries - 1:
+                        raise
+                    time.sleep(0.1 * 2**attempt)
+        response = json.loads(line)
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response['result']
+
+    def add_scores(self, scores: List[Tuple[str, str, int]]) -> None:
+        '''
+        Adds scores in a single transaction on the service
+
+        Args:
+            scores (List[Tuple[str, str, int]]): submission IDs, nicks and scores
+        '''
+        self.call('add_scores', scores)
+
+    def count_scores(self) -> int:
+        '''
+        Counts scores on the service
+
+        Returns:
+            int: number of scores
+        '''
+        return self.call('count_scores')
+
+    def get_top_scores(self, limit: int, offset: int) -> List[Tuple[str, int]]:
+        '''
+        Reads top scores from the service, equal scores from the latest
+
+        Args:
+            limit (int): maximal number of scores
+            offset (int): number of higher scores to skip
+
+        Returns:
+            List[Tuple[str, int]]: nicks and top scores, from the highest
+        '''
+        return [tuple(row) for row in self.call('get_top_scores', limit, offset)]
+
+    def count_higher_scores(self, score: int) -> int:
+        '''
+        Counts scores higher than the score on the service
+
+        Args:
+            score (int): score to compare
+
+        Returns:
+            int: number of higher scores
+        '''
+        return self.call('count_higher_scores', score)
+
+    def get_best_score(self, nick: str) -> Optional[int]:
+        '''
+        Reads the best score of a player from the service
+
+        Args:
+            nick (str): player's nick
+
+        Returns:
+            Optional[int]: the best score, None if player has no scores
+        '''
+        return self.call('get_best_score', nick)
+
+    def get_best_per_nick(self, limit: int, offset: int) -> List[Tuple[str, int]]:
+        '''
+        Reads the best scores of players from the service, one for every player
+
+        Args:
+            limit (int): maximal number of scores
+            offset (int): number of higher scores to skip
+
+        Returns:
+            List[Tuple[str, int]]: nicks and their best scores, from the highest
+        '''
+        return [tuple(row) for row in self.call('get_best_per_nick', limit, offset)]
+
+
+client: Optional[ScoreClient] = None
+
+
+def database() -> object:
+    '''
+    Gets scoreboard's database - client of the score service if settings.score_service_address is set,
+    local database otherwise. Both have functions of scoreboard_db
+
+    Returns:
+        object: scoreboard_db module or ScoreClient
+    '''
+    global client
+    if settings.score_service_address:
+        if client is None:
+            client = ScoreClient(settings.score_service_address)
+        return client
+    import scoreboard_db
+    return scoreboard_db
+
+
+# ===== BACKGROUND DATABASE THREAD =====
+
+class ScoreWriter:
+    '''
+    ScoreWriter opens database and loads top scores, then writes queued scores to database and fetches requested
+    scoreboard pages, all in a background thread. Scores queued while the thread writes are written together. Scores which can't be written are kept and retried
+    every settings.score_retry_interval seconds, the ones left when the thread stops are saved to settings.score_buffer_path.
+    Scores added while the queue is full (the thread is stuck on the database) wait with the unsent ones, never the game.
+    Closing never waits for the queue either - a full queue is taken with the stop request
+
+    Args:
+        queue_size (int): maximal number of scores waiting to be written
+
+    Attributes:
+        queue (queue.Queue[Union[Score, PageRequest, None]]): scores to write and pages to fetch, None stops the thread
+        loaded (threading.Event): set when top scores are loaded
+        thread (threading.Thread): database thread
+        unsent (List[Tuple[str, str, int]]): submission IDs, nicks and scores not written yet
+        overflow (List[Score]): scores which found the queue full, taken by the thread with the queued ones
+        lock (threading.Lock): guards overflow
+        stopping (threading.Event): set when the thread should stop after taking queued scores
+        requested (Set[int]): pages requested and not fetched yet
+        online (bool): tells if the last write succeeded
+    '''
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue: queue.Queue[Union[Score, PageRequest, None]] = queue.Queue(queue_size)
+        self.loaded = threading.Event()
+        self.unsent: List[Tuple[str, str, int]] = []
+        self.overflow: List[Score] = []
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.requested: Set[int] = set()
+        self.online = True
+        self.thread = threading.Thread(
+            target=self.write_scores, name="ScoreWriter", daemon=True)
+        self.thread.start()
+
+    def load(self) -> None:
+        '''
+        Opens database and loads top scores and scores left unsent last time
+        '''
+        try:
+            if os.path.exists(settings.score_buffer_path):
+                with open(settings.score_buffer_path) as file:
+                    self.unsent = [tuple(score) for score in json.load(file)]
+                os.remove(settings.score_buffer_path)
+            self.refresh()
+        except Exception:
+            traceback.print_exc()
+        finally:
+            self.loaded.set()
+
+    def refresh(self) -> None:
+        '''
+        Reads top scores and number of scores from database - other cabinets may have added some
+        '''
+        global top_scores, score_count
+        scores = database()
+        top_scores = [Score(*row) for row in scores.get_top_scores(
+            settings.scoreboard_size, 0)]
+        score_count = scores.count_scores()
+
+    def write(self) -> None:
+        '''
+        Writes unsent scores in a single transaction and reads top scores again, keeps the scores if it fails.
+        Fetched pages are dropped, their ranks may have changed
+        '''
+        try:
+            database().add_scores(self.unsent)
+            self.unsent = []
+            self.online = True
+            pages.clear()
+            self.refresh()
+        except Exception:
+            # report only the first of failures in a row
+            if self.online:
+                traceback.print_exc()
+            self.online = False
+
+    def fetch(self, page: int) -> None:
+        '''
+        Reads a scoreboard page from database, an unreachable score service gives an empty page
+
+        Args:
+            page (int): page number, from 0
+        '''
+        try:
+            rows = database().get_top_scores(settings.scoreboard_page_size, page*settings.scoreboard_page_size)
+        except Exception:
+            if self.online:
+                traceback.print_exc()
+            rows = []
+        pages[page] = [Score(*row) for row in rows]
+        self.requested.discard(page)
+
+    def write_scores(self) -> None:
+        '''
+        Loads top scores, then writes queued scores and fetches requested pages until stopped
+        '''
+        self.load()
+        if self.unsent:
+            self.write()
+        stopped = False
+        while not stopped:
+            items = []
+            try:
+                items.append(self.queue.get(
+                    timeout=settings.score_retry_interval if self.unsent else None))
+                while True:
+                    items.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            stopped = None in items or self.stopping.is_set()
+            with self.lock:
+                overflow, self.overflow = self.overflow, []
+            self.unsent += [(uuid.uuid4().hex, item.nick, item.score)
+                            for item in items + overflow if isinstance(item, Score)]
+            if self.unsent:
+                self.write()
+            for item in items:
+                if isinstance(item, PageRequest):
+                    self.fetch(item.page)
+            for _ in items:
+                self.queue.task_done()
+        if self.unsent:
+            with open(settings.score_buffer_path, 'w') as file:
+                json.dump(self.unsent, file)
+
+    def put(self, score: Score) -> None:
+        '''
+        Queues score to be written, without waiting for the thread
+
+        Args:
+            score (Score): score to write
+        '''
+        try:
+            self.queue.put_nowait(score)
+        except queue.Full:
+            # the queue is full, so the thread takes the overflow with the queued scores
+            with self.lock:
+                self.overflow.append(score)
+
+    def request(self, page: int) -> None:
+        '''
+        Asks the thread to fetch a page, unless it's asked already - a full queue leaves it for the next request
+
+        Args:
+            page (int): page number, from 0
+        '''
+        if page in self.requested:
+            return
+        self.requested.add(page)
+        try:
+            self.queue.put_nowait(PageRequest(page))
+        except queue.Full:
+            self.requested.discard(page)
+
+    def flush(self) -> None:
+        '''
+        Waits until top scores are loaded and all queued scores are written (or kept, if database can't be reached).
+        Scores which found the queue full are queued again, waiting for free places
+        '''
+        self.loaded.wait()
+        with self.lock:
+            overflow, self.overflow = self.overflow, []
+        for score in overflow:
+            self.queue.put(score)
+        self.queue.join()
+
+    def close(self) -> None:
+        '''
+        Writes all queued scores and stops the thread
+        '''
+        if self.thread.is_alive():
+            self.stopping.set()
+            try:
+                self.queue.put_nowait(None)
+            except queue.Full:
+                # the thread is busy with a full queue, it stops after taking it
+                pass
+            self.thread.join()
+
+
+top_scores: List[Score] = []
+score_count = 0
+# pages fetched by the database thread, by page number
+pages: Dict[int, List[Score]] = {}
+writer: Optional[ScoreWriter] = None
+
+
+def start() -> None:
+    '''
+    Starts the database thread, if it's not running yet
+    '''
+    global writer
+    if writer is None:
+        writer = ScoreWriter(settings.score_queue_size)
+        atexit.register(writer.close)
+
+
+def is_loaded() -> bool:
+    '''
+    Tells if top scores are loaded, without waiting
+
+    Returns:
+        bool: True if top scores are in memory
+    '''
+    return writer is not None and writer.loaded.is_set()
+
+
+def flush() -> None:
+    '''
+    Starts the database thread if needed and waits until all added scores are in database
+    '''
+    start()
+    writer.flush()
+
+
+# ===== IN-MEMORY TOP SCORES =====
 
 def is_good_enough_score(score: int) -> bool:
     '''
-    Tells if score is in top 10
+    Tells if score is in top 10 - every score is, until top scores are loaded
 
     Args:
         score (int): player's final score
@@ -40,49 +441,159 @@ def is_good_enough_score(score: int) -> bool:
     Returns:
         bool: True if score is in top 10, False otherwise
     '''
-    Session = sessionmaker(bind=engine)
-    session = Session()
-
-    scores_ascending = session.execute(select(Scoreboard).order_by(
-        Scoreboard.score)).scalars().all()
-
-    return len(scores_ascending) < 10 or score > scores_ascending[0].score
+    return len(top_scores) < settings.scoreboard_size or score > top_scores[-1].score
 
 
 def add_score(score: int, nick: str) -> None:
     '''
-    Adds score to scoreboard database table
+    Adds score to scoreboard and queues writing it to database table
 
     Args:
         score (int): score to add
         nick (str): score gainer's nick
     '''
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    global top_scores, score_count
+    start()
+    # new score goes before equal ones, the lowest score drops out
+    i = 0
+    while i < len(top_scores) and top_scores[i].score > score:
+        i += 1
+    top_scores = (top_scores[:i] + [Score(nick, score)] +
+                  top_scores[i:])[:settings.scoreboard_size]
+    score_count += 1
+
+    writer.put(Score(nick, score))
+
+
+def get_scoreboard(page: int = 0) -> Optional[List[Score]]:
+    '''
+    Gets a page of scoreboard, the first page is the top 10. Other pages are fetched by the database thread,
+    pages next to the asked one are fetched ahead
+
+    Args:
+        page (int): page number, from 0
+
+    Returns:
+        Optional[List[Score]]: list of scores on the page, from the highest, None if the page is being fetched
+    '''
+    start()
+    if not is_loaded():
+        return None
+    for neighbour in (page - 1, page + 1):
+        if 0 < neighbour < get_page_count() and neighbour not in pages:
+            writer.request(neighbour)
+    if page == 0 and settings.scoreboard_page_size <= settings.scoreboard_size:
+        return top_scores[:settings.scoreboard_page_size]
+    scores = pages.get(page)
+    if scores is None:
+        writer.request(page)
+    return scores
+
+
+def is_page_fetched(page: int) -> bool:
+    '''
+    Tells if a page of scoreboard can be drawn without waiting
+
+    Args:
+        page (int): page number, from 0
+
+    Returns:
+        bool: True if the page is in memory
+    '''
+    if not is_loaded():
+        return False
+    return page in pages or (page == 0 and settings.scoreboard_page_size <= settings.scoreboard_size)
+
+
+def reload_pages() -> None:
+    '''
+    Drops fetched pages, so they're fetched again - other cabinets may have added scores
+    '''
+    pages.clear()
+
+
+def get_page_count() -> int:
+    '''
+    Gets number of scoreboard pages
+
+    Returns:
+        int: number of pages, at least 1
+    '''
+    return max(1, -(-score_count // settings.scoreboard_page_size))
+
+
+# ===== LEADERBOARD QUERIES =====
+# queries wait for queued scores to be written first, so they see all added scores
+
+def get_top_scores(limit: int, offset: int = 0) -> List[Score]:
+    '''
+    Gets top scores, equal scores from the latest
+
+    Args:
+        limit (int): maximal number of scores
+        offset (int): number of higher scores to skip
+
+    Returns:
+        List[Score]: top scores, from the highest
+    '''
+    flush()
+    return [Score(*row) for row in database().get_top_scores(limit, offset)]
+
+
+def get_rank(score: int) -> int:
+    '''
+    Gets rank the score has (or would have) among all scores
+
+    Args:
+        score (int): score to rank
+
+    Returns:
+        int: rank, 1 for the highest score
+    '''
+    flush()
+    return database().count_higher_scores(score) + 1
 
-    scores_before = session.execute(select(Scoreboard)).scalars().all()
-    session.add(Scoreboard(nick=nick, score=score))
-    session.commit()
 
-    # delete last score(s)
-    if len(scores_before) == 10:
-        last_score_id = session.execute(select(Scoreboard).order_by(
-            Scoreboard.score)).scalars().all()[0].id
-        session.execute(delete(Scoreboard).where(
-            Scoreboard.id == last_score_id))
-        session.commit()
+def get_percentile(score: int) -> float:
+    '''
+    Gets percentile of the score among all scores
+
+    Args:
+        score (int): score to check
+
+    Returns:
+        float: percent of scores lower or equal to the score, 100 if there are no scores
+    '''
+    higher = get_rank(score) - 1
+    if not score_count:
+        return 100.0
+    return 100 * (score_count - higher) / score_count
 
 
-def get_scoreboard() -> List[Scoreboard]:
+def get_best_score(nick: str) -> Optional[int]:
     '''
-    Gets a list of top 10 scores
+    Gets the best score of a player
+
+    Args:
+        nick (str): player's nick
 
     Returns:
-        List[Scoreboard]: list of Scoreboard's table rows
+        Optional[int]: the best score, None if player has no scores
+    '''
+    flush()
+    return database().get_best_score(nick)
+
+
+def get_best_per_nick(limit: int, offset: int = 0) -> List[Score]:
     '''
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    Gets the best scores of players, one for every player
 
-    scoreboard = session.execute(select(Scoreboard).order_by(
-        Scoreboard.score)).scalars().all()[::-1]
-    return scoreboard
+    Args:
+        limit (int): maximal number of scores
+        offset (int): number of higher scores to skip
+
+    Returns:
+        List[Score]: the best scores of players, from the highest
+    '''
+    flush()
+    return [Score(*row) for row in database().get_best_per_nick(limit, offset)]
@@ -0,0 +1,280 @@
+'''
+Module with sqlalchemy database table of scores and queries on it. Importing it creates the database,
+so it's imported by scoreboard's background thread (or by the score service) only.
+Database is in WAL mode, so many processes can read it while one writes, and writers wait for each other.
+Numbers of scores by score are kept in a table of their own, so ranks and positions of scoreboard pages are found
+by summing them over distinct higher scores - it takes as long as there are distinct scores, however many games
+were played. Pages are then read from their first score on, by (score, ID) index range, not by skipping rows.
+The best score of every player is kept in a table of their own too, indexed by score, so players are ranked
+without grouping all scores by nick
+'''
+
+from collections import Counter
+from sqlalchemy.orm import Session as SessionType, sessionmaker
+from sqlalchemy import create_engine, select, func, delete, event, inspect, insert, tuple_
+from sqlalchemy import Column, String, Integer, Index
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.declarative import declarative_base
+from typing import Dict, List, Optional, Tuple
+
+import settings
+
+base = declarative_base()
+engine = create_engine('sqlite:///' + settings.scoreboard_path)
+Session = sessionmaker(bind=engine)
+
+
+@event.listens_for(engine, 'connect')
+def set_pragmas(connection, record) -> None:
+    '''
+    Turns on WAL mode and waiting for other writers on every new database connection
+    '''
+    cursor = connection.cursor()
+    cursor.execute(
+        f'PRAGMA busy_timeout={int(1000 * settings.score_service_timeout)}')
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.close()
+
+
+class Scoreboard(base):
+    '''
+    Scoreboard reprents a database table with all scores, indexed by score and by nick with score
+
+    Attributes:
+        id (Column[int]): score's ID
+        nick (Column[Text]): nick of score's gainer
+        score (Column[int]): score 
+    '''
+    __tablename__ = 'scoreboard'
+    id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    nick = Column(String, nullable=False)
+    score = Column(Integer, nullable=False)
+    __table_args__ = (Index('ix_scoreboard_score', 'score'),
+                      Index('ix_scoreboard_nick_score', 'nick', 'score'))
+
+
+class ScoreCount(base):
+    '''
+    ScoreCount represents a database table with numbers of scores in Scoreboard, by score
+
+    Attributes:
+        score (Column[int]): score
+        count (Column[int]): number of such scores
+    '''
+    __tablename__ = 'score_counts'
+    score = Column(Integer, primary_key=True, nullable=False, autoincrement=False)
+    count = Column(Integer, nullable=False)
+
+
+class BestScore(base):
+    '''
+    BestScore represents a database table with the best score of every player in Scoreboard, indexed by score
+
+    Attributes:
+        nick (Column[Text]): player's nick
+        score (Column[int]): player's best score
+    '''
+    __tablename__ = 'best_scores'
+    nick = Column(String, primary_key=True, nullable=False)
+    score = Column(Integer, nullable=False)
+
+
+Index('ix_best_scores_score_nick', BestScore.score.desc(), BestScore.nick)
+
+
+def create_tables() -> None:
+    '''
+    Creates the tables and indexes if they don't exist - tables created before indexing get their indexes too,
+    scores of tables created before counting them are counted, best scores of tables created before keeping them
+    are found
+    '''
+    with engine.begin() as connection:
+        counted = inspect(connection).has_table(ScoreCount.__tablename__)
+        ranked = inspect(connection).has_table(BestScore.__tablename__)
+        base.metadata.create_all(connection)
+        for index in Scoreboard.__table__.indexes:
+            index.create(connection, checkfirst=True)
+        if not counted:
+            connection.execute(insert(ScoreCount).from_select(
+                ['score', 'count'], select(Scoreboard.score, func.count()).group_by(Scoreboard.score)))
+        if not ranked:
+            connection.execute(insert(BestScore).from_select(
+                ['nick', 'score'], select(Scoreboard.nick, func.max(Scoreboard.score)).group_by(Scoreboard.nick)))
+
+
+try:
+    create_tables()
+except OperationalError:
+    # another cabinet created them meanwhile
+    create_tables()
+
+
+def change_counts(session: SessionType, changes: Dict[int, int]) -> None:
+    '''
+    Changes numbers of scores in score counts table, scores with none left are deleted
+
+    Args:
+        session (Session): session of the transaction changing scores
+        changes (Dict[int, int]): changes of numbers of scores, by score
+    '''
+    changes = {score: change for score, change in changes.items() if change}
+    if not changes:
+        return
+    upsert = sqlite.insert(ScoreCount).values(
+        [{'score': score, 'count': change} for score, change in changes.items()])
+    session.execute(upsert.on_conflict_do_update(
+        index_elements=[ScoreCount.score], set_={'count': ScoreCount.count + upsert.excluded['count']}))
+    session.execute(delete(ScoreCount).where(ScoreCount.score.in_(list(changes)), ScoreCount.count <= 0))
+
+
+def update_best_scores(session: SessionType, added: Dict[str, int], stale: List[str]) -> None:
+    '''
+    Updates best scores table - added scores replace lower best scores, best scores of players whose scores
+    were deleted are found again among their remaining ones, by (nick, score) index
+
+    Args:
+        session (Session): session of the transaction changing scores
+        added (Dict[str, int]): the best of added scores, by nick
+        stale (List[str]): nicks of players whose scores were deleted
+    '''
+    if added:
+        upsert = sqlite.insert(BestScore).values(
+            [{'nick': nick, 'score': score} for nick, score in added.items()])
+        session.execute(upsert.on_conflict_do_update(
+            index_elements=[BestScore.nick], set_={'score': func.max(BestScore.score, upsert.excluded['score'])}))
+    if stale:
+        session.execute(delete(BestScore).where(BestScore.nick.in_(stale)))
+        session.execute(insert(BestScore).from_select(['nick', 'score'], select(
+            Scoreboard.nick, func.max(Scoreboard.score)).where(Scoreboard.nick.in_(stale)).group_by(Scoreboard.nick)))
+
+
+def add_scores(scores: List[Tuple[str, str, int]]) -> None:
+    '''
+    Adds scores to scoreboard database table in a single transaction. With settings.score_retention,
+    only that many top scores are kept - the rest is deleted in the same transaction
+
+    Args:
+        scores (List[Tuple[str, str, int]]): submission IDs (not stored), nicks and scores
+    '''
+    with Session() as session:
+        session.add_all([Scoreboard(nick=nick, score=score)
+                        for _, nick, score in scores])
+        changes = Counter(score for _, _, score in scores)
+        added: Dict[str, int] = {}
+        for _, nick, score in scores:
+            added[nick] = max(score, added.get(nick, score))
+        stale: List[str] = []
+        if settings.score_retention:
+            kept = select(Scoreboard.id).order_by(Scoreboard.score.desc(), Scoreboard.id.desc()).limit(
+                settings.score_retention)
+            session.flush()
+            removed = Scoreboard.id.not_in(kept)
+            changes.subtract(dict(session.execute(select(Scoreboard.score, func.count()).where(
+                removed).group_by(Scoreboard.score)).all()))
+            stale = list(session.execute(select(Scoreboard.nick).where(removed).distinct()).scalars())
+            session.execute(delete(Scoreboard).where(removed).execution_options(
+                synchronize_session=False))
+        change_counts(session, changes)
+        update_best_scores(session, added, stale)
+        session.commit()
+
+
+def count_scores() -> int:
+    '''
+    Counts scores in database
+
+    Returns:
+        int: number of scores
+    '''
+    with Session() as session:
+        return session.execute(select(func.coalesce(func.sum(ScoreCount.count), 0))).scalar_one()
+
+
+def seek(session: SessionType, offset: int) -> Optional[Tuple[int, int]]:
+    '''
+    Finds a score at a position in scoreboard's order, summing numbers of scores over distinct higher scores
+
+    Args:
+        session (Session): database session
+        offset (int): number of higher scores
+
+    Returns:
+        Optional[Tuple[int, int]]: the score and its ID, None if there are no more scores
+    '''
+    counts = select(ScoreCount.score, ScoreCount.count, func.sum(ScoreCount.count).over(
+        order_by=ScoreCount.score.desc()).label('running')).subquery()
+    found = session.execute(select(counts.c.score, counts.c.running - counts.c['count']).where(
+        counts.c.running > offset).order_by(counts.c.score.desc()).limit(1)).first()
+    if found is None:
+        return None
+    score, higher = found
+    # equal scores are few, they're skipped in index order
+    return score, session.execute(select(Scoreboard.id).where(Scoreboard.score == score).order_by(
+        Scoreboard.id.desc()).limit(1).offset(offset - higher)).scalar_one()
+
+
+def get_top_scores(limit: int, offset: int) -> List[Tuple[str, int]]:
+    '''
+    Reads top scores, equal scores from the latest
+
+    Args:
+        limit (int): maximal number of scores
+        offset (int): number of higher scores to skip
+
+    Returns:
+        List[Tuple[str, int]]: nicks and top scores, from the highest
+    '''
+    with Session() as session:
+        first = seek(session, offset)
+        if first is None:
+            return []
+        return [tuple(row) for row in session.execute(select(Scoreboard.nick, Scoreboard.score).where(
+            tuple_(Scoreboard.score, Scoreboard.id) <= first).order_by(
+            Scoreboard.score.desc(), Scoreboard.id.desc()).limit(limit))]
+
+
+def count_higher_scores(score: int) -> int:
+    '''
+    Counts scores higher than the score
+
+    Args:
+        score (int): score to compare
+
+    Returns:
+        int: number of higher scores
+    '''
+    with Session() as session:
+        return session.execute(select(func.coalesce(func.sum(ScoreCount.count), 0)).where(
+            ScoreCount.score > score)).scalar_one()
+
+
+def get_best_score(nick: str) -> Optional[int]:
+    '''
+    Reads the best score of a player
+
+    Args:
+        nick (str): player's nick
+
+    Returns:
+        Optional[int]: the best score, None if player has no scores
+    '''
+    with Session() as session:
+        return session.execute(select(func.max(Scoreboard.score)).where(
+            Scoreboard.nick == nick)).scalar_one()
+
+
+def get_best_per_nick(limit: int, offset: int) -> List[Tuple[str, int]]:
+    '''
+    Reads the best scores of players, one for every player
+
+    Args:
+        limit (int): maximal number of scores
+        offset (int): number of higher scores to skip
+
+    Returns:
+        List[Tuple[str, int]]: nicks and their best scores, from the highest
+    '''
+    with Session() as session:
+        return [tuple(row) for row in session.execute(select(BestScore.nick, BestScore.score).order_by(
+            BestScore.score.desc(), BestScore.nick).limit(limit).offset(offset))]
@@ -3,6 +3,8 @@ Module with specific game's settings
 '''
 
 import os
+from contextlib import contextmanager
+from typing import Dict, Iterator
 
 # title and logo
 title = "JumPy"
@@ -20,9 +22,16 @@ missile_color = 'orange'
 font_name = 'verdana'
 big_font_size = 48
 small_font_size = 20
+font_cache_path = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), "fonts.json")
 
-# fps
+# physics steps per second (physics values are per step), simulation ticks per second - every tick runs
+# physics_fps // fps steps with the same input, maximal rendered frames per second (0 - unlimited)
+# and maximal number of ticks per rendered frame when the game falls behind
+physics_fps = 60
 fps = 60
+render_fps = 144
+max_ticks_per_frame = 5
 
 # map and screen dimensions
 map_width = 10
@@ -32,6 +41,15 @@ tile_size = 54
 screen_width = map_width * tile_size
 screen_height = 800
 
+# internal rendering resolution relative to screen size - below 1 fewer pixels are drawn and scaled up when presented,
+# window size relative to screen size - 0 lets SDL pick the largest integer multiple of rendering resolution
+# fitting the desktop (pygame.SCALED), integer multiples keep pixels sharp
+render_scale = 1.0
+window_scale = 1.0
+
+# height of the world canvas static platforms are composited on, it reaches half of the rest above and below the screen
+world_canvas_height = 2 * screen_height
+
 # player
 start_pos = (map_width / 2, map_height - 1)
 player_dimensions = (30, 60)
@@ -46,6 +64,7 @@ jump_speed = -22
 # platform types with different chance of being generated
 platform_types = ['normal', 'normal', 'normal', 'normal',
                   'bounce', 'horizontal', 'vertical', 'collapse']
+platform_count = 10
 platform_thickness = 10
 platform_length = [2, 3]
 platform_height_difference = [2, 4]
@@ -65,6 +84,12 @@ vertical_platform_color = "violet"
 vertical_platform_speed = 2
 vertical_platform_range = 27 * vertical_platform_speed
 
+# level generation - platforms are generated in chunks of this size, up to this many chunks ahead,
+# an unreachable platform is drawn again up to this many times
+level_chunk_size = 32
+level_queue_size = 4
+level_attempts = 10
+
 # missiles
 missile_dimensions = (20, 40)
 missile_speed = 3
@@ -79,3 +104,60 @@ game_difficulty = [{'world_descend_speed': 1, 'missile_spawn_frequency_down': 50
                    {'world_descend_speed': 3, 'missile_spawn_frequency_down': 2000,
                        'missile_spawn_frequency_up': 4000},
                    {'world_descend_speed': 4, 'missile_spawn_frequency_down': 1000, 'missile_spawn_frequency_up': 2000}]
+
+# scoreboard
+scoreboard_size = 10
+score_queue_size = 32
+scoreboard_page_size = 10
+
+# shared scoreboard - scores are sent to the score service at this address ("host:port" or "unix:path",
+# None - local database), requests time out after this many seconds and are tried this many times,
+# unsent scores are retried every this many seconds and kept in this file when the game quits,
+# the database (local or the score service's) is in this file and keeps this many top scores (0 - all)
+score_service_address = None
+score_service_timeout = 2.0
+score_service_retries = 3
+score_retry_interval = 5.0
+score_buffer_path = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), "score_buffer.json")
+scoreboard_path = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), "scoreboard.sqlite")
+score_retention = 0
+
+# replays
+replay_dir = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), "replays")
+
+# spectator streaming - every spectator gets a keyframe at least every this many frames,
+# frames are skipped for spectators with this many bytes waiting to be sent
+spectator_keyframe_interval = 120
+spectator_buffer_size = 4096
+
+# recording - frames are copied into this many buffers and written by this many worker threads,
+# PNG frames are compressed with this zlib level, videos are encoded by this binary (if it's installed)
+recording_buffers = 8
+recording_workers = 2
+recording_png_level = 1
+recording_encoder = 'ffmpeg'
+
+# input latency measurement - keyboard is polled at this interval while waiting for the next frame, latencies are
+# counted in buckets this wide, presses with no visible effect within the timeout are dropped (in seconds)
+latency_poll_interval = 0.001
+latency_bucket = 0.004
+latency_timeout = 0.5
+
+
+@contextmanager
+def overridden_settings(overrides: Dict[str, object]) -> Iterator[None]:
+    '''
+    Temporarily overrides settings
+
+    Args:
+        overrides (Dict[str, object]): new values of settings by name
+    '''
+    saved = {name: globals()[name] for name in overrides}
+    globals().update(overrides)
+    try:
+        yield
+    finally:
+        globals().update(saved)
@@ -0,0 +1,130 @@
+'''
+Module with spatial index of sprites ordered by height and swept collision test of moving rects
+'''
+
+import pygame
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+
+def swept_collision(rect: pygame.Rect, displacement: Tuple[int, int], target: pygame.Rect) -> bool:
+    '''
+    Tells if a rect moving along a straight line overlaps target at any moment of the move, except its very start.
+    Unlike testing only the end position, a rect moving faster than its size per frame can't pass through target.
+    Rects overlap like in pygame.Rect.colliderect - touching edges don't count
+
+    Args:
+        rect (pygame.Rect): moving rect at the start of the move
+        displacement (Tuple[int, int]): horizontal and vertical distance of the move
+        target (pygame.Rect): static rect
+
+    Returns:
+        bool: True if rects overlap during the move
+    '''
+    entry, exit = float('-inf'), float('inf')
+    for start, size, target_start, target_size, distance in ((rect.x, rect.width, target.x, target.width, displacement[0]),
+                                                             (rect.y, rect.height, target.y, target.height, displacement[1])):
+        if distance == 0:
+            if start >= target_start + target_size or start + size <= target_start:
+                return False
+            continue
+        # times of touching the near and the far edge of target on this axis
+        near = (target_start - start - size) / distance
+        far = (target_start + target_size - start) / distance
+        entry = max(entry, min(near, far))
+        exit = min(exit, max(near, far))
+    return entry < exit and entry < 1 and exit > 0
+
+
+class HeightIndex:
+    '''
+    HeightIndex keeps sprites sorted by the top of their rects. Sprites are indexed relative to a common offset,
+    so when all of them move vertically together, shifting the index is O(1) and keeps the order.
+    Looking up sprites in a range of heights is O(log n + k)
+
+    Args:
+        slack (int): maximal vertical distance a sprite can move on its own, away from its indexed height
+
+    Attributes:
+        slack (int): maximal vertical distance a sprite can move on its own
+        offset (int): common vertical shift of all indexed sprites
+        keys (List[int]): sorted indexed heights, relative to offset
+        sprites (List[pygame.sprite.Sprite]): indexed sprites in order of keys
+        sprite_keys (Dict[pygame.sprite.Sprite, int]): indexed height of every sprite
+    '''
+
+    def __init__(self, slack: int = 0) -> None:
+        self.slack = slack
+        self.offset = 0
+        self.keys: List[int] = []
+        self.sprites: List[pygame.sprite.Sprite] = []
+        self.sprite_keys: Dict[pygame.sprite.Sprite, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.sprites)
+
+    def add(self, sprite: pygame.sprite.Sprite, top: Optional[int] = None) -> None:
+        '''
+        Adds sprite to the index at its current height, or at given one
+
+        Args:
+            sprite (pygame.sprite.Sprite): sprite to add
+            top (Optional[int]): indexed top of the sprite, its current top if None
+        '''
+        key = (sprite.rect.top if top is None else top) - self.offset
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.sprites.insert(i, sprite)
+        self.sprite_keys[sprite] = key
+
+    def remove(self, sprite: pygame.sprite.Sprite) -> None:
+        '''
+        Removes sprite from the index (if it's indexed)
+
+        Args:
+            sprite (pygame.sprite.Sprite): sprite to remove
+        '''
+        key = self.sprite_keys.pop(sprite, None)
+        if key is None:
+            return
+        i = bisect_left(self.keys, key)
+        while self.sprites[i] is not sprite:
+            i += 1
+        del self.keys[i]
+        del self.sprites[i]
+
+    def indexed_top(self, sprite: pygame.sprite.Sprite) -> int:
+        '''
+        Gets the height sprite is indexed at - sprites moving on their own may be away from it
+
+        Args:
+            sprite (pygame.sprite.Sprite): indexed sprite
+
+        Returns:
+            int: indexed top of the sprite
+        '''
+        return self.sprite_keys[sprite] + self.offset
+
+    def shift(self, y_shift: int) -> None:
+        '''
+        Shifts all indexed sprites vertically - to be called whenever all of them move together
+
+        Args:
+            y_shift (int): vertical shift
+        '''
+        self.offset += y_shift
+
+    def query(self, top: int, bottom: int) -> List[pygame.sprite.Sprite]:
+        '''
+        Finds sprites which tops may be in a range of heights
+
+        Args:
+            top (int): upper bound of the range
+            bottom (int): lower bound of the range
+
+        Returns:
+            List[pygame.sprite.Sprite]: sprites with indexed tops in the range widened by slack, from the highest
+        '''
+        lo = bisect_left(self.keys, top - self.slack - self.offset)
+        hi = bisect_right(self.keys, bottom + self.slack - self.offset)
+        return self.sprites[lo:hi]
@@ -0,0 +1,569 @@
+'''
+Module with spectator streaming. SpectatorServer runs an asyncio server in a background thread next to the game
+and publishes world state of every tick to any number of spectators over TCP or a Unix socket. Spectators get
+a keyframe (the whole world) and then deltas against the last frame they received. Slow spectators skip frames -
+the next delta is made against what they have - so they never stall the game loop nor other spectators.
+A delta usually takes a few dozen bytes, a few KB/s per spectator
+
+Usage:
+    python main.py --spectators localhost:5555
+    python spectate.py localhost:5555
+'''
+
+import asyncio
+import socket
+import struct
+import sys
+import threading
+from collections import Counter
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import pygame
+
+import settings
+from display import Display, Presenter
+from fonts import load_fonts
+from game import Game
+from missile import Missile
+from platforms import Platform, PlatformGroup
+from player import Player
+from pool import Pool
+
+# platform types by their codes in stream
+platform_types = ('normal', 'bounce', 'collapse', 'horizontal', 'vertical')
+platform_codes = {platform_type: code for code,
+                  platform_type in enumerate(platform_types)}
+
+
+class WorldState(NamedTuple):
+    '''
+    WorldState is everything spectators need to draw a tick of the game
+
+    Attributes:
+        state (int): game state from Game.States
+        seed (int): seed of current game
+        epoch (int): game's epoch, world state changes continuously only within one (see Engine.epoch)
+        score (int): current score
+        player (Tuple[int, int]): player's position
+        platforms (Tuple[Tuple[int, int, int, int, int], ...]): number, type code, length, position of every platform, by number
+        missiles (Tuple[Tuple[int, int], ...]): position of every missile
+    '''
+    state: int
+    seed: int
+    epoch: int
+    score: int
+    player: Tuple[int, int]
+    platforms: Tuple[Tuple[int, int, int, int, int], ...]
+    missiles: Tuple[Tuple[int, int], ...]
+
+
+def capture(game: Game) -> WorldState:
+    '''
+    Captures world state of the game
+
+    Args:
+        game (Game): the game
+
+    Returns:
+        WorldState: world state, empty if no game was started yet
+    '''
+    if not hasattr(game, 'platforms'):
+        return WorldState(game.state, 0, 0, 0, (0, 0), (), ())
+    player = game.player.sprite.rect
+    return WorldState(game.state, game.seed, game.epoch, game.score, (player.x, player.y),
+                      tuple((platform.number, platform_codes[platform.type],
+                             platform.rect.width // settings.tile_size, platform.rect.x, platform.rect.y)
+                            for platform in game.platforms),
+                      tuple((missile.rect.x, missile.rect.y) for missile in game.missiles))
+
+
+# ========================= ENCODING =========================
+
+class Kinds:
+    '''
+    Simple "enum" class for kinds of stream messages
+    '''
+    keyframe, delta = range(2)
+
+
+message_length = struct.Struct('<I')
+# kind, sequence, seed, epoch, state, score, player's position, number of platforms and missiles
+keyframe_header = struct.Struct('<BIIIBIhiHH')
+# kind, sequence, base sequence, state, score, player's position, vertical shift of platforms,
+# number of removed, added and moved platforms, missiles' mode, their vertical shift and number
+delta_header = struct.Struct('<BIIBIhihBBBBhH')
+platform_record = struct.Struct('<IBBhi')  # number, type code, length, position
+moved_record = struct.Struct('<Ihi')  # number, position
+missile_record = struct.Struct('<hh')  # position
+
+
+def encode_keyframe(sequence: int, world: WorldState) -> bytes:
+    '''
+    Encodes the whole world state
+
+    Args:
+        sequence (int): number of the frame
+        world (WorldState): world state
+
+    Returns:
+        bytes: message payload
+    '''
+    return b''.join((keyframe_header.pack(Kinds.keyframe, sequence, world.seed, world.epoch, world.state, world.score,
+                                          *world.player, len(world.platforms), len(world.missiles)),
+                     *(platform_record.pack(*platform) for platform in world.platforms),
+                     *(missile_record.pack(*missile) for missile in world.missiles)))
+
+
+def encode_delta(sequence: int, base_sequence: int, base: WorldState, world: WorldState) -> Optional[bytes]:
+    '''
+    Encodes changes of world state since a base frame. Platforms are shifted together by the most common
+    vertical shift and only platforms moving otherwise are sent. Missiles are shifted together or sent again
+
+    Args:
+        sequence (int): number of the frame
+        base_sequence (int): number of the base frame
+        base (WorldState): world state in the base frame
+        world (WorldState): world state
+
+    Returns:
+        Optional[bytes]: message payload, None if it's another epoch (a new game or a restored one)
+            and a keyframe is needed
+    '''
+    if base.epoch != world.epoch:
+        return None
+
+    base_platforms = {platform[0]: platform for platform in base.platforms}
+    added, shifts = [], Counter()
+    for platform in world.platforms:
+        base_platform = base_platforms.get(platform[0])
+        if base_platform is None:
+            added.append(platform)
+        else:
+            shifts[platform[4] - base_platform[4]] += 1
+    dy = shifts.most_common(1)[0][0] if shifts else 0
+
+    numbers = {platform[0] for platform in world.platforms}
+    removed = [number for number in base_platforms if number not in numbers]
+    moved = []
+    for number, _, _, x, y in world.platforms:
+        base_platform = base_platforms.get(number)
+        if base_platform is not None and (base_platform[3] != x or base_platform[4] + dy != y):
+            moved.append((number, x, y))
+    if max(len(removed), len(added), len(moved)) > 255:
+        return None
+
+    # missiles move together unless some of them spawned or were removed
+    missile_dy = world.missiles[0][1] - base.missiles[0][1] if world.missiles and base.missiles else 0
+    shifted = len(world.missiles) == len(base.missiles) and all(
+        x == base_x and y == base_y + missile_dy for (x, y), (base_x, base_y) in zip(world.missiles, base.missiles))
+
+    return b''.join((delta_header.pack(Kinds.delta, sequence, base_sequence, world.state, world.score, *world.player,
+                                       dy, len(removed), len(added), len(moved), not shifted,
+                                       missile_dy if shifted else 0, len(world.missiles)),
+                     struct.pack(f'<{len(removed)}I', *removed),
+                     *(platform_record.pack(*platform) for platform in added),
+                     *(moved_record.pack(*platform) for platform in moved),
+                     *(() if shifted else (missile_record.pack(*missile) for missile in world.missiles))))
+
+
+def decode(payload: bytes, sequence: int, base: Optional[WorldState]) -> Optional[Tuple[int, WorldState]]:
+    '''
+    Decodes a message into world state
+
+    Args:
+        payload (bytes): message payload
+        sequence (int): number of the last decoded frame
+        base (Optional[WorldState]): world state of the last decoded frame, None if there's none
+
+    Returns:
+        Optional[Tuple[int, WorldState]]: number of the frame and its world state, None if it's a delta
+            against another frame than the last decoded one
+    '''
+    if payload[0] == Kinds.keyframe:
+        _, sequence, seed, epoch, state, score, x, y, platform_count, missile_count = keyframe_header.unpack_from(
+            payload)
+        offset = keyframe_header.size + platform_count * platform_record.size
+        platforms = tuple(platform_record.iter_unpack(
+            payload[keyframe_header.size:offset]))
+        missiles = tuple(missile_record.iter_unpack(payload[offset:]))
+        return sequence, WorldState(state, seed, epoch, score, (x, y), platforms, missiles)
+
+    (_, new_sequence, base_sequence, state, score, x, y, dy, removed_count, added_count, moved_count,
+     missiles_sent, missile_dy, missile_count) = delta_header.unpack_from(payload)
+    if base is None or base_sequence != sequence:
+        return None
+    offset = delta_header.size
+    removed = set(struct.unpack_from(f'<{removed_count}I', payload, offset))
+    offset += 4 * removed_count
+    added = platform_record.iter_unpack(
+        payload[offset:offset + added_count * platform_record.size])
+    offset += added_count * platform_record.size
+    moved = {number: (px, py) for number, px, py in moved_record.iter_unpack(
+        payload[offset:offset + moved_count * moved_record.size])}
+    offset += moved_count * moved_record.size
+
+    platforms = []
+    for number, type_code, length, px, py in base.platforms:
+        if number not in removed:
+            px, py = moved.get(number, (px, py + dy))
+            platforms.append((number, type_code, length, px, py))
+    platforms.extend(added)
+    platforms.sort()
+
+    if missiles_sent:
+        missiles = tuple(missile_record.iter_unpack(payload[offset:]))
+    else:
+        missiles = tuple((mx, my + missile_dy) for mx, my in base.missiles)
+    return new_sequence, WorldState(state, base.seed, base.epoch, score, (x, y), tuple(platforms), missiles)
+
+
+# ========================= SERVER =========================
+
+class SpectatorServer:
+    '''
+    SpectatorServer publishes world state of the game to spectators. Publishing from the game loop only hands
+    the state over to the server's thread, the latest frame is then sent to every spectator ready for it.
+    Messages are encoded once per frame for all spectators up to date
+
+    Args:
+        address (str): "host:port" of TCP server or "unix:path" of Unix socket server
+
+    Attributes:
+        address (str): server's address
+        thread (threading.Thread): thread running the server
+        started (threading.Event): set when the server listens (or failed to)
+        error (Optional[Exception]): error of starting the server
+        loop (Optional[asyncio.AbstractEventLoop]): server's event loop
+        server (Optional[asyncio.AbstractServer]): listening server
+        spectators (Dict[asyncio.StreamWriter, asyncio.Task]): tasks serving connected spectators by their streams
+        closed (bool): tells if the server is shut down
+        published (Optional[WorldState]): world state last published by the game
+        sequence (int): number of the latest frame
+        latest (Optional[WorldState]): world state of the latest frame
+        new_frame (Optional[asyncio.Event]): set when there's a new frame
+        keyframe_sequence (int): number of the latest frame every spectator should get a keyframe for
+        messages (Dict[int, bytes]): messages of the latest frame by number of spectator's base frame
+        frames_sent (int): number of frames sent to all spectators
+        frames_dropped (int): number of frames slow spectators skipped
+    '''
+
+    def __init__(self, address: str) -> None:
+        self.address = address
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.started = threading.Event()
+        self.error = None
+        self.loop = None
+        self.server = None
+        self.spectators = {}
+        self.closed = False
+        self.published = None
+        self.sequence = 0
+        self.latest = None
+        self.new_frame = None
+        self.keyframe_sequence = 0
+        self.messages = {}
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    def start(self) -> None:
+        '''
+        Starts the server in its thread and waits until it listens
+
+        Raises:
+            OSError: if the server can't listen on its address
+        '''
+        self.thread.start()
+        self.started.wait()
+        if self.error is not None:
+            raise self.error
+
+    def run(self) -> None:
+        '''
+        Runs the server's event loop - target of the server's thread
+        '''
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.new_frame = asyncio.Event()
+        try:
+            self.server = self.loop.run_until_complete(self.listen())
+        except OSError as error:
+            self.error = error
+            self.started.set()
+            return
+        self.started.set()
+        self.loop.run_forever()
+
+    async def listen(self) -> asyncio.AbstractServer:
+        '''
+        Opens the server's socket
+
+        Returns:
+            asyncio.AbstractServer: the server
+        '''
+        if self.address.startswith('unix:'):
+            return await asyncio.start_unix_server(self.serve, self.address[len('unix:'):])
+        host, port = self.address.rsplit(':', 1)
+        return await asyncio.start_server(self.serve, host, int(port))
+
+    def close(self) -> None:
+        '''
+        Stops the server and disconnects spectators
+        '''
+        if self.loop is not None and self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(
+                self.shutdown(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def shutdown(self) -> None:
+        '''
+        Stops listening and disconnects spectators
+        '''
+        self.server.close()
+        self.closed = True
+        self.new_frame.set()
+        for writer in self.spectators:
+            writer.transport.abort()
+        await asyncio.gather(*self.spectators.values())
+        await self.server.wait_closed()
+
+    def publish(self, game: Game) -> None:
+        '''
+        Publishes world state of the game, to be called from the game loop once per tick. It never waits for spectators
+
+        Args:
+            game (Game): the game
+        '''
+        if self.loop is None:
+            return
+        world = capture(game)
+        if world == self.published:
+            return
+        self.published = world
+        self.loop.call_soon_threadsafe(self.set_latest, world)
+
+    def set_latest(self, world: WorldState) -> None:
+        '''
+        Makes world state the latest frame and wakes spectators up
+
+        Args:
+            world (WorldState): world state
+        '''
+        self.sequence += 1
+        self.latest = world
+        self.messages = {}
+        if self.sequence - self.keyframe_sequence >= settings.spectator_keyframe_interval:
+            self.keyframe_sequence = self.sequence
+        self.new_frame.set()
+        self.new_frame = asyncio.Event()
+
+    def message(self, base_sequence: int, base: Optional[WorldState]) -> bytes:
+        '''
+        Gets the message with the latest frame for a spectator
+
+        Args:
+            base_sequence (int): number of the last frame sent to the spectator, 0 if there's none
+            base (Optional[WorldState]): world state of the last frame sent to the spectator
+
+        Returns:
+            bytes: message with length prefix
+        '''
+        if base is None or base_sequence < self.keyframe_sequence:
+            base_sequence = 0
+        message = self.messages.get(base_sequence)
+        if message is None:
+            payload = None
+            if base_sequence:
+                payload = encode_delta(
+                    self.sequence, base_sequence, base, self.latest)
+            if payload is None:
+                payload = encode_keyframe(self.sequence, self.latest)
+            message = message_length.pack(len(payload)) + payload
+            self.messages[base_sequence] = message
+        return message
+
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        '''
+        Sends the latest frames to a spectator until it disconnects. Frames published while the spectator's
+        buffer is full are skipped
+
+        Args:
+            reader (asyncio.StreamReader): spectator's stream, unused
+            writer (asyncio.StreamWriter): stream to spectator
+        '''
+        # small buffers keep slow spectators close to the latest frame
+        writer.get_extra_info('socket').setsockopt(
+            socket.SOL_SOCKET, socket.SO_SNDBUF, settings.spectator_buffer_size)
+        writer.transport.set_write_buffer_limits(
+            high=settings.spectator_buffer_size)
+        self.spectators[writer] = asyncio.current_task()
+        sent_sequence, sent = 0, None
+        try:
+            while not self.closed:
+                if self.sequence == sent_sequence:
+                    await self.new_frame.wait()
+                    continue
+                if sent is not None:
+                    self.frames_dropped += self.sequence - sent_sequence - 1
+                sequence, world = self.sequence, self.latest
+                writer.write(self.message(sent_sequence, sent))
+                await writer.drain()
+                sent_sequence, sent = sequence, world
+                self.frames_sent += 1
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            del self.spectators[writer]
+            writer.close()
+
+
+# ========================= CLIENT =========================
+
+class Spectator:
+    '''
+    Spectator receives the stream in a background thread and draws the latest frame with Display
+
+    Args:
+        address (str): "host:port" of TCP server or "unix:path" of Unix socket server
+        surface (pygame.Surface): spectator's screen
+        logo (pygame.Surface): game logo
+        fonts (Dict[str, pygame.font.Font]): dictionary of fonts
+
+    Attributes:
+        display (Display): display drawing frames
+        stream (io.BufferedReader): stream from the server
+        receiver (threading.Thread): thread receiving the stream
+        connected (bool): tells if the stream is still open
+        latest (Optional[Tuple[int, WorldState]]): number and world state of the latest received frame
+        drawn_sequence (int): number of the last drawn frame
+        state (Optional[int]): game state of the last drawn frame
+        platform_sprites (Dict[int, Platform]): drawn platforms by number
+        platforms (PlatformGroup): drawn platforms
+        missiles (pygame.sprite.Group): drawn missiles
+        player (pygame.sprite.GroupSingle): single group containing drawn player
+        platform_pool (Pool[Platform]): removed platforms to be reused
+        missile_pool (Pool[Missile]): removed missiles to be reused
+    '''
+
+    def __init__(self, address: str, surface: pygame.Surface, logo: pygame.Surface, fonts: Dict[str, pygame.font.Font]) -> None:
+        self.display = Display(surface, logo, fonts)
+        if address.startswith('unix:'):
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.connect(address[len('unix:'):])
+        else:
+            host, port = address.rsplit(':', 1)
+            connection = socket.create_connection((host, int(port)))
+        self.stream = connection.makefile('rb')
+        self.receiver = threading.Thread(target=self.receive, daemon=True)
+        self.connected = True
+        self.latest = None
+        self.drawn_sequence = 0
+        self.state = None
+        self.platform_sprites = {}
+        self.platforms = PlatformGroup()
+        self.missiles = pygame.sprite.Group()
+        self.player = pygame.sprite.GroupSingle(Player(settings.start_pos))
+        self.platform_pool: Pool[Platform] = Pool(Platform)
+        self.missile_pool: Pool[Missile] = Pool(Missile)
+
+    def receive(self) -> None:
+        '''
+        Receives and decodes frames until the stream ends - target of the receiving thread
+        '''
+        sequence, world = 0, None
+        while True:
+            header = self.stream.read(message_length.size)
+            if len(header) < message_length.size:
+                break
+            payload = self.stream.read(message_length.unpack(header)[0])
+            decoded = decode(payload, sequence, world)
+            if decoded is not None:
+                sequence, world = decoded
+                self.latest = decoded
+        self.connected = False
+
+    def update_sprites(self, world: WorldState) -> None:
+        '''
+        Moves sprites to their positions in a frame, adding and removing them when needed
+
+        Args:
+            world (WorldState): world state of the frame
+        '''
+        platform_sprites = {}
+        for number, type_code, length, x, y in world.platforms:
+            platform = self.platform_sprites.pop(number, None)
+            if platform is not None and (platform.type != platform_types[type_code] or
+                                         platform.rect.width != length * settings.tile_size):
+                self.platforms.remove(platform)
+                self.platform_pool.release(platform)
+                platform = None
+            if platform is None:
+                platform = self.platform_pool.acquire(
+                    (0, 0), length, platform_types[type_code], number)
+                self.platforms.add(platform)
+            platform.rect.topleft = (x, y)
+            platform_sprites[number] = platform
+        for platform in self.platform_sprites.values():
+            self.platforms.remove(platform)
+            self.platform_pool.release(platform)
+        self.platform_sprites = platform_sprites
+
+        missiles = self.missiles.sprites()
+        for missile in missiles[len(world.missiles):]:
+            self.missiles.remove(missile)
+            self.missile_pool.release(missile)
+        for count, position in enumerate(world.missiles):
+            if count < len(missiles):
+                missiles[count].rect.topleft = position
+            else:
+                self.missiles.add(self.missile_pool.acquire(position))
+
+        self.player.sprite.rect.topleft = world.player
+
+    def draw(self) -> None:
+        '''
+        Draws the latest received frame, if it wasn't drawn yet
+        '''
+        if self.latest is None or self.latest[0] == self.drawn_sequence:
+            return
+        self.drawn_sequence, world = self.latest
+        States = Game.States
+        over_states = (States.game_over, States.nick_input, States.scoreboard)
+
+        if world.state in (States.active, States.pause) or (world.state in over_states and self.state not in over_states):
+            if self.state != States.active:
+                self.display.invalidate()
+            self.update_sprites(world)
+            self.display.game(self.platforms, self.player,
+                              self.missiles, world.score)
+            if world.state == States.pause and self.state != States.pause:
+                self.display.pause()
+            elif world.state in over_states:
+                self.display.game_over()
+        elif world.state in (States.init, States.start, States.menu) and world.state != self.state:
+            self.display.menu()
+        self.state = world.state
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("usage: python spectate.py host:port | unix:path")
+        sys.exit(1)
+
+    pygame.init()
+    presenter = Presenter()
+    pygame.display.set_caption(f"{settings.title} - spectator")
+    clock = pygame.time.Clock()
+    logo = pygame.transform.scale(pygame.image.load(
+        settings.logo_path).convert_alpha(), (settings.logo_width, settings.logo_height))
+    spectator = Spectator(sys.argv[1], presenter.surface, logo, load_fonts())
+    spectator.receiver.start()
+
+    while spectator.connected:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+        spectator.draw()
+        presenter.present(spectator.display.pop_dirty_rects())
+        clock.tick(settings.fps)
+    pygame.quit()
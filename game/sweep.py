@@ -0,0 +1,354 @@
+'''
+Module with difficulty curve sweeps. Seeded headless games are played by a bot with many variants of settings
+(a full grid or a random sample of it) across a pool of processes. Results are streamed to a JSON lines file,
+so an interrupted sweep resumes where it stopped, and summarized in a report of survival time, scores
+and causes of death of every variant
+
+Sweep file is a JSON object with lists of values of overridden settings, for example:
+    {"settings": {"platform_height_difference": [[2, 4], [2, 5], [3, 5]],
+                  "platform_type_weights": [{"normal": 4, "collapse": 1}, {"normal": 2, "collapse": 1}]},
+     "samples": 4, "seed": 0}
+"platform_type_weights" is translated into "platform_types". Without "samples" the whole grid is swept
+
+Usage:
+    python sweep.py run sweep.json -o results.jsonl --games 1000
+    python sweep.py report results.jsonl
+'''
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from itertools import product
+from multiprocessing import Pool
+from random import Random
+from typing import Callable, Dict, List, Tuple
+
+import settings
+from engine import Engine
+from player import Keys
+from profiler import percentile
+
+# cause of death of games stopped at the frame limit
+timeout = 'timeout'
+
+
+# ========================= BOTS =========================
+
+def bounce_bot(engine: Engine, inputs: int) -> int:
+    '''
+    Bounces between screen edges, jumping whenever possible
+
+    Args:
+        engine (Engine): simulated game
+        inputs (int): bot's input in the previous frame
+
+    Returns:
+        int: bit flags from Keys
+    '''
+    player = engine.player.sprite
+    if player.rect.right >= settings.screen_width - settings.tile_size:
+        return Keys.left | Keys.jump
+    if player.rect.left <= settings.tile_size:
+        return Keys.right | Keys.jump
+    return inputs or Keys.right | Keys.jump
+
+
+def climb_bot(engine: Engine, inputs: int) -> int:
+    '''
+    Steers towards the lowest platform above player's feet and jumps when it's close. When falling,
+    steers towards the highest platform below player's feet
+
+    Args:
+        engine (Engine): simulated game
+        inputs (int): bot's input in the previous frame
+
+    Returns:
+        int: bit flags from Keys
+    '''
+    player = engine.player.sprite
+    falling = player.direction.y > 0
+    player = player.rect
+    target = None
+    for platform in engine.platforms:
+        if falling:
+            if platform.rect.top >= player.bottom and (target is None or platform.rect.top < target.top):
+                target = platform.rect
+        elif platform.rect.top < player.bottom and (target is None or platform.rect.top > target.top):
+            target = platform.rect
+    if target is None:
+        return Keys.jump
+
+    inputs = 0
+    if target.centerx > player.centerx + settings.tile_size // 4:
+        inputs = Keys.right
+    elif target.centerx < player.centerx - settings.tile_size // 4:
+        inputs = Keys.left
+    if abs(target.centerx - player.centerx) < target.width // 2 + settings.tile_size:
+        inputs |= Keys.jump
+    return inputs
+
+
+bots: Dict[str, Callable[[Engine, int], int]] = {
+    'bounce': bounce_bot, 'climb': climb_bot}
+
+
+# ========================= VARIANTS =========================
+
+def variant_settings(overrides: Dict[str, object]) -> Dict[str, object]:
+    '''
+    Translates overrides of a variant into settings
+
+    Args:
+        overrides (Dict[str, object]): overridden values by name
+
+    Returns:
+        Dict[str, object]: new values of settings by name
+    '''
+    overrides = dict(overrides)
+    weights = overrides.pop('platform_type_weights', None)
+    if weights is not None:
+        overrides['platform_types'] = [platform_type for platform_type, weight in weights.items()
+                                       for _ in range(weight)]
+    return overrides
+
+
+def variant_id(overrides: Dict[str, object]) -> str:
+    '''
+    Gets a short, stable identifier of a variant
+
+    Args:
+        overrides (Dict[str, object]): overridden values by name
+
+    Returns:
+        str: identifier
+    '''
+    return hashlib.sha1(json.dumps(overrides, sort_keys=True).encode()).hexdigest()[:10]
+
+
+def variants(sweep: Dict[str, object]) -> List[Dict[str, object]]:
+    '''
+    Lists variants of a sweep - the whole grid of values or its random sample
+
+    Args:
+        sweep (Dict[str, object]): sweep description with "settings" and optional "samples" and "seed"
+
+    Returns:
+        List[Dict[str, object]]: overridden values by name of every variant
+    '''
+    names = list(sweep['settings'])
+    values = [sweep['settings'][name] for name in names]
+    size = 1
+    for options in values:
+        size *= len(options)
+
+    samples = sweep.get('samples')
+    if samples is None or samples >= size:
+        return [dict(zip(names, combination)) for combination in product(*values)]
+
+    # decode sampled grid indices without listing the whole grid
+    result = []
+    for index in sorted(Random(sweep.get('seed', 0)).sample(range(size), samples)):
+        combination = []
+        for options in reversed(values):
+            index, option = divmod(index, len(options))
+            combination.append(options[option])
+        result.append(dict(zip(names, reversed(combination))))
+    return result
+
+
+# ========================= GAMES =========================
+
+def play(engine: Engine, seed: int, bot: Callable[[Engine, int], int], max_frames: int) -> Dict[str, object]:
+    '''
+    Plays a single seeded game
+
+    Args:
+        engine (Engine): simulated game
+        seed (int): seed of the game
+        bot (Callable[[Engine, int], int]): bot choosing input in every frame
+        max_frames (int): frame limit of the game
+
+    Returns:
+        Dict[str, object]: seed, score, number of frames and cause of death
+    '''
+    engine.new_game(seed)
+    inputs = 0
+    while engine.frame < max_frames:
+        inputs = bot(engine, inputs)
+        if engine.step(inputs):
+            return {'seed': seed, 'score': engine.score, 'frames': engine.frame,
+                    'cause': engine.death_cause()}
+    return {'seed': seed, 'score': engine.score, 'frames': engine.frame, 'cause': timeout}
+
+
+def play_chunk(task: Tuple[Dict[str, object], int, int, str, int]) -> Dict[str, object]:
+    '''
+    Plays a chunk of games of a variant - run in worker processes
+
+    Args:
+        task (Tuple[Dict[str, object], int, int, str, int]): overrides, first seed, number of games,
+            bot name and frame limit of a game
+
+    Returns:
+        Dict[str, object]: variant, its overrides, first seed and results of games
+    '''
+    overrides, first_seed, games, bot, max_frames = task
+    with settings.overridden_settings(variant_settings(overrides)):
+        engine = Engine()
+        results = [play(engine, seed, bots[bot], max_frames)
+                   for seed in range(first_seed, first_seed + games)]
+    return {'variant': variant_id(overrides), 'settings': overrides,
+            'first_seed': first_seed, 'games': results}
+
+
+# ========================= RESULTS =========================
+
+def load_results(path: str) -> List[Dict[str, object]]:
+    '''
+    Loads streamed results, dropping the line cut off by an interrupted sweep
+
+    Args:
+        path (str): JSON lines file
+
+    Returns:
+        List[Dict[str, object]]: results of chunks of games
+    '''
+    if not os.path.exists(path):
+        return []
+    records, complete = [], True
+    with open(path) as file:
+        for line in file:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                complete = False
+    if not complete:
+        with open(path, 'w') as file:
+            file.writelines(json.dumps(record) + '\n' for record in records)
+    return records
+
+
+def run(sweep: Dict[str, object], output: str, games: int, chunk: int, bot: str, max_frames: int,
+        processes: int) -> None:
+    '''
+    Runs a sweep, skipping chunks of games already saved in the output file
+
+    Args:
+        sweep (Dict[str, object]): sweep description
+        output (str): JSON lines file with results
+        games (int): number of games of every variant
+        chunk (int): number of games played by a worker at once
+        bot (str): bot name
+        max_frames (int): frame limit of a game
+        processes (int): number of worker processes
+    '''
+    done = {(record['variant'], record['first_seed'])
+            for record in load_results(output)}
+    tasks = [(overrides, first_seed, min(chunk, games - first_seed), bot, max_frames)
+             for overrides in variants(sweep)
+             for first_seed in range(0, games, chunk)
+             if (variant_id(overrides), first_seed) not in done]
+    print(f"{len(tasks)} chunk(s) to play, {len(done)} already done")
+
+    start = time.perf_counter()
+    with Pool(processes) as pool, open(output, 'a') as file:
+        for finished, record in enumerate(pool.imap_unordered(play_chunk, tasks), 1):
+            file.write(json.dumps(record) + '\n')
+            file.flush()
+            print(f"\r{finished}/{len(tasks)} chunks, {time.perf_counter() - start:.0f} s",
+                  end='', flush=True)
+    print()
+
+
+def report(records: List[Dict[str, object]]) -> Dict[str, Dict[str, object]]:
+    '''
+    Summarizes results of every variant
+
+    Args:
+        records (List[Dict[str, object]]): results of chunks of games
+
+    Returns:
+        Dict[str, Dict[str, object]]: overrides, survival time in seconds, scores and shares of death causes
+            by variant
+    '''
+    grouped: Dict[str, List[Dict[str, object]]] = {}
+    overrides = {}
+    for record in records:
+        grouped.setdefault(record['variant'], []).extend(record['games'])
+        overrides[record['variant']] = record['settings']
+
+    summary = {}
+    for variant, results in grouped.items():
+        survival = sorted(result['frames'] / settings.fps for result in results)
+        scores = sorted(result['score'] for result in results)
+        causes: Dict[str, int] = {}
+        for result in results:
+            causes[result['cause']] = causes.get(result['cause'], 0) + 1
+        summary[variant] = {
+            'settings': overrides[variant], 'games': len(results),
+            'survival_mean_s': sum(survival) / len(survival),
+            'survival_p10_s': percentile(survival, 10),
+            'survival_p50_s': percentile(survival, 50),
+            'survival_p90_s': percentile(survival, 90),
+            'score_mean': sum(scores) / len(scores),
+            'score_p50': percentile(scores, 50),
+            'score_p90': percentile(scores, 90),
+            'score_max': scores[-1],
+            'causes': {cause: count / len(results) for cause, count in sorted(causes.items())}}
+    return summary
+
+
+def print_report(summary: Dict[str, Dict[str, object]]) -> None:
+    '''
+    Prints report of a sweep, from the hardest variant (shortest median survival)
+
+    Args:
+        summary (Dict[str, Dict[str, object]]): summary by variant
+    '''
+    for variant, result in sorted(summary.items(), key=lambda item: item[1]['survival_p50_s']):
+        causes = '  '.join(f"{cause} {100 * share:.0f}%"
+                           for cause, share in result['causes'].items())
+        print(f"{variant}  {json.dumps(result['settings'])}")
+        print(f"    {result['games']} games   survival p10/p50/p90 {result['survival_p10_s']:.1f}/"
+              f"{result['survival_p50_s']:.1f}/{result['survival_p90_s']:.1f} s   "
+              f"score mean {result['score_mean']:.1f} p50 {result['score_p50']} "
+              f"p90 {result['score_p90']} max {result['score_max']}   {causes}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Sweeps JumPy difficulty settings with headless bot games")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help="run (or resume) a sweep")
+    run_parser.add_argument('sweep', help="JSON file with swept settings")
+    run_parser.add_argument('-o', '--output', default='sweep_results.jsonl',
+                            help="JSON lines file with results, appended to when resuming")
+    run_parser.add_argument('--games', type=int, default=1000,
+                            help="games of every variant")
+    run_parser.add_argument('--chunk', type=int, default=50,
+                            help="games played by a worker at once")
+    run_parser.add_argument('--bot', choices=list(bots), default='climb',
+                            help="bot playing games")
+    run_parser.add_argument('--max-frames', type=int, default=10 * 60 * settings.fps,
+                            help="frame limit of a game")
+    run_parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                            help="worker processes, all cores by default")
+    report_parser = commands.add_parser('report', help="summarize results")
+    report_parser.add_argument('results', nargs='+', help="JSON lines files with results")
+    report_parser.add_argument('-o', '--output', help="save report to a JSON file")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        with open(args.sweep) as file:
+            sweep = json.load(file)
+        run(sweep, args.output, args.games, args.chunk, args.bot, args.max_frames, args.processes)
+        summary = report(load_results(args.output))
+    else:
+        summary = report([record for path in args.results
+                          for record in load_results(path)])
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(summary, file, indent=1)
+    print_report(summary)
@@ -0,0 +1,32 @@
+'''
+Test setup - game modules are imported from the game folder, pygame runs without a window,
+files the game writes (scoreboard database, unsent scores, replays) go to a temporary folder
+'''
+import os
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import delete
+
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'game'))
+
+import settings  # noqa: E402
+
+files = tempfile.TemporaryDirectory(prefix='jumpy-tests-')
+settings.scoreboard_path = os.path.join(files.name, 'scoreboard.sqlite')
+settings.score_buffer_path = os.path.join(files.name, 'score_buffer.json')
+settings.replay_dir = os.path.join(files.name, 'replays')
+
+
+@pytest.fixture
+def empty_scoreboard():
+    '''
+    Deletes all scores from the scoreboard database before the test
+    '''
+    import scoreboard_db
+    with scoreboard_db.Session() as session:
+        for table in (scoreboard_db.Scoreboard, scoreboard_db.ScoreCount, scoreboard_db.BestScore):
+            session.execute(delete(table))
+        session.commit()
@@ -0,0 +1,140 @@
+'''
+Compares BatchEngine with Engine - an Engine given the platforms and random numbers a batch of one game
+drew plays the same game frame by frame
+'''
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+
+import engine
+from batch import NO_MISSILE, BatchEngine, PlatformTypes
+from levelgen import PlatformSpec
+from sweep import climb_bot
+
+
+class Draws:
+    '''
+    Stands for Engine's Random and LevelGenerator, handing out numbers and platforms drawn by the batch
+
+    Attributes:
+        numbers (deque): random integers in order of drawing
+        specs (deque): platforms of the level in order of generation
+    '''
+
+    def __init__(self) -> None:
+        self.numbers = deque()
+        self.specs = deque()
+
+    def __call__(self, seed: int) -> 'Draws':
+        return self
+
+    def randint(self, low: int, high: int) -> int:
+        return self.numbers.popleft()
+
+    def getrandbits(self, bits: int) -> int:
+        return self.numbers.popleft()
+
+    def next(self) -> PlatformSpec:
+        return self.specs.popleft()
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def add_spec(self, spec: np.ndarray) -> None:
+        map_x, height_difference, length, type = (int(value) for value in spec)
+        self.specs.append(PlatformSpec(map_x, height_difference, length, PlatformTypes.names[type]))
+
+
+class RecordedBatch(BatchEngine):
+    '''
+    BatchEngine of a single game which hands its draws to Engine
+    '''
+
+    def __init__(self, draws: Draws, seed: int) -> None:
+        self.draws = draws
+        super().__init__(1, seed=seed)
+
+    def new_games(self, mask: np.ndarray) -> None:
+        super().new_games(mask)
+        self.draws.numbers.append(0)  # level seed
+        for row in range(self.platform_count - 1):
+            self.draws.add_spec(self.level_starts[:, row, self.level_starts_taken - 1])
+
+    def recorded(self, draw, games: np.ndarray) -> None:
+        rng = self.rng
+        numbers = self.draws.numbers
+
+        class Recording:
+            def integers(self, *args, **kwargs):
+                drawn = rng.integers(*args, **kwargs)
+                numbers.extend(int(number) for number in np.atleast_1d(drawn))
+                return drawn
+
+        self.rng = Recording()
+        try:
+            draw(games)
+        finally:
+            self.rng = rng
+
+    def missile_queue(self, games: np.ndarray) -> None:
+        self.recorded(super().missile_queue, games)
+
+    def spawn_missile(self, games: np.ndarray) -> None:
+        self.recorded(super().spawn_missile, games)
+
+    def generate_new_platform(self, games: np.ndarray, slots: np.ndarray) -> None:
+        super().generate_new_platform(games, slots)
+        self.draws.add_spec(self.level_last[:, 0])
+
+
+def engine_state(game):
+    player = game.player.sprite
+    platforms = sorted((platform.number, platform.rect.x, platform.rect.y, int(platform.map_coords.y))
+                       for platform in game.platforms)
+    missiles = sorted((missile.rect.x, missile.rect.y) for missile in game.missiles)
+    return (player.rect.x, player.rect.y, round(player.direction.y, 6), game.score), platforms, missiles
+
+
+def batch_state(batch):
+    slots = np.arange(batch.platform_count)
+    platforms = sorted(zip(*(values.tolist() for values in (
+        batch.platform_number[:, 0], batch.platform_x[:, 0], batch.platform_y[:, 0],
+        batch.map_level(np.zeros(batch.platform_count, dtype=int), slots)))))
+    missiles = sorted((int(x), int(y)) for x, y in zip(batch.missile_x[:, 0], batch.missile_y[:, 0])
+                      if y > NO_MISSILE // 2)
+    return ((int(batch.player_x[0]), int(batch.player_y[0]), round(float(batch.player_dy[0]), 6), int(batch.score[0])),
+            [tuple(platform) for platform in platforms], missiles)
+
+
+@pytest.fixture
+def draws(monkeypatch):
+    draws = Draws()
+    monkeypatch.setattr(engine, 'Random', draws)
+    monkeypatch.setattr(engine, 'LevelGenerator', draws)
+    return draws
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_batch_plays_like_engine(draws, seed):
+    batch = RecordedBatch(draws, seed)
+    game = engine.Engine()
+    game.new_game()
+    rng = random.Random(seed)
+    inputs = 0
+    for frame in range(3000):
+        inputs = climb_bot(game, inputs)
+        if rng.random() < 0.02:
+            inputs = rng.randrange(8)
+        batch_over = bool(batch.step(inputs)[0])
+        over = game.step(inputs)
+        assert batch_state(batch) == engine_state(game), frame
+        assert batch_over == over, frame
+        if over:
+            break
+    assert not draws.numbers
+
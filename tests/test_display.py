@@ -0,0 +1,77 @@
+'''
+Compares frames drawn by Display (world canvas, dirty rects) with every sprite drawn directly
+'''
+import random
+
+import pygame
+import pytest
+
+import settings
+from display import Display, interpolate
+from engine import Engine
+from player import Keys
+
+
+@pytest.fixture(scope='module', autouse=True)
+def screen():
+    pygame.init()
+    yield pygame.display.set_mode((10, 10))
+    pygame.quit()
+
+
+def reference(display, surface, scale, engine, previous, alpha):
+    '''
+    Draws the frame without the canvas: every sprite scaled on its own at its rounded scaled position
+
+    Args:
+        display (Display): display whose scaled images and text are used
+        surface (pygame.Surface): surface to draw on
+        scale (float): render scale
+        engine (Engine): game to draw
+        previous (Dict): sprite -> (rect, x, y) before the last step
+        alpha (float): interpolation between the previous and the current step
+    '''
+    surface.fill(settings.background_color)
+    for group in (engine.platforms, engine.player, engine.missiles):
+        for sprite in group:
+            position = sprite.rect
+            before = previous.get(sprite)
+            if alpha < 1 and before is not None and before[0] is sprite.rect:
+                position = (interpolate(before[1], sprite.rect.x, alpha), interpolate(before[2], sprite.rect.y, alpha))
+            surface.blit(display.scaled(sprite.image), (round(position[0] * scale), round(position[1] * scale)))
+    text = display.render_text('big_font', f"SCORE: {engine.score}")
+    surface.blit(display.scaled(text), (round((settings.screen_width / 2 - text.get_width() // 2) * scale), round(20 * scale)))
+
+
+@pytest.mark.parametrize('scale', [0.5, 1, 2])
+def test_canvas_matches_sprites(scale):
+    size = (round(settings.screen_width * scale), round(settings.screen_height * scale))
+    drawn, presented, expected = pygame.Surface(size), pygame.Surface(size), pygame.Surface(size)
+    font = pygame.font.Font(None, 40)
+    display = Display(drawn, pygame.Surface((10, 10)), {'big_font': font, 'small_font': font})
+    rng = random.Random(1)
+    engine = Engine()
+    keys = Keys.right | Keys.jump
+    mismatches = []
+    for seed in range(2):
+        engine.new_game(seed=seed)
+        display.invalidate()
+        for frame in range(1500):
+            player = engine.player.sprite
+            if player.rect.right >= settings.screen_width - settings.tile_size:
+                keys = Keys.left | Keys.jump
+            elif player.rect.left <= settings.tile_size:
+                keys = Keys.right | Keys.jump
+            previous = {sprite: (sprite.rect, sprite.rect.x, sprite.rect.y) for group in (engine.platforms, engine.player, engine.missiles) for sprite in group}
+            over = engine.step(keys)
+            for substep in range(rng.choice([1, 1, 2, 3])):
+                alpha = rng.choice([1.0, rng.random()])
+                display.game(engine.platforms, engine.player, engine.missiles, engine.score, engine.world_shift != 0 and substep == 0, alpha, previous)
+                for rect in display.pop_dirty_rects():
+                    presented.blit(drawn, rect, rect)
+                reference(display, expected, scale, engine, previous, alpha)
+                if pygame.image.tobytes(presented, 'RGB') != pygame.image.tobytes(expected, 'RGB'):
+                    mismatches.append((seed, frame, alpha))
+            if over:
+                break
+    assert mismatches == []
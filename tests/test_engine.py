@@ -0,0 +1,88 @@
+'''
+Tests of headless game simulation
+'''
+import pytest
+
+import settings
+from engine import Engine, tick_rate_settings
+from sweep import climb_bot
+
+
+def play(seed, fps, decision_fps, max_seconds=20):
+    '''
+    Plays a game with the climbing bot deciding decision_fps times per second
+
+    Returns:
+        Tuple[float, int, tuple]: survival in seconds, score and player's final rect
+    '''
+    with settings.overridden_settings(tick_rate_settings(fps)):
+        engine = Engine()
+        engine.new_game(seed)
+        inputs = 0
+        while engine.frame < max_seconds * fps:
+            if engine.frame % (fps // decision_fps) == 0:
+                inputs = climb_bot(engine, inputs)
+            if engine.step(inputs):
+                break
+        return engine.frame / fps, engine.score, tuple(engine.player.sprite.rect)
+
+
+@pytest.mark.parametrize('fps', [30, 15])
+def test_lower_tick_rate_plays_same_games(fps):
+    for seed in range(20):
+        survival, score, player = play(seed, settings.physics_fps, fps)
+        lower_survival, lower_score, lower_player = play(seed, fps, fps)
+        assert (lower_score, lower_player) == (score, player), seed
+        # a game ending during a tick ends with the tick
+        assert survival <= lower_survival < survival + 1 / fps, seed
+
+
+def test_tick_rate_must_divide_physics_rate():
+    with pytest.raises(ValueError):
+        tick_rate_settings(7)
+
+
+def test_restore_continues_identically():
+    engine = Engine()
+    engine.new_game(5)
+    inputs = 0
+    for _ in range(300):
+        inputs = climb_bot(engine, inputs)
+        engine.step(inputs)
+    snapshot = engine.snapshot()
+
+    # a fresh engine, and one in the middle of another game
+    fresh = Engine()
+    fresh.restore(snapshot)
+    other = Engine()
+    other.new_game(6)
+    for _ in range(50):
+        other.step(0)
+    other.restore(snapshot)
+    assert fresh.snapshot() == other.snapshot() == snapshot
+
+    for _ in range(2000):
+        inputs = climb_bot(engine, inputs)
+        over = engine.step(inputs)
+        assert fresh.step(inputs) == other.step(inputs) == over
+        assert fresh.snapshot() == other.snapshot() == engine.snapshot()
+        if over:
+            break
+
+
+def test_restore_rewinds_game():
+    engine = Engine()
+    engine.new_game(11)
+    snapshots, trace, inputs = [], [], 0
+    for _ in range(1200):
+        if engine.frame % 97 == 0:
+            snapshots.append((engine.snapshot(), len(trace)))
+        inputs = climb_bot(engine, inputs)
+        trace.append((inputs, engine.step(inputs), engine.snapshot()))
+        if trace[-1][1]:
+            break
+    for snapshot, start in snapshots:
+        engine.restore(snapshot)
+        for inputs, over, expected in trace[start:]:
+            assert engine.step(inputs) == over
+            assert engine.snapshot() == expected
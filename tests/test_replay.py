@@ -0,0 +1,101 @@
+'''
+Tests of the replay format and of replay verification
+'''
+import pytest
+
+import settings
+from engine import Engine, tick_rate_settings
+from replay import Replay, save_replay, verify
+from sweep import climb_bot
+
+
+def record(seed, fps=None):
+    '''
+    Records a game played by the climbing bot
+
+    Returns:
+        Replay: replay of the finished game
+    '''
+    with settings.overridden_settings(tick_rate_settings(fps or settings.fps)):
+        engine = Engine()
+        engine.new_game(seed)
+        replay = Replay(seed)
+        inputs = 0
+        over = False
+        while not over:
+            inputs = climb_bot(engine, inputs)
+            replay.record(inputs)
+            over = engine.step(inputs)
+        replay.score = engine.score
+        return replay
+
+
+@pytest.fixture(scope='module')
+def replay():
+    return record(0)
+
+
+def test_pack_round_trip(replay):
+    for inputs in (replay.inputs, replay.inputs[:-1], bytearray()):
+        original = Replay(replay.seed, bytearray(inputs), 30)
+        original.score = 17
+        unpacked = Replay.unpack(original.pack())
+        assert (unpacked.seed, unpacked.inputs, unpacked.fps, unpacked.score) == (original.seed, inputs, 30, 17)
+
+
+def test_record_keeps_key_flags_only():
+    replay = Replay(0)
+    replay.record(0xF3)
+    assert replay.inputs == bytearray([3])
+
+
+@pytest.mark.parametrize('damage', [
+    lambda data: data[:Replay.header.size - 1],
+    lambda data: b'XXXX' + data[4:],
+    lambda data: data[:4] + bytes([Replay.version + 1]) + data[5:],
+    lambda data: data[:-3],
+    lambda data: data[:Replay.header.size] + b'garbage',
+])
+def test_unpack_rejects_damaged_data(replay, damage):
+    with pytest.raises(ValueError):
+        Replay.unpack(damage(replay.pack()))
+
+
+def test_verify_accepts_played_game(replay):
+    assert verify(Replay.unpack(replay.pack()))
+
+
+def test_verify_rejects_tampering(replay):
+    higher = Replay(replay.seed, bytearray(replay.inputs))
+    higher.score = replay.score + 1
+    assert not verify(higher)
+
+    longer = Replay(replay.seed, replay.inputs + bytearray([0]))
+    longer.score = replay.score
+    assert not verify(longer)
+
+    other_seed = Replay(replay.seed + 1, bytearray(replay.inputs))
+    other_seed.score = replay.score
+    assert not verify(other_seed)
+
+
+def test_verify_runs_replay_tick_rate(replay):
+    lower = record(0, 30)
+    assert lower.fps == 30
+    assert verify(lower)
+    assert settings.fps == 60
+
+    wrong_rate = Replay(lower.seed, lower.inputs, 60)
+    wrong_rate.score = lower.score
+    assert not verify(wrong_rate)
+
+    unsupported = Replay(replay.seed, replay.inputs, 7)
+    unsupported.score = replay.score
+    assert not verify(unsupported)
+
+
+def test_save_replay(replay):
+    path = save_replay(replay, 'a b/c')
+    assert path.startswith(settings.replay_dir)
+    assert path.endswith(f"-a_b_c-{replay.score}.jprp")
+    assert Replay.load(path).inputs == replay.inputs
@@ -0,0 +1,48 @@
+'''
+Tests of the tick scheduler
+'''
+from scheduler import Events, Scheduler
+
+
+def advance(scheduler, ticks):
+    return [scheduler.advance() for _ in range(ticks)]
+
+
+def test_events_run_when_due():
+    scheduler = Scheduler()
+    scheduler.schedule(3, Events.spawn_missile)
+    scheduler.schedule(1, Events.platform_collapse, 7)
+    assert len(scheduler) == 2
+    assert advance(scheduler, 4) == [[(Events.platform_collapse, 7)], [], [(Events.spawn_missile, 0)], []]
+    assert len(scheduler) == 0
+
+
+def test_same_tick_events_run_in_scheduling_order():
+    scheduler = Scheduler()
+    for argument in (5, 3, 9, 1):
+        scheduler.schedule(2, Events.platform_collapse, argument)
+    scheduler.schedule(2, Events.spawn_missile)
+    scheduler.advance()
+    assert scheduler.advance() == [(Events.platform_collapse, 5), (Events.platform_collapse, 3),
+                                   (Events.platform_collapse, 9), (Events.platform_collapse, 1),
+                                   (Events.spawn_missile, 0)]
+
+
+def test_events_are_due_at_least_next_tick():
+    scheduler = Scheduler()
+    scheduler.advance()
+    assert scheduler.schedule(0, Events.spawn_missile) == 2
+    assert scheduler.schedule(-5, Events.spawn_missile, 1) == 2
+    assert scheduler.advance() == [(Events.spawn_missile, 0), (Events.spawn_missile, 1)]
+
+
+def test_events_scheduled_while_running_wait_for_their_tick():
+    scheduler = Scheduler()
+    scheduler.schedule(1, Events.spawn_missile)
+    fired = []
+    for _ in range(5):
+        for event, argument in scheduler.advance():
+            fired.append((scheduler.tick, argument))
+            if argument < 2:
+                scheduler.schedule(2, event, argument + 1)
+    assert fired == [(1, 0), (3, 1), (5, 2)]
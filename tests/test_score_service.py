@@ -0,0 +1,49 @@
+'''
+Tests of the score service - deduplication of resent submissions and group commit
+'''
+import asyncio
+import threading
+
+import pytest
+
+import scoreboard_db
+from score_service import ScoreService
+from scoreboard import ScoreClient
+
+pytestmark = pytest.mark.usefixtures('empty_scoreboard')
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = ScoreService(f"unix:{tmp_path / 'scores.sock'}")
+    service.start()
+    yield service
+    service.close()
+
+
+def test_resent_submission_is_written_once(service):
+    client = ScoreClient(service.address)
+    client.add_scores([("a", "ann", 5), ("b", "bob", 7)])
+    client.add_scores([("a", "ann", 5)])
+    client.add_scores([("a", "ann", 5), ("c", "cid", 3)])
+    assert service.written == 3
+    assert scoreboard_db.count_scores() == 3
+    assert client.get_top_scores(10, 0) == [("bob", 7), ("ann", 5), ("cid", 3)]
+
+
+def test_waiting_submissions_are_written_together(service):
+    # the database is busy until released, submissions arriving meanwhile wait for the same transaction
+    released = threading.Event()
+    service.database.submit(released.wait)
+    requests = [asyncio.run_coroutine_threadsafe(service.handle({'call': 'add_scores', 'args': [[(str(index), "ann", index)]]}),
+                                                 service.loop) for index in range(8)]
+    # handlers run in order, so all submissions are queued (or taken by the committer) when this one runs
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0), service.loop).result()
+    released.set()
+    for request in requests:
+        request.result(timeout=5)
+
+    # the committer may have taken the first submission before the others arrived
+    assert service.transactions <= 2
+    assert service.written == 8
+    assert scoreboard_db.count_scores() == 8
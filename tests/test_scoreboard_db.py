@@ -0,0 +1,83 @@
+'''
+Tests of scoreboard database queries against a plain sorted list of scores
+'''
+import random
+
+import pytest
+
+import scoreboard_db
+import settings
+
+
+pytestmark = pytest.mark.usefixtures('empty_scoreboard')
+
+
+def add_random_scores(rng, count, nicks=8, top=30):
+    '''
+    Adds scores in a few transactions
+
+    Returns:
+        List[Tuple[str, int]]: added nicks and scores, in order of adding
+    '''
+    scores = [(f"nick{rng.randrange(nicks)}", rng.randrange(top)) for _ in range(count)]
+    for start in range(0, count, 17):
+        scoreboard_db.add_scores([(str(start + index), nick, score)
+                                  for index, (nick, score) in enumerate(scores[start:start + 17])])
+    return scores
+
+
+def ordered(scores):
+    '''
+    Orders scores like the scoreboard - from the highest, equal scores from the latest
+    '''
+    return [score for _, score in sorted(enumerate(scores), key=lambda item: (-item[1][1], -item[0]))]
+
+
+def best_per_nick(scores):
+    best = {}
+    for nick, score in scores:
+        best[nick] = max(score, best.get(nick, score))
+    return sorted(best.items(), key=lambda item: (-item[1], item[0]))
+
+
+def test_pages_match_sorted_scores():
+    scores = add_random_scores(random.Random(1), 200)
+    expected = ordered(scores)
+    assert scoreboard_db.count_scores() == 200
+    for limit in (1, 7, 10):
+        for offset in range(0, 210, limit):
+            assert scoreboard_db.get_top_scores(limit, offset) == expected[offset:offset + limit], (limit, offset)
+
+
+def test_ranks_count_higher_scores():
+    scores = add_random_scores(random.Random(2), 100)
+    for score in range(-1, 31):
+        assert scoreboard_db.count_higher_scores(score) == sum(other > score for _, other in scores)
+
+
+def test_best_scores():
+    scores = add_random_scores(random.Random(3), 150, nicks=20)
+    expected = best_per_nick(scores)
+    for nick, score in expected:
+        assert scoreboard_db.get_best_score(nick) == score
+    assert scoreboard_db.get_best_score("nobody") is None
+    for offset in range(0, 25, 6):
+        assert scoreboard_db.get_best_per_nick(6, offset) == expected[offset:offset + 6]
+
+
+def test_retention_keeps_top_scores(monkeypatch):
+    monkeypatch.setattr(settings, 'score_retention', 40)
+    scores = add_random_scores(random.Random(4), 150, nicks=30)
+    kept = ordered(scores)[:40]
+    assert scoreboard_db.count_scores() == 40
+    assert scoreboard_db.get_top_scores(50, 0) == kept
+    for score in range(30):
+        assert scoreboard_db.count_higher_scores(score) == sum(other > score for _, other in kept)
+    assert scoreboard_db.get_best_per_nick(50, 0) == best_per_nick(kept)
+
+
+def test_empty_scoreboard():
+    assert scoreboard_db.count_scores() == 0
+    assert scoreboard_db.get_top_scores(10, 0) == []
+    assert scoreboard_db.count_higher_scores(0) == 0
+    assert scoreboard_db.get_best_per_nick(10, 0) == []
@@ -0,0 +1,96 @@
+'''
+Tests of the spectator stream codec
+'''
+from engine import Engine
+from spectate import WorldState, capture, decode, encode_delta, encode_keyframe
+from sweep import climb_bot
+
+
+class Watched(Engine):
+    '''
+    Engine with a game state, as captured from Game
+    '''
+    state = 1
+
+
+def play(seed, ticks):
+    '''
+    Captures world states of a game played by the climbing bot, with restarts after game over
+
+    Returns:
+        List[WorldState]: world state after every tick
+    '''
+    engine = Watched()
+    engine.new_game(seed)
+    inputs = 0
+    worlds = []
+    for _ in range(ticks):
+        inputs = climb_bot(engine, inputs)
+        if engine.step(inputs):
+            engine.new_game(engine.seed + 1)
+        worlds.append(capture(engine))
+    return worlds
+
+
+def test_keyframe_round_trip():
+    for sequence, world in enumerate(play(0, 300)[::50]):
+        assert decode(encode_keyframe(sequence, world), 0, None) == (sequence, world)
+
+
+def test_delta_round_trip():
+    worlds = play(1, 1500)
+    sequence, decoded = decode(encode_keyframe(0, worlds[0]), 0, None)
+    deltas = 0
+    for new_sequence, world in enumerate(worlds[1:], 1):
+        payload = encode_delta(new_sequence, sequence, decoded, world)
+        if payload is None:
+            payload = encode_keyframe(new_sequence, world)
+        else:
+            deltas += 1
+            assert len(payload) < len(encode_keyframe(new_sequence, world))
+        sequence, decoded = decode(payload, sequence, decoded)
+        assert (sequence, decoded) == (new_sequence, world)
+    assert deltas > 1400
+
+
+def test_delta_against_older_base():
+    worlds = play(2, 400)
+    for base_sequence in range(0, 300, 37):
+        base = worlds[base_sequence]
+        for gap in (1, 10, 90):
+            payload = encode_delta(base_sequence + gap, base_sequence, base, worlds[base_sequence + gap])
+            assert decode(payload, base_sequence, base) == (base_sequence + gap, worlds[base_sequence + gap])
+
+
+def test_delta_needs_its_base():
+    worlds = play(3, 20)
+    payload = encode_delta(10, 9, worlds[9], worlds[10])
+    assert decode(payload, 8, worlds[8]) is None
+    assert decode(payload, 9, None) is None
+
+
+def test_new_epoch_needs_keyframe():
+    engine = Watched()
+    engine.new_game(4)
+    for _ in range(30):
+        engine.step(0)
+    before = capture(engine)
+    snapshot = engine.snapshot()
+    engine.step(0)
+    engine.restore(snapshot)
+    assert encode_delta(1, 0, before, capture(engine)) is None
+
+    # the same seed again is another game too
+    engine.new_game(4)
+    restarted = capture(engine)
+    engine.step(0)
+    assert encode_delta(1, 0, restarted, capture(engine)) is not None
+    assert encode_delta(1, 0, before, restarted) is None
+
+
+def test_too_many_changes_need_keyframe():
+    base = WorldState(1, 0, 0, 0, (0, 0), (), ())
+    world = base._replace(platforms=tuple((number, 0, 3, 0, -number) for number in range(256)))
+    assert encode_delta(1, 0, base, world) is None
+    fewer = base._replace(platforms=world.platforms[:255])
+    assert decode(encode_delta(1, 0, base, fewer), 0, base) == (1, fewer)